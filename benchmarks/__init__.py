@@ -0,0 +1,51 @@
+"""
+Standalone benchmark scripts. Run them from the repository root, e.g.:
+
+    python -m benchmarks.skill_extraction
+
+``python manage.py benchmark`` runs the regression suite (benchmarks/suite.py).
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+
+def setup_django():
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillmatch.settings')
+    import django
+    django.setup()
+
+
+def timeit(fn, repeat):
+    """Runs ``fn`` ``repeat`` times and returns the per-call latencies in seconds."""
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * pct / 100), len(ordered) - 1)]
+
+
+def peak_bytes(fn, repeat=20, setup=None):
+    """
+    Median tracemalloc peak over ``repeat`` calls, relative to the memory
+    in use before each (``setup()``, if given, runs untraced before each call).
+    """
+    tracemalloc.start()
+    peaks = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        current = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    tracemalloc.stop()
+    return percentile(peaks, 50)
@@ -0,0 +1,159 @@
+"""
+Sustained dashboard throughput and memory: WSGI (gunicorn sync workers,
+blocking ``requests``) against ASGI (uvicorn, async views and httpx).
+
+Both servers run as separate processes on a scratch database, with Adzuna
+and GitHub replaced by a local stub answering after ``--delay`` seconds
+and the lookup / dashboard caches off, so every page load waits on both
+upstreams. ``--users`` concurrent users each reload the dashboard for
+``--duration`` seconds; the report gives completed req/s, latency and the
+PSS of the whole server process tree divided by the number of users.
+
+    python -m benchmarks.asgi_load [--delay 0.5] [--users 8 32] [--wsgi-workers 4] [--asgi-workers 1]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from http.server import ThreadingHTTPServer
+
+import httpx
+
+from benchmarks import percentile, setup_django
+from benchmarks.dashboard_ttfb import SlowUpstream, start
+from benchmarks.startup_memory import smaps_rollup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class UpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # every user's page opens two upstream connections at once
+
+
+def process_tree(pid):
+    pids = [pid]
+    for child in open(f'/proc/{pid}/task/{pid}/children').read().split():
+        pids.extend(process_tree(int(child)))
+    return pids
+
+
+def tree_pss_mb(pid):
+    return sum(smaps_rollup(p).get('Pss', 0) for p in process_tree(pid))
+
+
+def server_command(mode, port, workers):
+    bind = ['127.0.0.1', str(port)]
+    if mode == 'wsgi':
+        return [sys.executable, '-m', 'gunicorn', 'skillmatch.wsgi:application', '--workers', str(workers),
+                '--worker-class', 'sync', '--bind', ':'.join(bind), '--timeout', '120', '--log-level', 'warning']
+    return [sys.executable, '-m', 'uvicorn', 'skillmatch.asgi:application', '--workers', str(workers),
+            '--host', bind[0], '--port', bind[1], '--no-access-log', '--log-level', 'warning']
+
+
+async def wait_until_up(url):
+    async with httpx.AsyncClient() as client:
+        for _ in range(300):
+            try:
+                await client.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"server at {url} did not start")
+
+
+async def load(url, cookie, users, duration, server_pid):
+    """Returns ``(latencies of completed requests, elapsed seconds, errors, peak tree PSS in MB)``."""
+    latencies, errors, pss = [], 0, []
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(limits=limits, timeout=60, headers={'Cookie': cookie}) as client:
+        begin = time.perf_counter()
+        stop_at = begin + duration
+
+        async def user():
+            nonlocal errors
+            while time.perf_counter() < stop_at:
+                started = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        async def sample_memory():
+            while time.perf_counter() < stop_at:
+                pss.append(tree_pss_mb(server_pid))
+                await asyncio.sleep(duration / 4)
+
+        await asyncio.gather(sample_memory(), *(user() for _ in range(users)))
+    # Requests in flight at the deadline still finish, so divide by the real elapsed time
+    return latencies, time.perf_counter() - begin, errors, max(pss)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--delay', type=float, default=0.5, help="Upstream response delay in seconds.")
+    parser.add_argument('--users', type=int, nargs='+', default=[8, 32])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--wsgi-workers', type=int, default=4)
+    parser.add_argument('--asgi-workers', type=int, default=1)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='asgi-load-')
+    os.environ['BENCHMARK_DB'] = os.path.join(workdir, 'db.sqlite3')
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'benchmarks.server_settings'
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+    from django.test import Client
+    from core.models import UserProfile
+
+    call_command('migrate', verbosity=0)
+    user = User.objects.create_user('bench', password='bench-password')
+    UserProfile.objects.create(user=user, skills='python, django, docker')
+    client = Client()
+    client.force_login(user)
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    SlowUpstream.delay = args.delay
+    upstream = start(UpstreamServer(('127.0.0.1', 0), SlowUpstream))
+    env = {
+        **os.environ,
+        'ADZUNA_BASE_URL': f"http://127.0.0.1:{upstream.server_port}/jobs",
+        'GITHUB_API_URL': f"http://127.0.0.1:{upstream.server_port}",
+        'LOOKUP_CACHE_ENABLED': 'False',
+        'DASHBOARD_CACHE_ENABLED': 'False',
+        'DASHBOARD_LAZY_SECTIONS': '',
+        'UPSTREAM_POOL_MAXSIZE': str(2 * max(args.users)),
+        'DEBUG': 'False',
+    }
+
+    print(f"upstream delay {args.delay:.2f}s, {args.duration:.0f}s per run, "
+          f"wsgi: gunicorn x{args.wsgi_workers} sync, asgi: uvicorn x{args.asgi_workers}")
+    for mode, workers in (('wsgi', args.wsgi_workers), ('asgi', args.asgi_workers)):
+        port = 18000 + (mode == 'asgi')
+        server = subprocess.Popen(server_command(mode, port, workers), cwd=ROOT, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            url = f'http://127.0.0.1:{port}/dashboard/'
+            asyncio.run(wait_until_up(url))
+            asyncio.run(load(url, cookie, users=2 * workers, duration=2, server_pid=server.pid))  # warm up
+            for users in args.users:
+                latencies, elapsed, errors, pss = asyncio.run(load(url, cookie, users, args.duration, server.pid))
+                print(f"  {mode} users={users:3d}  {len(latencies) / elapsed:6.1f} req/s  "
+                      f"p50={percentile(latencies, 50) * 1000:7.1f}ms  p95={percentile(latencies, 95) * 1000:7.1f}ms  "
+                      f"errors={errors}  pss={pss:6.1f}MB ({pss / users:5.1f}MB/user)")
+        finally:
+            server.terminate()
+            server.wait()
+    upstream.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Recruiter candidate search over a synthetic profile population: index
+build time and memory, then query latency for a mix of boolean queries
+(first page and a cursor page).
+
+    python -m benchmarks.candidate_search [--profiles 1000000] [--repeat 50]
+"""
+import argparse
+import time
+
+from benchmarks import percentile, setup_django, timeit
+from benchmarks.synthetic import make_profile_rows
+
+QUERIES = [
+    'python',
+    'python docker',
+    'python (docker OR kubernetes) NOT java',
+    '"machine learning" OR pandas OR numpy',
+    'NOT python',
+    'hadoop spark',
+    'aws AND azure AND "big data"',
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profiles', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+    from core.candidate_index import CandidateIndex
+
+    rows = make_profile_rows(args.profiles)
+    started = time.perf_counter()
+    index = CandidateIndex.build(rows, compact_after=10_000)
+    build = time.perf_counter() - started
+    arrays = sum(a.nbytes for entry in index.postings.values() for a in entry)
+    arrays += sum(a.nbytes for a in (index.profile_ids, index.live, index.doc_len, index.doc_hash))
+    print(f"index: {len(index)} profiles, {len(index.postings)} terms, built in {build:.1f}s, "
+          f"{arrays / 2**20:.0f}MB of arrays (plus the profile id -> ordinal dict)")
+
+    for query in QUERIES:
+        first = index.search(query, limit=args.page_size)
+        latencies = timeit(lambda: index.search(query, limit=args.page_size), args.repeat)
+        line = f"  {query:42s} p50={percentile(latencies, 50) * 1000:7.2f}ms p95={percentile(latencies, 95) * 1000:7.2f}ms"
+        if first:
+            after = (first[-1][1], first[-1][0])
+            paged = timeit(lambda: index.search(query, limit=args.page_size, after=after), args.repeat)
+            line += f"  next page p50={percentile(paged, 50) * 1000:7.2f}ms"
+        print(line)
+
+    # Incremental updates land in the pending segment until compaction
+    started = time.perf_counter()
+    for pk, skills, interests in rows[:5000]:
+        index.add(pk, skills + ", rust", interests)
+    print(f"5000 profile updates: {(time.perf_counter() - started) * 1000:.0f}ms; "
+          f"'python' after updates p50={percentile(timeit(lambda: index.search('python'), args.repeat), 50) * 1000:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""
+Cold load time and per-worker memory of the course catalog.
+
+Forks N workers the way gunicorn does (the parent has imported the app,
+but loaded no catalog) and has each load the catalog and answer one
+query, then reports the load time and each worker's PSS and private
+memory from /proc (Linux only). The page cache is warm, so "cold" means
+a fresh process, not a fresh disk read.
+
+    csv      -- previous behaviour: pandas reads the CSV and the TF-IDF
+                vectorizer is fitted in every worker
+    binary   -- current: the memory-mapped index build (postings,
+                vocabulary and catalog string tables)
+
+    python -m benchmarks.catalog_loading [--workers 4]
+"""
+import argparse
+import os
+import time
+
+from benchmarks import setup_django
+from benchmarks.startup_memory import signal_wait, smaps_rollup
+
+QUERY = "python, machine learning, docker"
+
+
+def load_csv():
+    from django.conf import settings
+    from core.course_index import load_catalog, make_vectorizer
+
+    df = load_catalog(settings.COURSE_CATALOG_PATH)
+    text = (df['Title'].fillna('') + " " + df['Short Intro'].fillna('')).astype(str).str.lower()
+    vectorizer = make_vectorizer()
+    matrix = vectorizer.fit_transform(text)
+    records = df[['Title', 'Created by', 'Short Intro', 'URL']].to_dict(orient='records')
+    scores = (matrix @ vectorizer.transform([QUERY]).T).toarray().ravel()
+    return [records[i] for i in scores.argsort()[-5:][::-1]]
+
+
+def load_binary():
+    from core.course_index import CourseIndex, _current_build
+    from django.conf import settings
+
+    return CourseIndex(_current_build(settings.COURSE_INDEX_DIR)).top_courses(QUERY)
+
+
+def run_workers(n, load):
+    pids = []
+    reader, writer = os.pipe()
+    for _ in range(n):
+        pid = os.fork()
+        if pid == 0:
+            os.close(reader)
+            started = time.perf_counter()
+            load()
+            os.write(writer, f"{time.perf_counter() - started:.6f}\n".encode())
+            os.close(writer)
+            # Stay alive until the parent has sampled our memory
+            signal_wait()
+        pids.append(pid)
+    os.close(writer)
+    output = b''
+    while output.count(b'\n') < n:
+        output += os.read(reader, 1024)
+    seconds = [float(line) for line in output.decode().split()]
+
+    samples = [smaps_rollup(pid) for pid in pids]
+    for pid in pids:
+        os.kill(pid, 15)
+        os.waitpid(pid, 0)
+    return {
+        'load_s': sum(seconds) / n,
+        'pss_mb': sum(s.get('Pss', 0) for s in samples) / n,
+        'private_mb': sum(s.get('Private_Dirty', 0) + s.get('Private_Clean', 0) for s in samples) / n,
+    }
+
+
+def directory_size(path):
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from core.course_index import build_index
+
+    # Same imports in the parent for both variants, so only the catalog itself is measured
+    import pandas, scipy.sparse, sklearn.feature_extraction.text  # noqa: F401
+
+    build = build_index()
+    print(f"catalog csv: {os.path.getsize(settings.COURSE_CATALOG_PATH) / 2**20:.1f}MB, "
+          f"index build: {directory_size(build) / 2**20:.1f}MB")
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("per-worker memory needs /proc/<pid>/smaps_rollup (Linux); skipped")
+        return
+
+    print(f"per-worker load ({args.workers} forked workers)")
+    for name, load in (('csv', load_csv), ('binary', load_binary)):
+        r = run_workers(args.workers, load)
+        print(f"  {name:6s} load={r['load_s'] * 1000:8.1f}ms pss/worker={r['pss_mb']:7.1f}MB "
+              f"private/worker={r['private_mb']:7.1f}MB", flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-query latency and peak temporary memory of the course ranking path:
+
+    dataframe   -- the original ranking tail: full argsort of the similarity
+                   vector, df.iloc[...].copy(), the 'Know More' apply, rename
+                   and to_dict (the TF-IDF refit it came with is excluded)
+    sparse      -- sklearn transform + (courses x terms) product + argpartition
+                   over every course, returning dicts (the first index version)
+    postings    -- current: term postings accumulation, threshold, argpartition
+                   over the candidates, prebuilt Course records
+
+    python -m benchmarks.course_ranking [--repeat 500]
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks import peak_bytes, percentile, setup_django, timeit
+
+QUERIES = ["python, django", "machine learning, pandas, numpy", "docker, kubernetes, aws", "react, javascript, css"]
+
+
+def dataframe_ranking(index, vectorizer, df, text):
+    similarities = (index.matrix @ vectorizer.transform([text]).T).toarray().ravel()
+    top_indices = similarities.argsort()[-5:][::-1]
+    top = df.iloc[top_indices].copy()
+    top['Know More'] = top['URL'].apply(lambda url: f"[Know More]({url})")
+    return top[['Title', 'Created by', 'Short Intro', 'URL']].rename(
+        columns={'Title': 'name', 'Created by': 'created_by', 'Short Intro': 'description', 'URL': 'know_more'}
+    ).to_dict(orient='records')
+
+
+def sparse_ranking(index, vectorizer, records, text):
+    scores = (index.matrix @ vectorizer.transform([text]).T).toarray().ravel()
+    top = np.argpartition(-scores, 4)[:5]
+    top = top[np.argsort(-scores[top], kind='stable')]
+    return [records[i] for i in top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from core.course_index import get_course_index, load_catalog, make_vectorizer
+
+    index = get_course_index()
+    df = load_catalog(settings.COURSE_CATALOG_PATH)
+    # The older variants query through a fitted vectorizer; same vocabulary and idf as the index
+    vectorizer = make_vectorizer().fit((df['Title'].fillna('') + " " + df['Short Intro'].fillna('')).astype(str).str.lower())
+    records = [course.as_dict() for course in index.courses]
+    print(f"catalog: {len(index)} courses, {len(index.vocabulary)} terms, {args.repeat} queries per variant")
+
+    variants = {
+        'dataframe': lambda text: dataframe_ranking(index, vectorizer, df, text),
+        'sparse': lambda text: sparse_ranking(index, vectorizer, records, text),
+        'postings': lambda text: index.top_courses(text, k=5),
+    }
+    for name, rank in variants.items():
+        queries = iter(QUERIES * (args.repeat // len(QUERIES) + 1))
+        latencies = timeit(lambda: rank(next(queries)), args.repeat)
+        peak = max(peak_bytes(lambda: rank(text)) for text in QUERIES)
+        print(f"  {name:10s} p50={percentile(latencies, 50) * 1e6:8.1f}us p95={percentile(latencies, 95) * 1e6:8.1f}us "
+              f"peak temporary memory={peak / 1024:8.1f}KiB")
+
+
+if __name__ == '__main__':
+    main()
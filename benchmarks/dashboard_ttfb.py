@@ -0,0 +1,143 @@
+"""
+Dashboard time-to-first-byte and time-to-first-paint under slow upstreams.
+
+Serves the app from a threaded WSGI server in this process, with Adzuna
+and GitHub replaced by local stubs that answer after ``--delay`` seconds,
+and requests the dashboard as a logged-in user (lookup and dashboard
+caches off, so every request goes upstream):
+
+    blocking  -- DASHBOARD_LAZY_SECTIONS empty: the page waits for every source
+    lazy      -- default: the page carries projects and courses, then the
+                 browser fetches the jobs / open source sections in parallel
+
+For each mode it reports the time to the first response byte, to the
+complete page (first paint: the browser can render it) and until every
+section has arrived (page + section requests).
+
+    python -m benchmarks.dashboard_ttfb [--delay 1.0] [--repeat 5]
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from benchmarks import percentile, setup_django
+
+
+class SlowUpstream(BaseHTTPRequestHandler):
+    delay = 1.0
+    payload = json.dumps({
+        'results': [{'title': 'Backend Engineer', 'company': {'display_name': 'Acme'}}],
+        'items': [{'name': 'django', 'description': 'web framework', 'html_url': 'https://github.com/django/django'}],
+    }).encode()
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(self.payload)))
+        self.end_headers()
+        self.wfile.write(self.payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def get(port, path, cookie):
+    """Returns ``(seconds to first byte, seconds to last byte)``."""
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('GET', path, headers={'Cookie': cookie, 'Host': '127.0.0.1'})
+    response = conn.getresponse()  # returns once the status line and headers are in
+    first_byte = time.perf_counter() - started
+    response.read()
+    conn.close()
+    if response.status != 200:
+        raise RuntimeError(f"GET {path} answered {response.status}")
+    return first_byte, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--delay', type=float, default=1.0, help="Upstream response delay in seconds.")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.core.wsgi import get_wsgi_application
+    from django.test import Client
+    from django.test.utils import override_settings, setup_test_environment
+    from django.db import connection
+    from django.urls import reverse
+    from core import utils
+    from core.models import UserProfile
+
+    # A throwaway database (shared in-memory sqlite, visible to the server threads)
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    user = User.objects.create_user('bench', password='bench-password')
+    UserProfile.objects.create(user=user, skills='python, django, docker')
+    client = Client()
+    client.force_login(user)
+    cookie = f"{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}"
+
+    SlowUpstream.delay = args.delay
+    upstream = start(ThreadingHTTPServer(('127.0.0.1', 0), SlowUpstream))
+    utils.ADZUNA_BASE_URL = f"http://127.0.0.1:{upstream.server_port}/jobs"
+    utils.GITHUB_API_URL = f"http://127.0.0.1:{upstream.server_port}"
+    app = start(make_server('127.0.0.1', 0, get_wsgi_application(),
+                            server_class=ThreadingWSGIServer, handler_class=QuietHandler))
+    port = app.server_port
+
+    caches_off = {
+        'LOOKUP_CACHE': {**settings.LOOKUP_CACHE, 'ENABLED': False},
+        'DASHBOARD_CACHE': {**settings.DASHBOARD_CACHE, 'ENABLED': False},
+    }
+    print(f"upstream delay {args.delay:.2f}s, {args.repeat} page loads per mode")
+    get(port, reverse('dashboard'), cookie)  # warm up the indexes
+    for mode, lazy in (('blocking', []), ('lazy', ['jobs', 'open_source'])):
+        with override_settings(DASHBOARD_LAZY_SECTIONS=lazy, **caches_off):
+            ttfb, paint, complete = [], [], []
+            with ThreadPoolExecutor(max_workers=4) as pool:
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    first_byte, page = get(port, reverse('dashboard'), cookie)
+                    # The page's script requests the lazy sections as soon as it loads
+                    sections = [pool.submit(get, port, reverse('dashboard_section', args=[name]), cookie)
+                                for name in lazy]
+                    for future in sections:
+                        future.result()
+                    ttfb.append(first_byte)
+                    paint.append(page)
+                    complete.append(time.perf_counter() - started)
+        print(f"  {mode:8s} ttfb p50={percentile(ttfb, 50) * 1000:7.1f}ms  "
+              f"first paint p50={percentile(paint, 50) * 1000:7.1f}ms  "
+              f"all sections p50={percentile(complete, 50) * 1000:7.1f}ms")
+
+    app.shutdown()
+    upstream.shutdown()
+
+
+if __name__ == '__main__':
+    main()
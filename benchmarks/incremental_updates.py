@@ -0,0 +1,112 @@
+"""
+Hashed TF-IDF index (core/hashing_index.py) against refitting the course
+index: latency of adding one course, queries/s, and ranking quality.
+
+"refit" is what the fitted index needs for any catalog change: a full
+``build_index`` over the catalog plus the new course. "hashed add" is
+``HashedTfidfIndex.add`` into an index of the same catalog; queries/s
+is measured before and after the adds (which sit in the pending segment
+until the final compaction). Quality is the share of the refit top 10's
+TF-IDF score mass that the hashed top 10 gets (1.0 = rankings as good as
+the refit's), over queries of one to three catalog words.
+
+    python -m benchmarks.incremental_updates [--courses 20000] [--adds 2000] [--refits 3]
+"""
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks import percentile, setup_django
+from benchmarks.synthetic import write_course_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--courses', type=int, default=20_000)
+    parser.add_argument('--adds', type=int, default=2000)
+    parser.add_argument('--refits', type=int, default=3)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    import logging
+
+    from django.test.utils import override_settings
+    from core.course_index import CourseIndex, build_index, make_vectorizer
+    from core.hashing_index import HashedTfidfIndex
+
+    data_dir = tempfile.mkdtemp(prefix='incremental-')
+    logging.disable(logging.INFO)
+    try:
+        catalog = os.path.join(data_dir, 'courses.csv')
+        write_course_catalog(catalog, args.courses)
+        with override_settings(COURSE_CATALOG_PATH=catalog, COURSE_INDEX_DIR=os.path.join(data_dir, 'index')):
+            refit_times = []
+            for i in range(args.refits):
+                with open(catalog, 'a', encoding='utf-8') as f:
+                    f.write(f"Rust and Go Masterclass {i},systems programming,https://example.com/new/{i},Zed\n")
+                started = time.perf_counter()
+                build_index()
+                refit_times.append(time.perf_counter() - started)
+            fitted = CourseIndex(build_index())
+
+            analyze = make_vectorizer().build_analyzer()
+            started = time.perf_counter()
+            hashed = HashedTfidfIndex.build(
+                (row, analyze(f"{course.name} {course.description}"), row, None)
+                for row, course in enumerate(fitted.courses))
+            build = time.perf_counter() - started
+
+            rng = random.Random(0)
+            vocabulary = [term.decode('utf-8') for term in fitted.vocabulary]
+            queries = [" ".join(rng.sample(vocabulary, rng.randint(1, 3))) for _ in range(args.queries)]
+            captured = []
+            for query in queries:
+                scores = np.zeros(len(fitted), dtype=np.float32)
+                for row, score in fitted.search(query, k=len(fitted)):
+                    scores[row] = score
+                best = np.sort(scores)[::-1][:10].sum()
+                if best:
+                    captured.append(scores[[row for row, _ in hashed.search(analyze(query), k=10)]].sum() / best)
+
+            rates = {}
+            for name, search in (('fitted', lambda q: fitted.search(q, k=5)),
+                                 ('hashed', lambda q: hashed.search(analyze(q), k=5))):
+                started = time.perf_counter()
+                for query in queries:
+                    search(query)
+                rates[name] = len(queries) / (time.perf_counter() - started)
+
+            add_times = []
+            for i in range(args.adds):
+                text = f"new course {i} " + " ".join(rng.sample(vocabulary, 8))
+                started = time.perf_counter()
+                hashed.add(('new', i), analyze(text), len(fitted) + i)
+                add_times.append(time.perf_counter() - started)
+            started = time.perf_counter()
+            for query in queries:
+                hashed.search(analyze(query), k=5)
+            pending_rate = len(queries) / (time.perf_counter() - started)
+            started = time.perf_counter()
+            hashed.compact()
+            compact = time.perf_counter() - started
+
+        print(f"{len(fitted)} courses; hashed build {build:.2f}s")
+        print(f"  refit (build_index)  median {percentile(refit_times, 50) * 1000:9.1f}ms per change")
+        print(f"  hashed add           median {percentile(add_times, 50) * 1e6:9.1f}us  "
+              f"p99 {percentile(add_times, 99) * 1e6:.1f}us  (x{percentile(refit_times, 50) / percentile(add_times, 50):.0f})")
+        print(f"  queries: fitted {rates['fitted']:.0f} q/s, hashed {rates['hashed']:.0f} q/s, "
+              f"hashed with {args.adds} pending {pending_rate:.0f} q/s; compaction {compact * 1000:.0f}ms")
+        print(f"  quality: hashed top 10 gets {np.mean(captured):.3f} of the refit top-10 score mass")
+    finally:
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
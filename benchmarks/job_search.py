@@ -0,0 +1,86 @@
+"""
+Local job index (core/job_index.py): harvest storage throughput and
+dashboard search latency over a throwaway database of synthetic
+postings.
+
+Postings are stored through ``store_results`` a page of 50 at a time,
+as a harvest would, first as new listings and then again unchanged (the
+common case for an hourly harvest: only ``last_seen`` is written).
+Searches use three to ten skills per user, through the FTS5 index
+(ranking the ``JOB_INDEX['CANDIDATES']`` newest matches) and through the
+``LIKE`` fallback used without it.
+
+    python -m benchmarks.job_search [--postings 50000] [--queries 500]
+"""
+import argparse
+import random
+import time
+from unittest import mock
+
+from benchmarks import percentile, setup_django, timeit
+from benchmarks.synthetic import FILLER
+
+PAGE = 50
+
+
+def make_listings(count, skills, seed=0):
+    rng = random.Random(seed)
+    roles = ['Developer', 'Engineer', 'Lead', 'Architect', 'Analyst', 'Consultant']
+    listings = []
+    for i in range(count):
+        words = rng.sample(skills, rng.randint(2, 6)) + rng.choices(FILLER, k=40)
+        rng.shuffle(words)
+        listings.append({
+            'id': str(i), 'title': f"{rng.choice(skills).title()} {rng.choice(roles)}",
+            'description': " ".join(words), 'company': {'display_name': f"Company {i % 500}"},
+            'location': {'display_name': 'Remote'}, 'created': '2026-10-01T09:00:00Z',
+            'redirect_url': f'https://example.com/job/{i}',
+        })
+    return listings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--postings', type=int, default=50_000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    setup_django()
+    import logging
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    from core.job_index import search_jobs, store_results
+    from core.skills import SKILL_KEYWORDS
+
+    skills = sorted(SKILL_KEYWORDS)
+    listings = make_listings(args.postings, skills)
+    rng = random.Random(1)
+    queries = [",".join(rng.sample(skills, rng.randint(3, 10))) for _ in range(args.queries)]
+
+    logging.disable(logging.INFO)
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        rates = {}
+        for label in ('new', 'unchanged'):
+            started = time.perf_counter()
+            for start in range(0, len(listings), PAGE):
+                store_results(listings[start:start + PAGE], 'us')
+            rates[label] = len(listings) / (time.perf_counter() - started)
+        print(f"{args.postings} postings; stored {rates['new']:.0f}/s new, {rates['unchanged']:.0f}/s unchanged")
+
+        queue = iter(queries * 2)
+        fts = timeit(lambda: search_jobs(next(queue)), len(queries))
+        queue = iter(queries)
+        with mock.patch('core.job_index.fts_available', return_value=False):
+            like = timeit(lambda: search_jobs(next(queue)), min(len(queries), 50))
+        for name, latencies in (('fts5 + bm25', fts), ('LIKE fallback', like)):
+            print(f"  {name:14s} p50 {percentile(latencies, 50) * 1000:7.2f}ms  "
+                  f"p99 {percentile(latencies, 99) * 1000:7.2f}ms")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Per-worker memory and throughput of N forked web workers, each loading
+the NLP model and course index itself ("in-process") or sending skill
+extraction and course ranking to one NLP service process ("sidecar",
+core/nlp_service.py).
+
+Workers are forked the way gunicorn forks them without ``--preload``,
+each make one warm-up call (loading the model, or connecting), then all
+run ``--requests`` dashboard-style calls each (extract_skills on a
+resume-sized text, then get_courses on the skills found). Reported:
+requests/s over all workers, PSS and private memory per worker, and the
+total PSS including the sidecar (Linux only, from /proc).
+
+Throughput can only scale up to the cores available; with the sidecar
+every extraction goes through one process, so expect it to trade some
+throughput on many-core boxes for the memory of N - 1 models.
+
+    python -m benchmarks.nlp_sidecar [--workers 4,8,16] [--requests 50]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import setup_django
+from benchmarks.startup_memory import signal_wait, smaps_rollup
+from benchmarks.synthetic import make_resume_text
+
+
+def run_workers(n, requests, texts):
+    from core.utils import extract_skills, get_courses
+
+    ready_r, ready_w = os.pipe()
+    go_r, go_w = os.pipe()
+    pids = []
+    for w in range(n):
+        pid = os.fork()
+        if pid == 0:
+            get_courses(extract_skills(texts[w % len(texts)]))  # load (or connect) before timing
+            os.write(ready_w, b'.')
+            os.read(go_r, 1)
+            for i in range(requests):
+                get_courses(extract_skills(texts[(w * requests + i) % len(texts)]))
+            os.write(ready_w, b'.')
+            signal_wait()
+        pids.append(pid)
+
+    def wait_for(count):
+        seen = 0
+        while seen < count:
+            seen += len(os.read(ready_r, count - seen))
+
+    wait_for(n)
+    started = time.perf_counter()
+    os.write(go_w, b'.' * n)
+    wait_for(n)
+    elapsed = time.perf_counter() - started
+
+    samples = [smaps_rollup(pid) for pid in pids]
+    for pid in pids:
+        os.kill(pid, 15)
+        os.waitpid(pid, 0)
+    return {
+        'rate': n * requests / elapsed,
+        'pss_mb': sum(s.get('Pss', 0) for s in samples) / n,
+        'private_mb': sum(s.get('Private_Dirty', 0) + s.get('Private_Clean', 0) for s in samples) / n,
+    }
+
+
+def start_sidecar(path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen([sys.executable, 'manage.py', 'nlp_service', '--socket', path],
+                               cwd=root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 120
+    while not os.path.exists(path):
+        if process.poll() is not None or time.monotonic() > deadline:
+            raise RuntimeError("The NLP service did not start")
+        time.sleep(0.1)
+    return process
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', default='4,8,16', help="Comma-separated worker counts.")
+    parser.add_argument('--requests', type=int, default=50, help="Requests per worker.")
+    parser.add_argument('--words', type=int, default=800, help="Words per resume text.")
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("needs /proc/<pid>/smaps_rollup (Linux)")
+        return
+
+    setup_django()
+    import logging
+
+    from django.conf import settings
+    import core.utils  # noqa: F401 -- imported before forking, as gunicorn's workers would have it
+
+    logging.disable(logging.WARNING)
+    texts = [make_resume_text(args.words, seed=i) for i in range(200)]
+    socket_path = os.path.join(tempfile.mkdtemp(prefix='nlp-'), 'nlp.sock')
+    sidecar = start_sidecar(socket_path)
+    cpus = settings.AVAILABLE_CPUS
+    print(f"{args.requests} requests per worker, {args.words}-word resumes, {cpus} available cores")
+    try:
+        for n in (int(n) for n in args.workers.split(',')):
+            for mode, path in (('in-process', ''), ('sidecar', socket_path)):
+                settings.NLP_SERVICE['SOCKET'] = path
+                # Each run needs a parent that hasn't loaded or connected anything yet
+                pid = os.fork()
+                if pid == 0:
+                    r = run_workers(n, args.requests, texts)
+                    sidecar_pss = smaps_rollup(sidecar.pid).get('Pss', 0) if path else 0
+                    print(f"  workers={n:<3d} {mode:10s} {r['rate']:8.1f} req/s  pss/worker={r['pss_mb']:6.1f}MB "
+                          f"private/worker={r['private_mb']:6.1f}MB  "
+                          f"total pss={n * r['pss_mb'] + sidecar_pss:7.1f}MB"
+                          + (f" (sidecar {sidecar_pss:.1f}MB)" if path else ""), flush=True)
+                    os._exit(0)
+                os.waitpid(pid, 0)
+    finally:
+        sidecar.terminate()
+        sidecar.wait()
+
+
+if __name__ == '__main__':
+    main()
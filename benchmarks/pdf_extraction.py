@@ -0,0 +1,86 @@
+"""
+Peak memory and latency of resume PDF extraction: the previous path
+(read the upload into memory, wrap it in BytesIO, pdfminer extract_text)
+against the streaming page-by-page path. Each variant runs in a fresh
+interpreter so peak RSS is comparable. 'capped' is the streaming path
+with the PDF_EXTRACTION page cap and time budget applied.
+
+    python -m benchmarks.pdf_extraction [--pages 50] [--tracemalloc]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.synthetic import make_pdf, make_resume_text
+
+SNIPPET = r"""
+import json, resource, sys, time, tracemalloc
+from benchmarks import setup_django
+setup_django()
+from io import BytesIO
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from pdfminer.high_level import extract_text
+from core.pdf_text import PdfPages
+from core.utils import pdf_pages
+path, mode, trace = sys.argv[1], sys.argv[2], sys.argv[3] == '1'
+
+upload = TemporaryUploadedFile('resume.pdf', 'application/pdf', 0, None)
+with open(path, 'rb') as f:
+    for chunk in iter(lambda: f.read(65536), b''):
+        upload.write(chunk)
+upload.seek(0)
+
+baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if trace:
+    tracemalloc.start()
+started = time.perf_counter()
+if mode == 'legacy':
+    text = extract_text(BytesIO(upload.read()))
+elif mode == 'streaming':
+    text = "".join(PdfPages(upload))
+else:
+    text = "".join(pdf_pages(upload))  # with the configured page cap / time budget
+elapsed = time.perf_counter() - started
+_, peak = tracemalloc.get_traced_memory() if trace else (0, 0)
+print(json.dumps({
+    'seconds': elapsed,
+    'chars': len(text),
+    'python_peak_mb': peak / 2**20,
+    'rss_growth_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline) / 1024,
+}))
+"""
+
+
+def run(path, mode, trace):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', SNIPPET, path, mode, '1' if trace else '0'],
+                            cwd=root, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--pages', type=int, default=50)
+    parser.add_argument('--tracemalloc', action='store_true',
+                        help="Also report the Python allocation peak (much slower).")
+    args = parser.parse_args()
+
+    pdf = make_pdf([make_resume_text(600, seed=i) for i in range(args.pages)])
+    with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as f:
+        f.write(pdf)
+    try:
+        print(f"{args.pages}-page resume, {len(pdf) / 1024:.0f} KB")
+        for mode in ('legacy', 'streaming', 'capped'):
+            r = run(f.name, mode, args.tracemalloc)
+            peak = f"python peak={r['python_peak_mb']:7.1f}MB  " if args.tracemalloc else ""
+            print(f"  {mode:9s} {r['seconds']:6.2f}s  {peak}rss growth={r['rss_growth_mb']:7.1f}MB  "
+                  f"({r['chars']} chars)")
+    finally:
+        os.remove(f.name)
+
+
+if __name__ == '__main__':
+    main()
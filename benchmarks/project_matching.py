@@ -0,0 +1,67 @@
+"""
+Project ranking latency: the precomputed match index against the previous
+``match_projects`` (TF-IDF refit over the user plus every project per call).
+
+The index numbers cover building it from stored vectors and ranking; a
+dashboard request adds one primary-key query for the top ``k`` rows.
+
+    python -m benchmarks.project_matching [--projects 100000] [--legacy-projects 10000] [--queries 200]
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks import percentile, setup_django, timeit
+from benchmarks.synthetic import make_project_skills
+
+
+def legacy_match_projects(user_skills, required_skills):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    vectorizer = TfidfVectorizer()
+    skill_matrix = vectorizer.fit_transform([user_skills] + required_skills)
+    similarities = cosine_similarity(skill_matrix[0:1], skill_matrix[1:])
+    return similarities.argsort()[0][::-1]
+
+
+def report(name, latencies):
+    print(f"  {name:28s} p50={percentile(latencies, 50) * 1000:8.2f}ms "
+          f"p95={percentile(latencies, 95) * 1000:8.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--projects', type=int, default=100_000)
+    parser.add_argument('--legacy-projects', type=int, default=10_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('-k', type=int, default=10)
+    args = parser.parse_args()
+
+    setup_django()
+    from core.project_index import ProjectMatchIndex
+
+    projects = make_project_skills(args.projects)
+    users = [", ".join(skills) for skills in make_project_skills(args.queries, seed=1)]
+
+    started = time.perf_counter()
+    index = ProjectMatchIndex(np.arange(1, args.projects + 1), projects, user_vector_cache=args.queries)
+    build = time.perf_counter() - started
+    print(f"index: {args.projects} projects, {index.matrix.nnz} non-zeros, built in {build * 1000:.0f}ms, "
+          f"{(index.matrix.data.nbytes + index.matrix.indices.nbytes + index.matrix.indptr.nbytes) / 2**20:.1f}MB")
+
+    queries = iter(users)
+    report('index, first query per user', timeit(lambda: index.top_k(next(queries), args.k), args.queries))
+    rng = random.Random(2)
+    report('index, cached user vector', timeit(lambda: index.top_k(rng.choice(users), args.k), args.queries))
+
+    legacy_rows = [", ".join(skills) for skills in projects[:args.legacy_projects]]
+    repeat = max(1, min(args.queries, 20))
+    print(f"legacy: {args.legacy_projects} projects")
+    report('TF-IDF refit per call', timeit(lambda: legacy_match_projects(rng.choice(users), legacy_rows), repeat))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Bulk resume import throughput by worker count: a synthetic cohort of
+PDFs is imported into a throwaway database once per worker count, and
+files/s plus the speedup over a single worker are reported. The first
+row ("0") parses in the importing process, without a pool.
+
+Speedup can only grow up to the number of cores this process may use
+(``os.sched_getaffinity``); worker start-up (Django + the skill matcher
+per process) is included, so small cohorts understate it.
+
+    python -m benchmarks.resume_import [--files 400] [--pages 2] [--workers 0,1,2,4]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+from benchmarks import setup_django
+from benchmarks.synthetic import make_pdf, make_resume_text
+
+WORDS_PER_PAGE = 400
+
+
+def write_cohort(directory, files, pages):
+    for i in range(files):
+        text = make_resume_text(pages * WORDS_PER_PAGE, seed=i).split()
+        with open(os.path.join(directory, f"user{i:05d}.pdf"), 'wb') as f:
+            f.write(make_pdf([" ".join(text[p * WORDS_PER_PAGE:(p + 1) * WORDS_PER_PAGE]) for p in range(pages)]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--files', type=int, default=400)
+    parser.add_argument('--pages', type=int, default=2)
+    parser.add_argument('--workers', help="Comma-separated worker counts. Default: 0, 1, 2, 4... up to the cores.")
+    args = parser.parse_args()
+
+    setup_django()
+    import logging
+
+    from django.conf import settings
+    from django.contrib.auth.models import User
+    from django.db import connection
+    from django.test.utils import override_settings, setup_test_environment
+    from core.models import ResumeCache
+    from core.resume_import import import_resumes
+
+    cpus = settings.AVAILABLE_CPUS
+    if args.workers:
+        counts = [int(n) for n in args.workers.split(',')]
+    else:
+        counts = [0, 1] + [n for n in (2, 4, 8, 16, 32, 64) if n < cpus] + ([cpus] if cpus > 1 else [])
+
+    folder = tempfile.mkdtemp(prefix='resumes-')
+    media = tempfile.mkdtemp(prefix='media-')
+    write_cohort(folder, args.files, args.pages)
+    print(f"{args.files} resumes of {args.pages} pages, {cpus} available cores")
+
+    logging.disable(logging.INFO)
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        with override_settings(MEDIA_ROOT=media):
+            single = None
+            for workers in counts:
+                # Start from nothing each time: no users, stored files or cached parses
+                User.objects.all().delete()
+                ResumeCache.objects.all().delete()
+                shutil.rmtree(media, ignore_errors=True)
+                stats = import_resumes(folder, workers=workers)
+                rate = stats['files_per_second']
+                if workers == 1:
+                    single = rate
+                speedup = f"  x{rate / single:.2f}" if single and workers >= 1 else ""
+                print(f"  workers={workers:<3d} {stats['seconds']:7.2f}s {rate:8.1f} files/s{speedup}")
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(folder, ignore_errors=True)
+        shutil.rmtree(media, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
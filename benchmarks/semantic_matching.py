@@ -0,0 +1,159 @@
+"""
+Embedding engine (core/embeddings.py) against the TF-IDF course index:
+queries/s, recall@10 of the IVF index against an exact scan of the same
+vectors for several ``n_probe`` values, and topic precision@10.
+
+The synthetic catalog has topics, each with its own made-up vocabulary.
+Courses use half of a topic's words; projects, which are part of the
+corpus the LSA model is fitted on, use all of them. "Shared" queries are
+a word that courses contain, "related" queries a word only projects
+contain (the "deep learning" vs "neural networks" case), which TF-IDF
+cannot match at all. Precision@10 is the share of the top ten courses
+on the query's topic.
+
+    python -m benchmarks.semantic_matching [--courses 20000] [--projects 20000] [--queries 200]
+"""
+import argparse
+import csv
+import os
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks import setup_django
+from benchmarks.synthetic import FILLER
+
+TOPICS = 40
+WORDS_PER_TOPIC = 40
+
+
+def make_vocabulary(rng):
+    """``TOPICS`` lists of distinct made-up words."""
+    syllables = [c + v for c in "bdfgklmnprstvz" for v in "aeiou"]
+    words = set()
+    while len(words) < TOPICS * WORDS_PER_TOPIC:
+        words.add("".join(rng.choice(syllables) for _ in range(3)))
+    words = sorted(words)
+    rng.shuffle(words)
+    return [words[t * WORDS_PER_TOPIC:(t + 1) * WORDS_PER_TOPIC] for t in range(TOPICS)]
+
+
+def make_corpus(courses, projects, seed=0):
+    """``(course rows, course topics, project texts, shared queries, related queries)``."""
+    rng = random.Random(seed)
+    vocabulary = make_vocabulary(rng)
+    course_words = [words[:WORDS_PER_TOPIC // 2] for words in vocabulary]
+
+    rows, topics = [], []
+    for i in range(courses):
+        topic = rng.randrange(TOPICS)
+        words = rng.sample(course_words[topic], 4)
+        intro = " ".join(rng.choices(FILLER, k=8) + words[1:])
+        rows.append([f"{words[0].title()} {rng.choice(['Fundamentals', 'Bootcamp', 'in Practice'])}", intro,
+                     f"https://example.com/courses/{i}", f"Instructor {i % 97}"])
+        topics.append(topic)
+    project_texts = []
+    for _ in range(projects):
+        topic = rng.randrange(TOPICS)
+        project_texts.append(" ".join(rng.sample(vocabulary[topic], 6) + rng.choices(FILLER, k=4)))
+
+    def queries(pick, count):
+        out = []
+        for _ in range(count):
+            topic = rng.randrange(TOPICS)
+            out.append((rng.choice(pick(topic)), topic))
+        return out
+
+    shared = queries(lambda t: course_words[t], 1000)
+    related = queries(lambda t: vocabulary[t][WORDS_PER_TOPIC // 2:], 1000)
+    return rows, np.array(topics), project_texts, shared, related
+
+
+def precision(ranked_rows, topics, topic):
+    return sum(topics[row] == topic for row in ranked_rows) / 10
+
+
+def run(name, search, queries, topics, exact=None):
+    """Prints queries/s, precision@10 on both query sets and, with ``exact``, recall@10 against it."""
+    results = {}
+    for label, batch in queries.items():
+        started = time.perf_counter()
+        results[label] = [search(text) for text, _ in batch]
+        elapsed = time.perf_counter() - started
+        if label == 'shared':
+            rate = len(batch) / elapsed
+    line = f"  {name:28s} {rate:8.0f} q/s"
+    for label, batch in queries.items():
+        scores = [precision(rows, topics, topic) for rows, (_, topic) in zip(results[label], batch)]
+        line += f"  precision@10 {label}={np.mean(scores):.2f}"
+    if exact is not None:
+        recall = np.mean([len(set(rows) & set(truth)) / max(len(truth), 1)
+                          for label in queries for rows, truth in zip(results[label], exact[label])])
+        line += f"  recall@10={recall:.3f}"
+    print(line)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--courses', type=int, default=20_000)
+    parser.add_argument('--projects', type=int, default=20_000)
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--n-probe', default='1,2,4,8,16,32', help="Comma-separated n_probe values.")
+    args = parser.parse_args()
+
+    setup_django()
+    import logging
+
+    from django.test.utils import override_settings
+    from core.course_index import CourseIndex, build_index
+    from core.embeddings import IVFIndex, LsaEmbedder, build_model
+
+    rows, topics, project_texts, shared, related = make_corpus(args.courses, args.projects)
+    queries = {'shared': shared[:args.queries], 'related': related[:args.queries]}
+    data_dir = tempfile.mkdtemp(prefix='semantic-')
+    logging.disable(logging.INFO)
+    try:
+        catalog = os.path.join(data_dir, 'courses.csv')
+        with open(catalog, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Title', 'Short Intro', 'URL', 'Created by'])
+            writer.writerows(rows)
+
+        with override_settings(COURSE_CATALOG_PATH=catalog, COURSE_INDEX_DIR=os.path.join(data_dir, 'index')):
+            tfidf = CourseIndex(build_index())
+
+            started = time.perf_counter()
+            course_texts = [f"{title} {intro}" for title, intro, _, _ in rows]
+            embedder = LsaEmbedder(build_model(os.path.join(data_dir, 'model'), texts=course_texts + project_texts))
+            fit = time.perf_counter() - started
+            started = time.perf_counter()
+            vectors = embedder.encode([f"{course.name} {course.description}" for course in tfidf.courses])
+            encode = time.perf_counter() - started
+            started = time.perf_counter()
+            ann = IVFIndex.build(np.arange(len(vectors)), vectors)
+            build = time.perf_counter() - started
+
+        print(f"{args.courses} courses, {args.projects} projects, {TOPICS} topics; LSA fit {fit:.1f}s, "
+              f"embedding {encode:.1f}s, IVF build {build:.1f}s ({ann.n_lists} lists, "
+              f"{ann.vectors.nbytes / 2**20:.1f}MB of {ann.vectors.dtype} vectors)")
+
+        run('tfidf', lambda text: [row for row, _ in tfidf.search(text, k=10)], queries, topics)
+
+        def embedding_search(n_probe):
+            return lambda text: [row for row, _ in ann.search(embedder.encode([text])[0], k=10, n_probe=n_probe)]
+
+        exact = run('embedding exact', embedding_search(ann.n_lists), queries, topics)
+        for n_probe in (int(n) for n in args.n_probe.split(',')):
+            if n_probe < ann.n_lists:
+                run(f'embedding ivf n_probe={n_probe}', embedding_search(n_probe), queries, topics, exact)
+    finally:
+        logging.disable(logging.NOTSET)
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+"""
+Settings for app servers started by the benchmarks: the regular settings
+against the scratch sqlite database named by ``BENCHMARK_DB``.
+"""
+import os
+
+from skillmatch.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ['BENCHMARK_DB'],
+    }
+}
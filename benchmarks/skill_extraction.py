@@ -0,0 +1,52 @@
+"""
+Throughput of the phrase-matcher skill extractor against the previous
+implementation (full spaCy pipeline + per-token list membership).
+
+    python -m benchmarks.skill_extraction [--words 800] [--repeat 50]
+"""
+import argparse
+
+from benchmarks import percentile, setup_django, timeit
+from benchmarks.synthetic import make_resume_text
+
+
+def legacy_extract_skills(nlp, text):
+    from core.skills import SKILL_KEYWORDS
+    doc = nlp(text.lower())
+    return [token.text for token in doc if token.text in SKILL_KEYWORDS]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--words', type=int, default=800)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    import spacy
+    from django.conf import settings
+    from core.nlp import get_skill_matcher
+
+    try:
+        full_nlp = spacy.load(settings.SPACY_MODEL)
+    except OSError:
+        full_nlp = spacy.blank("en")
+        print(f"note: {settings.SPACY_MODEL} is not installed, legacy numbers use a blank pipeline")
+    skill_matcher = get_skill_matcher()
+
+    text = make_resume_text(args.words)
+    legacy = timeit(lambda: legacy_extract_skills(full_nlp, text), args.repeat)
+    matcher = timeit(lambda: skill_matcher.extract(text), args.repeat)
+
+    print(f"resume: {args.words} words, {args.repeat} runs")
+    for name, latencies in (('legacy (full pipeline)', legacy), ('phrase matcher', matcher)):
+        total = sum(latencies)
+        print(f"{name:24s} p50={percentile(latencies, 50) * 1000:8.2f}ms "
+              f"p95={percentile(latencies, 95) * 1000:8.2f}ms "
+              f"throughput={args.repeat / total:8.1f} resumes/s")
+    print(f"legacy found {len(set(legacy_extract_skills(full_nlp, text)))} distinct skills, "
+          f"matcher found {len(set(skill_matcher.extract(text)))}")
+
+
+if __name__ == '__main__':
+    main()
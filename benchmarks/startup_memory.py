@@ -0,0 +1,141 @@
+"""
+Startup time and per-worker memory of the NLP / catalog loading.
+
+Startup: runs each variant in a fresh interpreter and reports the time to
+import the app, the time of the first skill extraction and peak RSS.
+
+    eager    -- previous behaviour: full spaCy pipeline + CSV read at import
+    lazy     -- current behaviour: nothing at import, tokenizer-only model on first use
+
+Workers: forks N workers the way gunicorn does, with and without loading
+in the parent first (``--preload``), and reports each worker's PSS and
+private memory from /proc (Linux only).
+
+    python -m benchmarks.startup_memory [--workers 4]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks import setup_django
+
+STARTUP_SNIPPET = r"""
+import json, resource, time
+started = time.perf_counter()
+from benchmarks import setup_django
+setup_django()
+import core.views
+if {eager!r}:
+    import pandas as pd, spacy
+    from django.conf import settings
+    try:
+        nlp = spacy.load(settings.SPACY_MODEL)
+    except OSError:
+        nlp = spacy.blank("en")
+    if __import__('os').path.exists(settings.COURSE_CATALOG_PATH):
+        pd.read_csv(settings.COURSE_CATALOG_PATH)
+imported = time.perf_counter()
+from core.utils import extract_skills
+extract_skills("python developer with machine learning and docker experience")
+first_call = time.perf_counter()
+print(json.dumps({{
+    'import_s': imported - started,
+    'first_extract_s': first_call - imported,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}}))
+"""
+
+
+def run_startup(eager):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run(
+        [sys.executable, '-c', STARTUP_SNIPPET.format(eager=eager)],
+        cwd=root, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def smaps_rollup(pid):
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[2] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return values
+
+
+def run_workers(n, preload):
+    from core import nlp
+    from core.utils import extract_skills, get_courses
+
+    if preload:
+        nlp.preload()
+
+    pids = []
+    reader, writer = os.pipe()
+    for _ in range(n):
+        pid = os.fork()
+        if pid == 0:
+            os.close(reader)
+            extract_skills("python developer with machine learning and docker experience")
+            get_courses(["python", "docker"])
+            os.write(writer, b'.')
+            os.close(writer)
+            # Stay alive until the parent has sampled our memory
+            signal_wait()
+        pids.append(pid)
+    os.close(writer)
+    ready = 0
+    while ready < n:
+        ready += len(os.read(reader, n))
+
+    samples = [smaps_rollup(pid) for pid in pids]
+    for pid in pids:
+        os.kill(pid, 15)
+        os.waitpid(pid, 0)
+    return {
+        'pss_mb': sum(s.get('Pss', 0) for s in samples) / n,
+        'private_mb': sum(s.get('Private_Dirty', 0) + s.get('Private_Clean', 0) for s in samples) / n,
+    }
+
+
+def signal_wait():
+    import signal
+    signal.signal(signal.SIGTERM, lambda *args: os._exit(0))
+    while True:
+        signal.pause()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    print("startup (fresh interpreter)")
+    for name, eager in (('eager', True), ('lazy', False)):
+        r = run_startup(eager)
+        print(f"  {name:6s} import={r['import_s']:6.2f}s first_extract={r['first_extract_s']:6.2f}s "
+              f"max_rss={r['max_rss_mb']:7.1f}MB")
+
+    if not os.path.exists('/proc/self/smaps_rollup'):
+        print("per-worker memory needs /proc/<pid>/smaps_rollup (Linux); skipped")
+        return
+
+    setup_django()
+    print(f"per-worker memory ({args.workers} forked workers)")
+    for preload in (False, True):
+        # Each run needs a parent that hasn't loaded anything yet
+        pid = os.fork()
+        if pid == 0:
+            r = run_workers(args.workers, preload)
+            print(f"  preload={str(preload):5s} pss/worker={r['pss_mb']:7.1f}MB "
+                  f"private/worker={r['private_mb']:7.1f}MB", flush=True)
+            os._exit(0)
+        os.waitpid(pid, 0)
+
+
+if __name__ == '__main__':
+    main()
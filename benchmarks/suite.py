@@ -0,0 +1,309 @@
+"""
+Regression suite for the matching and extraction pipeline.
+
+Every case runs at each requested scale against synthetic data: a resume
+of that many words (``extract_skills``; the PDF for
+``extract_text_from_pdf`` is cut at the PDF_EXTRACTION page cap), a course
+catalog and a project table of that many rows (``get_courses``,
+``match_projects`` and the ``dashboard`` view, whose Adzuna / GitHub
+calls go to a local stub). Each result has latency percentiles,
+sequential throughput and the tracemalloc peak of one call.
+
+Results can be compared with a JSON baseline; a case regresses when its
+fastest call or its peak memory grows by more than the tolerance (and by
+more than a small absolute amount, so microsecond noise doesn't count).
+The fastest call is compared rather than p50 because it is the most
+repeatable figure on a shared machine.
+Latencies are judged relative to a fixed calibration workload timed
+around each case, so a slower or busier machine than the one that
+recorded the baseline doesn't read as a regression.
+
+Run it through ``python manage.py benchmark``, which sets up a throwaway
+database; ``run()`` itself uses whatever database is configured.
+"""
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+
+from benchmarks import peak_bytes, percentile, timeit
+from benchmarks.dashboard_ttfb import SlowUpstream, start
+from benchmarks.synthetic import make_pdf, make_project_skills, make_projects, make_resume_text, write_course_catalog
+
+SCALES = {'1k': 1_000, '10k': 10_000, '100k': 100_000}
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+WORDS_PER_PAGE = 500
+
+# Changes smaller than these are noise, whatever the ratio
+MIN_DELTA = {'min_ms': 0.05, 'peak_kib': 64}
+
+
+class StubUpstream(SlowUpstream):
+    delay = 0  # answer at once; only our side of the calls is measured
+
+
+def parse_scale(value):
+    """'10k' -> 10000; plain numbers are accepted too."""
+    if value in SCALES:
+        return SCALES[value]
+    return int(value)
+
+
+def scale_label(count):
+    for label, value in SCALES.items():
+        if value == count:
+            return label
+    return str(count)
+
+
+class Fixture:
+    """Synthetic data for one scale: course catalog, projects, a logged-in user and stubbed upstreams."""
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.queries = [", ".join(skills) for skills in make_project_skills(1000, seed=1)]
+
+    def __enter__(self):
+        from django.conf import settings
+        from django.contrib.auth.models import User
+        from django.test import Client
+        from django.test.utils import override_settings
+        from core import utils
+        from core.course_index import reset_course_index
+        from core.models import Project, UserProfile
+        from core.project_index import index_missing_projects, reset_project_index
+
+        self.data_dir = tempfile.mkdtemp(prefix='benchmark-')
+        catalog = os.path.join(self.data_dir, 'courses.csv')
+        write_course_catalog(catalog, self.scale)
+
+        Project.objects.all().delete()
+        Project.objects.bulk_create(make_projects(self.scale), batch_size=5000)
+        index_missing_projects()
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubUpstream)
+        server.daemon_threads = True
+        self.upstream = start(server)
+        self._patched = {'ADZUNA_BASE_URL': utils.ADZUNA_BASE_URL, 'GITHUB_API_URL': utils.GITHUB_API_URL}
+        utils.ADZUNA_BASE_URL = f"http://127.0.0.1:{self.upstream.server_port}/jobs"
+        utils.GITHUB_API_URL = f"http://127.0.0.1:{self.upstream.server_port}"
+
+        self.settings = override_settings(
+            COURSE_CATALOG_PATH=catalog,
+            COURSE_INDEX_DIR=os.path.join(self.data_dir, 'index'),
+            LOOKUP_CACHE={**settings.LOOKUP_CACHE, 'ENABLED': False},
+            DASHBOARD_CACHE={**settings.DASHBOARD_CACHE, 'ENABLED': False},
+            DASHBOARD_LAZY_SECTIONS=[],
+        )
+        self.settings.enable()
+        reset_course_index()
+        reset_project_index()
+
+        user, _ = User.objects.get_or_create(username='benchmark')
+        UserProfile.objects.update_or_create(user=user, defaults={'skills': 'python, django, docker, machine learning'})
+        self.client = Client()
+        self.client.force_login(user)
+        return self
+
+    def __exit__(self, *exc):
+        from core import utils
+        from core.course_index import reset_course_index
+        from core.project_index import reset_project_index
+
+        self.settings.disable()
+        for name, value in self._patched.items():
+            setattr(utils, name, value)
+        self.upstream.shutdown()
+        self.upstream.server_close()
+        reset_course_index()
+        reset_project_index()
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+
+# Each case takes the fixture and returns ``(call, setup)``: ``call`` is timed, ``setup`` (or None) runs before each call
+
+def case_extract_skills(fixture):
+    from core.utils import extract_skills
+
+    text = make_resume_text(fixture.scale)
+    return lambda: extract_skills(text), None
+
+
+def case_extract_text_from_pdf(fixture):
+    from django.conf import settings
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from core.models import ResumeCache
+    from core.utils import extract_text_from_pdf
+
+    # Only the pages up to the cap are ever read, so don't build the rest
+    pages = min(-(-fixture.scale // WORDS_PER_PAGE), settings.PDF_EXTRACTION['MAX_PAGES'] + 1)
+    text = make_resume_text(pages * WORDS_PER_PAGE)
+    words = text.split()
+    upload = SimpleUploadedFile('resume.pdf', make_pdf([
+        " ".join(words[i:i + WORDS_PER_PAGE]) for i in range(0, len(words), WORDS_PER_PAGE)
+    ]), content_type='application/pdf')
+
+    def setup():
+        ResumeCache.objects.all().delete()  # the text would be served from the content-hash cache
+        upload.seek(0)
+
+    return lambda: extract_text_from_pdf(upload), setup
+
+
+def case_get_courses(fixture):
+    from core.utils import get_courses
+
+    queries = itertools.cycle(fixture.queries)
+    return lambda: get_courses(next(queries)), None
+
+
+def case_match_projects(fixture):
+    from core.utils import match_projects
+
+    queries = itertools.cycle(fixture.queries)
+    return lambda: match_projects(next(queries)), None
+
+
+def case_dashboard(fixture):
+    from django.urls import reverse
+
+    url = reverse('dashboard')
+
+    def call():
+        response = fixture.client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"dashboard answered {response.status_code}")
+
+    return call, None
+
+
+CASES = {
+    'extract_skills': case_extract_skills,
+    'extract_text_from_pdf': case_extract_text_from_pdf,
+    'get_courses': case_get_courses,
+    'match_projects': case_match_projects,
+    'dashboard': case_dashboard,
+}
+
+
+def calibrate(repeat=5):
+    """Median milliseconds of a fixed Python + numpy workload: how fast this machine is right now."""
+    values = [random.Random(0).random() for _ in range(100_000)]
+    array = np.random.default_rng(0).random(500_000)
+
+    def work():
+        sorted(values)
+        {str(i): i for i in range(20_000)}
+        np.sort(array)
+
+    return percentile(timeit(work, repeat), 50) * 1000
+
+
+def measure(call, setup=None, repeat=50, budget=None, memory_repeat=5):
+    """
+    Times up to ``repeat`` calls (fewer if ``budget`` seconds run out, but
+    at least five) after one warm-up call; returns the result entry.
+    """
+    if setup is not None:
+        setup()
+    call()
+    calibration = calibrate()
+
+    latencies = []
+    deadline = time.perf_counter() + budget if budget else None
+    while len(latencies) < repeat:
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        call()
+        latencies.append(time.perf_counter() - started)
+        if deadline is not None and time.perf_counter() > deadline and len(latencies) >= 5:
+            break
+
+    return {
+        'calibration_ms': (calibration + calibrate()) / 2,
+        'samples': len(latencies),
+        'min_ms': min(latencies) * 1000,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'ops_per_s': len(latencies) / sum(latencies),
+        'peak_kib': peak_bytes(call, repeat=min(memory_repeat, len(latencies)), setup=setup) / 1024,
+    }
+
+
+def run(cases=None, scales=(1_000,), repeat=50, budget=10.0, report=None):
+    """
+    Runs ``cases`` (names from CASES; all by default) at every scale and
+    returns ``{"<case>@<scale>": entry}``. ``report(key, entry)`` is
+    called as each result comes in.
+    """
+    results = {}
+    # Per-request log lines would be part of the measurement
+    logging.disable(logging.INFO)
+    try:
+        for scale in scales:
+            with Fixture(scale) as fixture:
+                for name in cases or CASES:
+                    call, setup = CASES[name](fixture)
+                    key = f"{name}@{scale_label(scale)}"
+                    results[key] = measure(call, setup, repeat=repeat, budget=budget)
+                    if report is not None:
+                        report(key, results[key])
+    finally:
+        logging.disable(logging.NOTSET)
+    return results
+
+
+def expected(entry, before, metric):
+    """The baseline value of ``metric``, latencies scaled to the current machine speed."""
+    if metric.endswith('_ms'):
+        return before[metric] * entry['calibration_ms'] / before['calibration_ms']
+    return before[metric]
+
+
+def compare(results, baseline, tolerance):
+    """
+    Returns ``(key, metric, expected value, current value)`` for every
+    metric that grew by more than ``tolerance`` (a ratio) over the baseline.
+    """
+    regressions = []
+    for key, entry in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        for metric, min_delta in MIN_DELTA.items():
+            old, new = expected(entry, before, metric), entry[metric]
+            if new > old * (1 + tolerance) and new - old > min_delta:
+                regressions.append((key, metric, old, new))
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def write_results(path, results, repeat):
+    document = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'machine': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'repeat': repeat,
+        'results': {key: {metric: round(value, 4) for metric, value in entry.items()} for key, entry in results.items()},
+    }
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,98 @@
+"""
+Synthetic inputs for the benchmarks.
+"""
+import random
+
+FILLER = (
+    "experienced engineer responsible for designing building and shipping services "
+    "worked with cross functional teams mentoring stakeholders delivering features "
+    "on time improved reliability reduced costs led migration projects"
+).split()
+SKILL_PHRASES = [
+    "Python", "Django", "machine learning", "React", "Docker", "k8s", "sklearn",
+    "REST API", "big data", "PostgreSQL", "Spark", "data analysis", "AWS", "Node.js",
+]
+
+
+def make_resume_text(words, seed=0):
+    rng = random.Random(seed)
+    out = []
+    while len(out) < words:
+        out.extend(rng.choice(FILLER) for _ in range(rng.randint(5, 15)))
+        out.append(rng.choice(SKILL_PHRASES) + ",")
+    return " ".join(out)
+
+
+def make_pdf(pages):
+    """Builds a PDF with one page per string in ``pages`` (one line of text per 80 characters)."""
+    count = len(pages)
+    font = 3 + 2 * count
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % (3 + 2 * i) for i in range(count)), count),
+    ]
+    for i, text in enumerate(pages):
+        lines = [text[j:j + 80].replace('(', '').replace(')', '') for j in range(0, len(text), 80)]
+        body = " ".join(f"({line}) Tj 0 -14 Td" for line in lines[:50])
+        stream = f"BT /F1 10 Tf 50 760 Td {body} ET".encode()
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (4 + 2 * i, font))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+def make_project_skills(count, seed=0):
+    """``count`` lists of 2-6 canonical skills, skewed towards the common ones."""
+    from core.skills import SKILL_KEYWORDS
+
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(SKILL_KEYWORDS))]
+    return [
+        sorted(set(rng.choices(SKILL_KEYWORDS, weights=weights, k=rng.randint(2, 6))))
+        for _ in range(count)
+    ]
+
+
+def make_profile_rows(count, seed=0):
+    """``(profile_id, skills, interests)`` rows shaped like UserProfile text columns."""
+    rng = random.Random(seed)
+    return [
+        (pk, ", ".join(skills), " ".join(rng.choices(FILLER, k=rng.randint(0, 8))))
+        for pk, skills in enumerate(make_project_skills(count, seed), start=1)
+    ]
+
+
+def write_course_catalog(path, count, seed=0):
+    """Writes a course catalog CSV (the columns of Online_Courses.csv) with ``count`` courses."""
+    import csv
+
+    rng = random.Random(seed)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Title', 'Short Intro', 'URL', 'Created by'])
+        for i in range(count):
+            skills = rng.sample(SKILL_PHRASES, rng.randint(1, 3))
+            title = f"{' and '.join(skills)} {rng.choice(['Fundamentals', 'Bootcamp', 'in Practice', 'Masterclass'])}"
+            intro = " ".join(rng.choices(FILLER, k=rng.randint(8, 20)) + [s.lower() for s in skills])
+            writer.writerow([title, intro, f"https://example.com/courses/{i}", f"Instructor {i % 97}"])
+
+
+def make_projects(count, seed=0):
+    """Unsaved ``Project`` rows whose required skills come from ``make_project_skills``."""
+    from core.models import Project
+
+    return [
+        Project(title=f"Project {i}", description="synthetic", required_skills=", ".join(skills))
+        for i, skills in enumerate(make_project_skills(count, seed))
+    ]
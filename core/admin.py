@@ -1,3 +1,16 @@
 from django.contrib import admin
 
+from .models import Skill, SkillAlias
+
+
 # Register your models here.
+class SkillAliasInline(admin.TabularInline):
+    model = SkillAlias
+    extra = 1
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    """The curated skill vocabulary: the only place, besides migrations, that adds skills."""
+    search_fields = ['name', 'aliases__alias']
+    inlines = [SkillAliasInline]
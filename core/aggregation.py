@@ -0,0 +1,148 @@
+"""
+Concurrent fan-out for the independent lookups behind the dashboard.
+
+Each source runs on a bounded thread pool of its own so the page waits
+for the slowest source instead of the sum of all of them. A source that
+misses its own timeout, the overall deadline, or raises is reported as
+unavailable and the page renders without it. Its call keeps running in
+the background, so an upstream that hangs across many requests can tie
+up at most its own pool's threads: the other sources keep being
+answered, and calls of the hung source still queued when their request
+gives up are dropped.
+
+The async views use ``agather_sources`` instead, which awaits coroutine
+sources on the event loop, and ``run_cpu_bound`` to push CPU-heavy work
+(course ranking, skill matching) onto a small bounded thread pool.
+
+Pool threads outlive the requests they serve, so Django's per-request
+connection cleanup never runs on them: a source that queries the
+database (the local job index, the project index) has its connection
+closed by ``close_old_connections`` around each call instead.
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+_cpu_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_CPU_WORKERS,
+    thread_name_prefix='async-cpu',
+)
+
+
+def _run_in_pool(context, fn, *args):
+    """Runs ``fn(*args)`` in ``context`` on a pool thread, as a request would for its connections."""
+    close_old_connections()
+    try:
+        return context.run(fn, *args)
+    finally:
+        close_old_connections()
+
+
+def _executor(name):
+    """The pool for the source ``name``, created on first use."""
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=settings.DASHBOARD_FANOUT_WORKERS,
+                thread_name_prefix=f'dashboard-fanout-{name}',
+            )
+        return _executors[name]
+
+
+def reset_executors():
+    """Drops the per-source pools (tests); calls still running finish on their own."""
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def gather_sources(sources, timeouts=None, deadline=None):
+    """
+    Runs every callable in ``sources`` (name -> zero-argument callable)
+    concurrently.
+
+    ``timeouts`` maps a source name to its own limit in seconds and
+    ``deadline`` caps the whole call. Returns ``(results, unavailable)``:
+    the values of the sources that finished in time, and the set of
+    names that did not.
+    """
+    timeouts = timeouts or {}
+    if deadline is None:
+        deadline = settings.DASHBOARD_DEADLINE
+
+    started = time.monotonic()
+    # Each source runs in a copy of our context, so its timing spans count towards this request
+    futures = {name: _executor(name).submit(_run_in_pool, contextvars.copy_context(), fn)
+               for name, fn in sources.items()}
+
+    results = {}
+    unavailable = set()
+    for name, future in futures.items():
+        limit = min(timeouts.get(name, deadline), deadline)
+        remaining = max(started + limit - time.monotonic(), 0)
+        try:
+            results[name] = future.result(timeout=remaining)
+        except TimeoutError:
+            # A running call finishes in the background; one still queued behind it is dropped
+            future.cancel()
+            unavailable.add(name)
+            logger.warning(f"Dashboard source '{name}' timed out after {limit:.1f}s")
+        except Exception as e:
+            unavailable.add(name)
+            logger.error(f"Dashboard source '{name}' failed: {e}")
+
+    logger.info(f"Dashboard sources gathered in {time.monotonic() - started:.3f}s "
+                f"(unavailable: {sorted(unavailable) or 'none'})")
+    return results, unavailable
+
+
+async def agather_sources(sources, timeouts=None, deadline=None):
+    """
+    ``gather_sources`` for the async views: ``sources`` maps a name to a
+    zero-argument coroutine function. Sources that run out of time are
+    cancelled rather than left running.
+    """
+    timeouts = timeouts or {}
+    if deadline is None:
+        deadline = settings.DASHBOARD_DEADLINE
+
+    started = time.monotonic()
+    tasks = {name: asyncio.ensure_future(fn()) for name, fn in sources.items()}
+
+    results = {}
+    unavailable = set()
+    for name, task in tasks.items():
+        limit = min(timeouts.get(name, deadline), deadline)
+        remaining = max(started + limit - time.monotonic(), 0)
+        try:
+            results[name] = await asyncio.wait_for(task, timeout=remaining)
+        except asyncio.TimeoutError:
+            unavailable.add(name)
+            logger.warning(f"Dashboard source '{name}' timed out after {limit:.1f}s")
+        except Exception as e:
+            unavailable.add(name)
+            logger.error(f"Dashboard source '{name}' failed: {e}")
+
+    logger.info(f"Dashboard sources gathered in {time.monotonic() - started:.3f}s "
+                f"(unavailable: {sorted(unavailable) or 'none'})")
+    return results, unavailable
+
+
+async def run_cpu_bound(fn, *args):
+    """Runs ``fn(*args)`` on the bounded CPU pool so the event loop keeps serving other requests."""
+    call = functools.partial(_run_in_pool, contextvars.copy_context(), fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(_cpu_executor, call)
@@ -0,0 +1,93 @@
+"""
+Recruiter-facing REST API (Django REST Framework).
+"""
+import base64
+import json
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import BasePermission
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .candidate_index import QueryError, get_candidate_index
+from .models import UserProfile
+
+
+class CanSearchCandidates(BasePermission):
+    """Staff, or users granted the ``core.search_candidates`` permission."""
+
+    def has_permission(self, request, view):
+        user = request.user
+        return bool(user and user.is_authenticated and (user.is_staff or user.has_perm('core.search_candidates')))
+
+
+class CandidateSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username')
+    skills = serializers.SerializerMethodField()
+    score = serializers.FloatField(source='search_score')
+
+    class Meta:
+        model = UserProfile
+        fields = ['id', 'username', 'skills', 'interests', 'availability', 'linkedin_url', 'github_url', 'score']
+
+    def get_skills(self, profile):
+        return [s.strip() for s in (profile.skills or '').split(",") if s.strip()]
+
+
+def encode_cursor(score, profile_id):
+    payload = json.dumps({'s': score, 'id': profile_id}).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(payload['s']), int(payload['id'])
+    except (ValueError, TypeError, KeyError):
+        raise QueryError("Invalid cursor.")
+
+
+@api_view(['GET'])
+@permission_classes([CanSearchCandidates])
+def candidate_search(request):
+    """
+    Searches profiles by skills and interests, best match first.
+
+    ``q`` is a boolean query (``python (docker OR k8s) NOT java``);
+    ``page_size`` defaults to ``CANDIDATE_SEARCH['PAGE_SIZE']`` and the
+    ``next`` URL carries a cursor for the following page.
+    """
+    conf = settings.CANDIDATE_SEARCH
+    try:
+        page_size = min(int(request.query_params.get('page_size', conf['PAGE_SIZE'])), conf['MAX_PAGE_SIZE'])
+    except ValueError:
+        return Response({'detail': "page_size must be an integer."}, status=400)
+    page_size = max(page_size, 1)
+
+    try:
+        cursor = request.query_params.get('cursor')
+        after = decode_cursor(cursor) if cursor else None
+        # One extra result tells us whether there is a next page
+        ranked = get_candidate_index().search(request.query_params.get('q', ''), limit=page_size + 1, after=after)
+    except QueryError as e:
+        return Response({'detail': str(e)}, status=400)
+
+    page, more = ranked[:page_size], len(ranked) > page_size
+    profiles = UserProfile.objects.select_related('user').in_bulk([pk for pk, _ in page])
+    results = []
+    for pk, score in page:
+        profile = profiles.get(pk)
+        if profile is not None:  # deleted since it was indexed
+            profile.search_score = score
+            results.append(profile)
+
+    next_url = None
+    if more:
+        last_id, last_score = page[-1]
+        next_url = replace_query_param(request.build_absolute_uri(), 'cursor', encode_cursor(last_score, last_id))
+    return Response({
+        'next': next_url,
+        'results': CandidateSerializer(results, many=True).data,
+    })
@@ -0,0 +1,101 @@
+"""
+Async counterpart of ``core.http_client`` for the ASGI deployment.
+
+``AsyncUpstreamClient`` applies the same timeouts, retries, rate-limit
+handling and metrics as ``UpstreamClient`` over a pooled
+``httpx.AsyncClient``, and shares the sync client's circuit breaker, so
+both deployments back off from a failing upstream together.
+
+An ``httpx.AsyncClient`` is bound to the event loop it was first used
+on, so clients are kept per loop (one loop per uvicorn worker).
+"""
+import asyncio
+import logging
+import threading
+import time
+import weakref
+
+import httpx
+from django.conf import settings
+
+from .http_client import CircuitOpenError, UpstreamClient, get_client
+from .instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+# What AsyncUpstreamClient.get raises when there is no response to look at
+UPSTREAM_ERRORS = (httpx.TransportError, CircuitOpenError)
+
+
+class AsyncUpstreamClient(UpstreamClient):
+    def make_session(self, pool_maxsize):
+        connect_timeout, read_timeout = self.timeout
+        return httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize),
+        )
+
+    async def get(self, url, **kwargs):
+        """
+        GET ``url``; see ``UpstreamClient.get``. Raises
+        ``httpx.TransportError`` / ``CircuitOpenError``.
+        """
+        with span(f'upstream.{self.name}'):
+            return await self._get(url, **kwargs)
+
+    async def _get(self, url, **kwargs):
+        self.check_breaker()
+        try:
+            response = await self._attempts(url, **kwargs)
+        except BaseException:
+            # Including cancellation by the dashboard deadline, so a half-open trial still settles
+            self.breaker.record_failure()
+            raise
+        self.record_outcome(response)
+        return response
+
+    async def _attempts(self, url, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = await self.session.get(url, **kwargs)
+            except httpx.TransportError as e:
+                reason = 'timeout' if isinstance(e, httpx.TimeoutException) else 'connection'
+                self.record_error(started, reason)
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"{self.name} request failed ({reason}), retrying: {e}")
+                await asyncio.sleep(self.backoff(attempt))
+                continue
+
+            delay = self.retry_delay(started, response, attempt)
+            if delay is None:
+                return response
+            await asyncio.sleep(delay)
+
+    async def aclose(self):
+        await self.session.aclose()
+
+
+_clients = weakref.WeakKeyDictionary()  # event loop -> {name: client}
+_clients_lock = threading.Lock()
+
+
+def get_async_client(name):
+    """The shared async client for an upstream on the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        clients = _clients.setdefault(loop, {})
+        if name not in clients:
+            conf = settings.UPSTREAM_HTTP
+            clients[name] = AsyncUpstreamClient(
+                name,
+                connect_timeout=conf['CONNECT_TIMEOUT'],
+                read_timeout=conf['READ_TIMEOUT'],
+                max_retries=conf['MAX_RETRIES'],
+                backoff_factor=conf['BACKOFF_FACTOR'],
+                max_retry_wait=conf['MAX_RETRY_WAIT'],
+                pool_maxsize=conf['POOL_MAXSIZE'],
+                breaker=get_client(name).breaker,
+            )
+        return clients[name]
@@ -0,0 +1,92 @@
+"""
+Async versions of the dashboard views, routed instead of the sync ones
+when ``ASYNC_VIEWS`` is on (the default under skillmatch/asgi.py).
+
+Adzuna and GitHub are called through the pooled httpx client, the ORM
+through Django's async API, and course ranking runs on the bounded CPU
+pool, so one ASGI worker keeps serving other users while dashboards
+wait on the upstreams. Templates, context and caching are shared with
+core/views.py.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from django.template.loader import render_to_string
+
+from .aggregation import agather_sources, run_cpu_bound
+from .dashboard_cache import aget_dashboard
+from .instrumentation import span
+from .models import Recommendation, UserProfile
+from .recommendations import stored_recommendations
+from .utils import afetch_open_source_projects, afetch_real_time_jobs, get_courses, match_projects
+from .views import SECTION_CONTEXT, dashboard_sections, format_jobs, section_cache_context
+
+
+async def profile_for(request):
+    user = await request.auser()
+    # select_related also fills user.userprofile, which base.html reads
+    user_profile = await UserProfile.objects.select_related('user').aget(user=user)
+    # The templates' auth context reads request.user; don't let it query synchronously
+    request.user = user_profile.user
+    return user_profile
+
+
+@login_required
+async def dashboard(request):
+    user_profile = await profile_for(request)
+    sections, lazy_sections = dashboard_sections()
+    payload, version = await aget_dashboard(user_profile, lambda: dashboard_payload(user_profile, sections))
+    resume_job = await user_profile.resume_jobs.afirst()
+
+    with span('template'):
+        return render(request, 'core/dashboard.html', {
+            **payload,
+            **section_cache_context(payload, version),
+            'resume_job': resume_job,
+            'lazy_sections': lazy_sections,
+        })
+
+
+@login_required
+async def dashboard_section(request, name):
+    if name not in SECTION_CONTEXT:
+        raise Http404("Unknown dashboard section.")
+    user_profile = await profile_for(request)
+    payload, version = await aget_dashboard(user_profile, lambda: dashboard_payload(user_profile, [name]), part=name)
+    with span('template'):
+        html = render_to_string(f'core/dashboard_sections/{name}.html', {
+            **payload,
+            **section_cache_context(payload, version),
+        }, request=request)
+    return JsonResponse({'section': name, 'available': not payload['unavailable'], 'html': html})
+
+
+async def dashboard_payload(user_profile, sections):
+    """``views.dashboard_payload`` with the upstream calls awaited concurrently."""
+    skills = user_profile.skills
+    payload = {}
+
+    # Both read the database (and the project index may rebuild from it), so they run as sync ORM code
+    stored = await sync_to_async(stored_recommendations)(user_profile) if {'projects', 'courses'} & set(sections) else {}
+    if 'projects' in sections:
+        payload['projects'] = stored.get(Recommendation.PROJECT) or await sync_to_async(match_projects)(skills)
+
+    async def jobs():
+        return format_jobs(await afetch_real_time_jobs(skills))
+
+    sources = {
+        'jobs': jobs,
+        'open_source': lambda: afetch_open_source_projects(skills),
+        'courses': lambda: run_cpu_bound(get_courses, skills),
+    }
+    sources = {name: fn for name, fn in sources.items() if name in sections}
+    if 'courses' in sources and Recommendation.COURSE in stored:
+        del sources['courses']
+        payload['courses'] = stored[Recommendation.COURSE]
+    results, unavailable = await agather_sources(sources, timeouts=settings.DASHBOARD_SOURCE_TIMEOUTS)
+    for name in sources:
+        payload[SECTION_CONTEXT[name]] = results.get(name, [])
+    payload['unavailable'] = unavailable
+    return payload
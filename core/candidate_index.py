@@ -0,0 +1,440 @@
+"""
+In-memory inverted index over profile skills and interests, used by the
+recruiter candidate search API.
+
+Each profile is a document whose terms are its canonical skills (whole
+phrases such as "machine learning", aliases resolved) plus the words of
+its interests. Postings are numpy arrays of document ordinals, term
+frequencies and precomputed BM25 term-frequency impacts, so boolean
+queries are mask operations and scoring is one scaled scatter-add per
+query term.
+
+Updates are incremental: a saved profile tombstones its old document and
+is appended as a new one to a small pending segment that queries read
+alongside the main postings; once the pending segment (or the number of
+tombstones) grows past ``CANDIDATE_SEARCH['COMPACT_AFTER']`` it is
+merged in. Saves and deletes in this process apply immediately; other
+processes' changes are picked up every ``CHECK_INTERVAL`` seconds through
+``UserProfile.updated_at``.
+
+Query syntax: terms, "quoted phrases", AND / OR / NOT (any case) and
+parentheses. Terms next to each other are ANDed:
+
+    python (docker OR k8s) NOT java
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .models import SkillAlias, UserProfile
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+QUERY_TOKEN_RE = re.compile(r'\(|\)|"[^"]*"|[^\s()"]+')
+OPERATORS = {'AND', 'OR', 'NOT'}
+_EMPTY = (np.zeros(0, np.int32), np.zeros(0, np.float32), np.zeros(0, np.float32))
+
+
+class QueryError(ValueError):
+    pass
+
+
+def _words(text):
+    return [word.rstrip('.') for word in WORD_RE.findall((text or '').lower())]
+
+
+class CandidateIndex:
+    """BM25-ranked boolean search over profiles. Writers take a lock; readers don't."""
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, aliases=None, compact_after=None):
+        self.aliases = aliases or {}
+        self.compact_after = compact_after or settings.CANDIDATE_SEARCH['COMPACT_AFTER']
+        self.size = 0                      # ordinals handed out so far
+        self.profile_ids = np.zeros(0, dtype=np.int64)
+        self.live = np.zeros(0, dtype=bool)
+        self.doc_len = np.zeros(0, dtype=np.float32)
+        self.doc_hash = np.zeros(0, dtype=np.int64)
+        self.ordinals = {}                 # profile pk -> ordinal
+        self.postings = {}                 # term -> (ordinals int32, tfs float32, BM25 impacts float32)
+        self.pending = defaultdict(list)   # term -> [(ordinal, tf)], merged on compaction
+        self.pending_count = 0
+        self.dead = 0
+        self.total_len = 0.0
+        self.avg_len = 1.0                 # as of the last build/compaction; impacts use it
+        self._lock = threading.RLock()
+
+    # -- building / updating -------------------------------------------------
+
+    def normalize(self, term):
+        term = term.strip().lower()
+        return self.aliases.get(term, term)
+
+    def terms(self, skills, interests):
+        terms = Counter(self.normalize(s) for s in (skills or '').split(",") if s.strip())
+        terms.update(self.normalize(word) for word in _words(interests))
+        return terms
+
+    @classmethod
+    def build(cls, rows, **kwargs):
+        """Builds an index from ``(profile_id, skills, interests)`` rows."""
+        index = cls(**kwargs)
+        ids, lengths, hashes = [], [], []
+        postings = defaultdict(lambda: ([], []))
+        for ordinal, (pk, skills, interests) in enumerate(rows):
+            terms = index.terms(skills, interests)
+            ids.append(pk)
+            lengths.append(sum(terms.values()))
+            hashes.append(hash((skills, interests)))
+            for term, tf in terms.items():
+                entry = postings[term]
+                entry[0].append(ordinal)
+                entry[1].append(tf)
+
+        index.size = len(ids)
+        index.profile_ids = np.array(ids, dtype=np.int64)
+        index.live = np.ones(index.size, dtype=bool)
+        index.doc_len = np.array(lengths, dtype=np.float32)
+        index.doc_hash = np.array(hashes, dtype=np.int64)
+        index.ordinals = {pk: ordinal for ordinal, pk in enumerate(ids)}
+        index.total_len = float(index.doc_len.sum())
+        index.avg_len = index.total_len / index.size if index.size else 1.0
+        index.postings = {}
+        for term, (ordinals, tfs) in postings.items():
+            ordinals, tfs = np.array(ordinals, dtype=np.int32), np.array(tfs, dtype=np.float32)
+            index.postings[term] = (ordinals, tfs, index._impacts(ordinals, tfs))
+        return index
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def _impacts(self, ordinals, tfs):
+        """The term-frequency part of BM25, which only changes with ``avg_len``."""
+        norm = self.K1 * (1 - self.B + self.B * self.doc_len[ordinals] / self.avg_len)
+        return (tfs * (self.K1 + 1) / (tfs + norm)).astype(np.float32)
+
+    def add(self, profile_id, skills, interests):
+        """Indexes (or re-indexes) a profile; unchanged profiles are left alone."""
+        signature = hash((skills, interests))
+        with self._lock:
+            ordinal = self.ordinals.get(profile_id)
+            if ordinal is not None and self.doc_hash[ordinal] == signature:
+                return
+            self._remove(profile_id)
+            terms = self.terms(skills, interests)
+            ordinal = self._allocate(profile_id, sum(terms.values()), signature)
+            for term, tf in terms.items():
+                self.pending[term].append((ordinal, tf))
+            self.pending_count += len(terms)
+            self._maybe_compact()
+
+    def remove(self, profile_id):
+        with self._lock:
+            self._remove(profile_id)
+            self._maybe_compact()
+
+    def _remove(self, profile_id):
+        ordinal = self.ordinals.pop(profile_id, None)
+        if ordinal is not None:
+            self.live[ordinal] = False
+            self.total_len -= float(self.doc_len[ordinal])
+            self.dead += 1
+
+    def _allocate(self, profile_id, length, signature):
+        if self.size == len(self.live):
+            capacity = max(1024, 2 * self.size)
+            self.profile_ids = np.resize(self.profile_ids, capacity)
+            self.doc_len = np.resize(self.doc_len, capacity)
+            self.doc_hash = np.resize(self.doc_hash, capacity)
+            live = np.zeros(capacity, dtype=bool)
+            live[:self.size] = self.live[:self.size]
+            self.live = live
+        ordinal = self.size
+        self.profile_ids[ordinal] = profile_id
+        self.doc_len[ordinal] = length
+        self.doc_hash[ordinal] = signature
+        self.live[ordinal] = True
+        self.size += 1
+        self.ordinals[profile_id] = ordinal
+        self.total_len += length
+        return ordinal
+
+    def _maybe_compact(self):
+        if self.pending_count + self.dead >= self.compact_after:
+            self.compact()
+
+    def compact(self):
+        """
+        Merges the pending segment into the main postings, drops tombstoned
+        entries and recomputes the impacts for the current average length.
+        """
+        with self._lock:
+            live = self.live
+            count = len(self.ordinals)
+            self.avg_len = self.total_len / count if count else 1.0
+            postings = {}
+            for term in set(self.postings) | set(self.pending):
+                ordinals, tfs, _ = self.postings.get(term, _EMPTY)
+                extra = self.pending.get(term)
+                if extra:
+                    ordinals = np.concatenate([ordinals, np.array([o for o, _ in extra], dtype=np.int32)])
+                    tfs = np.concatenate([tfs, np.array([tf for _, tf in extra], dtype=np.float32)])
+                keep = live[ordinals]
+                if not keep.all():
+                    ordinals, tfs = ordinals[keep], tfs[keep]
+                if len(ordinals):
+                    postings[term] = (ordinals, tfs, self._impacts(ordinals, tfs))
+            self.postings = postings
+            self.pending = defaultdict(list)
+            self.pending_count = 0
+            self.dead = 0
+
+    # -- querying ------------------------------------------------------------
+
+    def term_postings(self, term, size=None):
+        """
+        Live ``(ordinals, impacts)`` for a term, main and pending segments
+        combined; pending documents at or past ``size`` are left out.
+        """
+        ordinals, _, impacts = self.postings.get(term, _EMPTY)
+        with self._lock:
+            extra = [(o, tf) for o, tf in self.pending.get(term, ()) if size is None or o < size]
+            dead = self.dead
+        if extra:
+            extra_ordinals = np.array([o for o, _ in extra], dtype=np.int32)
+            extra_tfs = np.array([tf for _, tf in extra], dtype=np.float32)
+            ordinals = np.concatenate([ordinals, extra_ordinals])
+            impacts = np.concatenate([impacts, self._impacts(extra_ordinals, extra_tfs)])
+        if dead:
+            # Tombstoned documents stay in the postings until the next compaction
+            keep = self.live[ordinals]
+            ordinals, impacts = ordinals[keep], impacts[keep]
+        return ordinals, impacts
+
+    def search(self, query, limit=20, after=None):
+        """
+        Returns up to ``limit`` ``(profile_id, score)`` pairs for a boolean
+        query, by descending BM25 score then profile id. ``after`` is the
+        ``(score, profile_id)`` of the last result of the previous page.
+        """
+        tree = parse_query(query, self.normalize)
+        size = self.size
+        cache = {}
+
+        def postings(term):
+            if term not in cache:
+                cache[term] = self.term_postings(term, size)
+            return cache[term]
+
+        live = self.live[:size]
+        mask = self._evaluate(tree, postings, size, live)
+        candidates = np.flatnonzero(mask)
+        if not len(candidates):
+            return []
+
+        scores = np.zeros(size, dtype=np.float32)
+        count = len(self)
+        for term in set(positive_terms(tree)):
+            ordinals, impacts = postings(term)
+            if len(ordinals):
+                df = len(ordinals)
+                scores[ordinals] += np.float32(math.log(1 + (count - df + 0.5) / (df + 0.5))) * impacts
+
+        candidate_scores = scores[candidates]
+        if after is not None:
+            after_score, after_id = np.float32(after[0]), after[1]
+            keep = candidate_scores < after_score
+            tied = np.flatnonzero(candidate_scores == after_score)
+            keep[tied] = self.profile_ids[candidates[tied]] > after_id
+            candidates, candidate_scores = candidates[keep], candidate_scores[keep]
+
+        if len(candidates) > limit:
+            # Everything above the limit-th best score, then ties broken by profile id
+            kth = np.partition(candidate_scores, len(candidate_scores) - limit)[len(candidate_scores) - limit]
+            above = np.flatnonzero(candidate_scores > kth)
+            ties = np.flatnonzero(candidate_scores == kth)
+            ties = ties[np.argsort(self.profile_ids[candidates[ties]], kind='stable')][:limit - len(above)]
+            chosen = np.concatenate([above, ties])
+            candidates, candidate_scores = candidates[chosen], candidate_scores[chosen]
+
+        candidate_ids = self.profile_ids[candidates]
+        order = np.lexsort((candidate_ids, -candidate_scores))
+        return [(int(candidate_ids[i]), float(candidate_scores[i])) for i in order]
+
+    def _evaluate(self, node, postings, size, live):
+        kind = node[0]
+        if kind == 'term':
+            # Postings only hold live documents
+            mask = np.zeros(size, dtype=bool)
+            mask[postings(node[1])[0]] = True
+            return mask
+        if kind == 'not':
+            return ~self._evaluate(node[1], postings, size, live) & live
+        masks = [self._evaluate(child, postings, size, live) for child in node[1]]
+        combine = np.logical_and if kind == 'and' else np.logical_or
+        return combine.reduce(masks)
+
+
+def parse_query(query, normalize=str.lower):
+    """
+    Parses a boolean query into a tree of ('term', t) / ('not', n) /
+    ('and', [...]) / ('or', [...]) nodes. Raises QueryError when malformed.
+    """
+    tokens = QUERY_TOKEN_RE.findall(query or '')
+    if not tokens:
+        raise QueryError("Empty query.")
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def take():
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or():
+        children = [parse_and()]
+        while peek() is not None and peek().upper() == 'OR':
+            take()
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else ('or', children)
+
+    def parse_and():
+        children = [parse_not()]
+        while peek() is not None and peek() != ')' and peek().upper() != 'OR':
+            if peek().upper() == 'AND':
+                take()
+            children.append(parse_not())
+        return children[0] if len(children) == 1 else ('and', children)
+
+    def parse_not():
+        if peek() is not None and peek().upper() == 'NOT':
+            take()
+            return ('not', parse_not())
+        return parse_primary()
+
+    def parse_primary():
+        token = peek()
+        if token is None:
+            raise QueryError("Query ends unexpectedly.")
+        if token == '(':
+            take()
+            node = parse_or()
+            if peek() != ')':
+                raise QueryError("Missing closing parenthesis.")
+            take()
+            return node
+        if token == ')' or token.upper() in OPERATORS:
+            raise QueryError(f"Unexpected '{token}'.")
+        take()
+        term = normalize(token.strip('"'))
+        if not term:
+            raise QueryError("Empty phrase.")
+        return ('term', term)
+
+    tree = parse_or()
+    if peek() is not None:
+        raise QueryError(f"Unexpected '{peek()}'.")
+    return tree
+
+
+def positive_terms(node, negated=False):
+    """Terms that count towards the score (those not under a NOT)."""
+    kind = node[0]
+    if kind == 'term':
+        return [] if negated else [node[1]]
+    if kind == 'not':
+        return positive_terms(node[1], not negated)
+    return [term for child in node[1] for term in positive_terms(child, negated)]
+
+
+# -- shared instance -----------------------------------------------------------
+
+_lock = threading.Lock()
+_index = None
+_synced_at = None
+_checked_at = 0.0
+_rebuild_thread = None
+
+
+def get_candidate_index():
+    """The shared index: built on first use, then kept in sync with the profile table."""
+    global _index, _checked_at
+    if _index is None:
+        with _lock:
+            if _index is None:
+                _index = _load_index()
+                _checked_at = time.monotonic()
+            return _index
+
+    if time.monotonic() - _checked_at >= settings.CANDIDATE_SEARCH['CHECK_INTERVAL']:
+        with _lock:
+            if time.monotonic() - _checked_at >= settings.CANDIDATE_SEARCH['CHECK_INTERVAL']:
+                _checked_at = time.monotonic()
+                _catch_up(_index)
+    return _index
+
+
+def index_profile(profile):
+    """Applies a saved profile to the index, if this process has loaded it."""
+    if _index is not None:
+        _index.add(profile.pk, profile.skills, profile.interests)
+
+
+def unindex_profile(profile_id):
+    if _index is not None:
+        _index.remove(profile_id)
+
+
+def reset_candidate_index():
+    global _index, _synced_at, _checked_at
+    with _lock:
+        _index, _synced_at, _checked_at = None, None, 0.0
+
+
+def _load_index():
+    global _synced_at
+    started = time.perf_counter()
+    _synced_at = timezone.now()
+    aliases = dict(SkillAlias.objects.values_list('alias', 'skill__name'))
+    rows = UserProfile.objects.values_list('pk', 'skills', 'interests').order_by('pk').iterator(chunk_size=10000)
+    index = CandidateIndex.build(rows, aliases=aliases)
+    logger.info(f"Built the candidate index: {len(index)} profiles, {len(index.postings)} terms "
+                f"in {time.perf_counter() - started:.2f}s.")
+    return index
+
+
+def _catch_up(index):
+    """Applies profiles changed by other processes; rebuilds in the background if some were deleted."""
+    global _synced_at, _rebuild_thread
+    since = _synced_at - timedelta(seconds=1)  # overlap so a save committed mid-check isn't missed
+    _synced_at = timezone.now()
+    changed = UserProfile.objects.filter(updated_at__gte=since).values_list('pk', 'skills', 'interests')
+    for pk, skills, interests in changed:
+        index.add(pk, skills, interests)
+
+    rebuilding = _rebuild_thread is not None and _rebuild_thread.is_alive()
+    if not rebuilding and UserProfile.objects.count() != len(index):
+        logger.info("Profiles were deleted elsewhere, rebuilding the candidate index in the background.")
+        _rebuild_thread = threading.Thread(target=_rebuild, name='candidate-index-rebuild', daemon=True)
+        _rebuild_thread.start()
+
+
+def _rebuild():
+    global _index
+    try:
+        _index = _load_index()
+    except Exception as e:
+        logger.error(f"Candidate index rebuild failed: {e}")
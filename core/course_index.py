@@ -0,0 +1,438 @@
+"""
+Prebuilt TF-IDF index over the online course catalog.
+
+The vectorizer and the sparse course matrix are fitted once (by the
+``build_course_index`` management command, or lazily on first use) and
+persisted as plain ``.npy`` arrays so every worker can memory-map them.
+Nothing is unpickled or parsed when a worker loads a build: the
+vocabulary is a sorted byte array searched with ``np.searchsorted`` and
+the catalog fields are UTF-8 string tables decoded per returned course,
+so all workers share the same page-cache pages.
+The matrix is stored term-major (one row of course weights per term), so
+a query only touches the postings of its own few terms; the top ``k``
+above ``COURSE_MIN_SCORE`` come from ``argpartition`` and are returned
+as prebuilt ``Course`` records.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .instrumentation import span
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 3
+REQUIRED_COLUMNS = ('Title', 'Short Intro', 'URL', 'Created by')
+# Course attribute -> catalog column; each is stored as a string table
+CATALOG_FIELDS = (('name', 'Title'), ('created_by', 'Created by'), ('description', 'Short Intro'), ('know_more', 'URL'))
+CURRENT_FILE = 'CURRENT'
+KEEP_BUILDS = 2
+
+
+def catalog_fingerprint(csv_path):
+    """Returns the mtime, size and SHA-256 of the catalog CSV."""
+    stat = os.stat(csv_path)
+    digest = hashlib.sha256()
+    with open(csv_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return {'mtime': stat.st_mtime, 'size': stat.st_size, 'sha256': digest.hexdigest()}
+
+
+def load_catalog(csv_path):
+    df = pd.read_csv(csv_path)
+    if not set(REQUIRED_COLUMNS).issubset(df.columns):
+        raise ValueError(f"CSV file is missing required columns. Found: {df.columns.tolist()}")
+    return df
+
+
+def make_vectorizer():
+    # The build fits it; loading a build only needs its (unfitted) analyzer
+    return TfidfVectorizer(dtype=np.float32)
+
+
+def write_strings(path, values):
+    """
+    Saves strings as one UTF-8 blob (``<path>.npy``) and ``n + 1`` offsets
+    (``<path>.offsets.npy``), for ``StringTable``. Missing values become ''.
+    """
+    encoded = [b'' if pd.isna(value) else str(value).encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(path + '.npy', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    np.save(path + '.offsets.npy', offsets)
+
+
+def load_mapped(path):
+    """A read-only ``.npy`` array backed by the file's pages (shared by every process that maps it)."""
+    # A plain ndarray view: slicing an np.memmap goes through its (slow) subclass hooks
+    return np.asarray(np.load(path, mmap_mode='r'))
+
+
+def tfidf_weights(analyze, vocabulary, idf, text):
+    """
+    L2-normalised TF-IDF weights of ``text`` as ``(term columns, weights)``
+    against a sorted byte-string ``vocabulary``; ``(None, None)`` when no
+    term is known.
+    """
+    counts = {}
+    for token in analyze(text):
+        counts[token] = counts.get(token, 0) + 1
+    if not counts or not len(vocabulary):
+        return None, None
+    terms = np.array([token.encode('utf-8') for token in counts], dtype=bytes)
+    positions = np.minimum(np.searchsorted(vocabulary, terms), len(vocabulary) - 1)
+    known = vocabulary[positions] == terms
+    if not known.any():
+        return None, None
+    columns = positions[known]
+    weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))[known] * idf[columns]
+    weights /= np.sqrt(weights @ weights)
+    return columns, weights
+
+
+class StringTable:
+    """Read-only, memory-mapped strings written by ``write_strings``."""
+
+    def __init__(self, path):
+        self.blob = load_mapped(path + '.npy')
+        self.offsets = load_mapped(path + '.offsets.npy')
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return self.blob[self.offsets[i]:self.offsets[i + 1]].tobytes().decode('utf-8')
+
+
+def build_index(csv_path=None, index_dir=None):
+    """
+    Fits the vectorizer over the catalog and writes a new index build.
+    Returns the path of the build directory.
+    """
+    csv_path = csv_path or settings.COURSE_CATALOG_PATH
+    index_dir = index_dir or settings.COURSE_INDEX_DIR
+    os.makedirs(index_dir, exist_ok=True)
+
+    with _build_lock(index_dir):
+        fingerprint = catalog_fingerprint(csv_path)
+
+        # Another worker may have finished the same build while we waited
+        current = _current_build(index_dir)
+        if current:
+            manifest = _read_manifest(current)
+            if (manifest.get('format_version') == INDEX_FORMAT_VERSION
+                    and manifest.get('catalog', {}).get('sha256') == fingerprint['sha256']):
+                return current
+
+        started = time.perf_counter()
+        df = load_catalog(csv_path)
+        full_text = (df['Title'].fillna('') + " " + df['Short Intro'].fillna('')).astype(str).str.lower()
+
+        vectorizer = make_vectorizer()
+        with span('tfidf.fit'):
+            matrix = vectorizer.fit_transform(full_text)
+
+        build_name = f"{fingerprint['sha256'][:12]}-{int(time.time() * 1000)}"
+        build_path = os.path.join(index_dir, build_name)
+        tmp_path = build_path + '.tmp'
+        os.makedirs(tmp_path)
+
+        # Term-major: row t lists the courses containing term t and their weights
+        postings = matrix.T.tocsr()
+        postings.sort_indices()
+        np.save(os.path.join(tmp_path, 'data.npy'), postings.data.astype(np.float32))
+        np.save(os.path.join(tmp_path, 'indices.npy'), postings.indices.astype(np.int32))
+        np.save(os.path.join(tmp_path, 'indptr.npy'), postings.indptr.astype(np.int64))
+        # sklearn numbers terms in sorted order, which is also the order of their UTF-8 bytes
+        terms = [term.encode('utf-8') for term in vectorizer.get_feature_names_out()]
+        np.save(os.path.join(tmp_path, 'vocabulary.npy'), np.array(terms, dtype=bytes))
+        np.save(os.path.join(tmp_path, 'idf.npy'), vectorizer.idf_.astype(np.float32))
+        for field, column in CATALOG_FIELDS:
+            write_strings(os.path.join(tmp_path, field), df[column])
+
+        manifest = {
+            'format_version': INDEX_FORMAT_VERSION,
+            'catalog_path': os.path.abspath(csv_path),
+            'catalog': fingerprint,
+            'shape': list(matrix.shape),
+            'built_at': time.time(),
+        }
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+
+        os.rename(tmp_path, build_path)
+        _write_current(index_dir, build_name)
+        _prune_builds(index_dir, keep=build_name)
+
+        logger.info(f"Built course index {build_name} ({matrix.shape[0]} courses) "
+                    f"in {time.perf_counter() - started:.2f}s")
+        return build_path
+
+
+class Course:
+    """One catalog entry as shown on the dashboard."""
+    __slots__ = ('name', 'created_by', 'description', 'know_more')
+
+    def __init__(self, name, created_by, description, know_more):
+        self.name = name
+        self.created_by = created_by
+        self.description = description
+        self.know_more = know_more
+
+    def as_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __eq__(self, other):
+        return isinstance(other, Course) and self.as_dict() == other.as_dict()
+
+    def __repr__(self):
+        return f"Course({self.name!r})"
+
+
+class CourseCatalog:
+    """The catalog of an index build; a ``Course`` is decoded when it is looked up."""
+
+    def __init__(self, build_path):
+        self.fields = {field: StringTable(os.path.join(build_path, field)) for field, _ in CATALOG_FIELDS}
+
+    def __len__(self):
+        return len(self.fields['name'])
+
+    def __getitem__(self, row):
+        row = range(len(self))[row]  # IndexError past the end; negative rows count from it
+        return Course(**{field: table[row] for field, table in self.fields.items()})
+
+
+class CourseIndex:
+    """A read-only, memory-mapped index build."""
+
+    def __init__(self, build_path):
+        self.path = build_path
+        self.manifest = _read_manifest(build_path)
+        if self.manifest.get('format_version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported course index format in {build_path}")
+
+        n_courses, n_terms = self.manifest['shape']
+        self.data = load_mapped(os.path.join(build_path, 'data.npy'))
+        self.indices = load_mapped(os.path.join(build_path, 'indices.npy'))
+        self.indptr = load_mapped(os.path.join(build_path, 'indptr.npy'))
+        postings = sparse.csr_matrix((self.data, self.indices, self.indptr), shape=(n_terms, n_courses), copy=False)
+        # (courses x terms) view for batch products; no copy
+        self.matrix = postings.T
+        self.vocabulary = load_mapped(os.path.join(build_path, 'vocabulary.npy'))
+        self.idf = load_mapped(os.path.join(build_path, 'idf.npy'))
+        self.courses = CourseCatalog(build_path)
+        self._analyze = make_vectorizer().build_analyzer()
+
+    def __len__(self):
+        return len(self.courses)
+
+    def query_weights(self, text):
+        """
+        The query's TF-IDF vector as ``(term columns, weights)``; the same
+        values the fitted vectorizer's ``transform`` gives.
+        """
+        return tfidf_weights(self._analyze, self.vocabulary, self.idf, text)
+
+    def query_matrix(self, texts):
+        """(queries x terms) sparse matrix of ``query_weights`` rows, for scoring many queries at once."""
+        rows = [self.query_weights(text) for text in texts]
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([0 if columns is None else len(columns) for columns, _ in rows], out=indptr[1:])
+        indices = np.concatenate([np.zeros(0, dtype=np.int64)] + [c for c, _ in rows if c is not None])
+        data = np.concatenate([np.zeros(0, dtype=np.float32)] + [w for _, w in rows if w is not None])
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), len(self.vocabulary)))
+
+    def search(self, text, k=5, min_score=None):
+        """Returns ``(row, score)`` pairs for the ``k`` best courses scoring above ``min_score``."""
+        min_score = settings.COURSE_MIN_SCORE if min_score is None else min_score
+        if not len(self) or k <= 0:
+            return []
+        with span('tfidf.transform'):
+            columns, weights = self.query_weights(text)
+        if columns is None:
+            return []
+
+        # Rows and query are L2-normalised, so accumulating weight products gives the cosine similarity
+        with span('tfidf.score'):
+            scores = np.zeros(len(self), dtype=np.float32)
+            for column, weight in zip(columns, weights):
+                start, end = self.indptr[column], self.indptr[column + 1]
+                scores[self.indices[start:end]] += weight * self.data[start:end]
+
+        candidates = np.flatnonzero(scores > min_score)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+        return [(int(i), float(scores[i])) for i in candidates]
+
+    def top_courses(self, text, k=5, min_score=None):
+        return [self.courses[i] for i, _ in self.search(text, k, min_score)]
+
+
+_lock = threading.Lock()
+_index = None
+_last_check = 0.0
+_rebuild_thread = None
+
+
+def get_course_index():
+    """
+    Returns the shared course index, building it on first use.
+
+    Every ``COURSE_INDEX_CHECK_INTERVAL`` seconds the catalog CSV is
+    checked; if it changed, a rebuild starts in a background thread and
+    the current index keeps serving until the new build is swapped in.
+    """
+    global _index, _last_check
+    index = _index
+    if index is None:
+        with _lock:
+            if _index is None:
+                _index = _load_or_build()
+                _last_check = time.monotonic()
+            return _index
+
+    if time.monotonic() - _last_check >= settings.COURSE_INDEX_CHECK_INTERVAL:
+        with _lock:
+            if time.monotonic() - _last_check >= settings.COURSE_INDEX_CHECK_INTERVAL:
+                _last_check = time.monotonic()
+                _check_for_changes(index)
+    return _index
+
+
+def reset_course_index():
+    """Drops the in-process index so the next call reloads it."""
+    global _index, _last_check
+    with _lock:
+        _index = None
+        _last_check = 0.0
+
+
+def _load_or_build():
+    current = _current_build(settings.COURSE_INDEX_DIR)
+    if current:
+        try:
+            index = CourseIndex(current)
+            if not catalog_changed(index.manifest['catalog']):
+                return index
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable course index {current}: {e}")
+    return CourseIndex(build_index())
+
+
+def catalog_changed(catalog):
+    """Whether the catalog CSV differs from ``catalog``, a ``catalog_fingerprint``."""
+    try:
+        stat = os.stat(settings.COURSE_CATALOG_PATH)
+    except OSError:
+        return False  # keep serving the last good build
+    if stat.st_mtime == catalog['mtime'] and stat.st_size == catalog['size']:
+        return False
+    changed = catalog_fingerprint(settings.COURSE_CATALOG_PATH)['sha256'] != catalog['sha256']
+    if not changed:
+        # Touched but identical; remember the new mtime so we don't rehash every check
+        catalog['mtime'] = stat.st_mtime
+    return changed
+
+
+def _check_for_changes(index):
+    global _rebuild_thread
+    if _rebuild_thread is not None and _rebuild_thread.is_alive():
+        return
+
+    # Another worker may already have published a newer build
+    current = _current_build(settings.COURSE_INDEX_DIR)
+    if current and os.path.abspath(current) != os.path.abspath(index.path):
+        _swap_in(current)
+        return
+
+    if catalog_changed(index.manifest['catalog']):
+        logger.info("Course catalog changed, rebuilding index in the background.")
+        _rebuild_thread = threading.Thread(target=_rebuild, name='course-index-rebuild', daemon=True)
+        _rebuild_thread.start()
+
+
+def _rebuild():
+    try:
+        _swap_in(build_index())
+    except Exception as e:
+        logger.error(f"Course index rebuild failed: {e}")
+
+
+def _swap_in(build_path):
+    global _index
+    try:
+        _index = CourseIndex(build_path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Could not load course index {build_path}: {e}")
+
+
+def _read_manifest(build_path):
+    with open(os.path.join(build_path, 'manifest.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _current_build(index_dir):
+    try:
+        with open(os.path.join(index_dir, CURRENT_FILE), encoding='utf-8') as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(index_dir, name)
+    return path if name and os.path.isdir(path) else None
+
+
+def _write_current(index_dir, build_name):
+    tmp = os.path.join(index_dir, f'{CURRENT_FILE}.{os.getpid()}.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        f.write(build_name)
+    os.replace(tmp, os.path.join(index_dir, CURRENT_FILE))
+
+
+def _prune_builds(index_dir, keep):
+    # Mapped files stay valid for readers after unlink, so old builds can go
+    builds = sorted(
+        (name for name in os.listdir(index_dir)
+         if os.path.isdir(os.path.join(index_dir, name)) and not name.endswith('.tmp')),
+        key=lambda name: os.path.getmtime(os.path.join(index_dir, name)),
+        reverse=True,
+    )
+    for name in builds[KEEP_BUILDS:]:
+        if name != keep:
+            shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+
+
+class _build_lock:
+    """Cross-process lock so only one worker rebuilds at a time."""
+
+    def __init__(self, index_dir):
+        self.path = os.path.join(index_dir, '.build.lock')
+        self.file = None
+
+    def __enter__(self):
+        self.file = open(self.path, 'a')
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if fcntl is not None:
+            fcntl.flock(self.file, fcntl.LOCK_UN)
+        self.file.close()
@@ -0,0 +1,118 @@
+"""
+Per-user cache of the dashboard payload.
+
+The payload (ranked projects, jobs, open source repositories, courses)
+is stored in Django's cache under the profile, one entry per part (the
+page, and each section the page loads separately), together with a version
+made of the profile id, a digest of its skills and a global generation.
+An entry is only served while its version is current:
+
+* saving the profile drops its entries (and a skills change alone
+  would change the version anyway);
+* saving or deleting any project, or a batch recommendation run, bumps
+  the generation, so every entry misses;
+* entries expire after ``DASHBOARD_CACHE['TIMEOUT']`` seconds, never
+  later than the upstream lookup TTL, and a payload with an unavailable
+  section is not stored at all.
+
+The same version keys the optional ``{% cache %}`` fragments of the
+dashboard template. The ``a``-prefixed functions are for the async views.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .recommendations import skills_digest
+
+GENERATION_KEY = 'dashboard:generation'
+# The page itself and the sections it can load separately
+PARTS = ('page', 'jobs', 'open_source', 'courses')
+
+
+def _cache():
+    return caches[settings.DASHBOARD_CACHE['CACHE_ALIAS']]
+
+
+def _key(profile_id, part):
+    return f'dashboard:{profile_id}:{part}'
+
+
+def generation():
+    cache = _cache()
+    value = cache.get(GENERATION_KEY)
+    if value is None:
+        # add() so concurrent workers agree on one value
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        value = cache.get(GENERATION_KEY)
+    return value
+
+
+async def ageneration():
+    cache = _cache()
+    value = await cache.aget(GENERATION_KEY)
+    if value is None:
+        await cache.aadd(GENERATION_KEY, time.time_ns(), timeout=None)
+        value = await cache.aget(GENERATION_KEY)
+    return value
+
+
+def payload_version(profile):
+    return f"{profile.pk}:{skills_digest(profile.skills)}:{generation()}"
+
+
+async def apayload_version(profile):
+    return f"{profile.pk}:{skills_digest(profile.skills)}:{await ageneration()}"
+
+
+def cache_timeout():
+    """Seconds a payload may be served; the jobs / repositories in it are only fresh for the lookup TTL."""
+    return min(settings.DASHBOARD_CACHE['TIMEOUT'], settings.LOOKUP_CACHE['TTL'])
+
+
+def get_dashboard(profile, compute, part='page'):
+    """
+    Returns ``(payload, version)`` for one part of the profile's
+    dashboard; ``compute()`` builds the payload (a dict with an
+    ``unavailable`` set) on a miss.
+    """
+    version = payload_version(profile)
+    if not settings.DASHBOARD_CACHE['ENABLED']:
+        return compute(), version
+
+    cache = _cache()
+    entry = cache.get(_key(profile.pk, part))
+    if entry is not None and entry[0] == version:
+        return entry[1], version
+
+    payload = compute()
+    # Like the lookup cache, don't pin a page that is missing a section
+    if not payload['unavailable']:
+        cache.set(_key(profile.pk, part), (version, payload), timeout=cache_timeout())
+    return payload, version
+
+
+async def aget_dashboard(profile, compute, part='page'):
+    """``get_dashboard`` with a coroutine function ``compute``."""
+    version = await apayload_version(profile)
+    if not settings.DASHBOARD_CACHE['ENABLED']:
+        return await compute(), version
+
+    cache = _cache()
+    entry = await cache.aget(_key(profile.pk, part))
+    if entry is not None and entry[0] == version:
+        return entry[1], version
+
+    payload = await compute()
+    if not payload['unavailable']:
+        await cache.aset(_key(profile.pk, part), (version, payload), timeout=cache_timeout())
+    return payload, version
+
+
+def invalidate_profile(profile_id):
+    _cache().delete_many([_key(profile_id, part) for part in PARTS])
+
+
+def invalidate_all():
+    """Makes every cached dashboard (and fragment) miss."""
+    _cache().set(GENERATION_KEY, time.time_ns(), timeout=None)
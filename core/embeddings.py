@@ -0,0 +1,578 @@
+"""
+Semantic matching engine (``MATCH_ENGINE = 'embedding'``).
+
+The TF-IDF engine (core/course_index.py, core/project_index.py) only
+matches shared words, so "deep learning" never finds a course about
+"neural networks". This engine embeds courses, projects and the user's
+skills with a CPU-only local model and ranks by cosine similarity:
+
+* ``lsa`` (default): TF-IDF weights projected onto the top singular
+  vectors of the course catalog and project texts (latent semantic
+  analysis), so terms used in the same contexts end up close together.
+  The model is a few ``.npy`` files in ``EMBEDDINGS['MODEL_DIR']``,
+  written by ``manage.py build_embeddings``. Until it exists, courses and
+  projects are ranked by the TF-IDF engine instead.
+* ``spacy``: the averaged word vectors of ``SPACY_MODEL``, for a model
+  that ships vectors (e.g. ``en_core_web_md``).
+
+Vectors are L2-normalised and stored as float16 in an ``IVFIndex``:
+spherical k-means splits them into lists and a query only scores the
+``N_PROBE`` lists whose centroids are closest to it, so ``N_PROBE`` is
+the recall/latency trade-off. Collections smaller than ``EXACT_BELOW``
+are a single float32 list, i.e. an exact scan.
+
+Course vectors are written next to the course index build they were
+computed from and memory-mapped by every worker, like the build itself.
+A project's vector is computed when it is saved and stored on its
+``ProjectMatchVector`` (``build_embeddings`` and ``index_projects`` fill
+in the missing ones). Each worker builds the project IVF index from the
+stored vectors in a background thread. Until the rebuild, vectors saved
+since are scanned exactly alongside it and deleted projects are filtered
+out, the way the hashed index keeps a pending segment (core/hashing_index.py).
+Changes made by other processes are picked up through
+``ProjectMatchVector.updated_at`` every ``PROJECT_INDEX['CHECK_INTERVAL']``
+seconds. Once ``EMBEDDINGS['REBUILD_AFTER']`` changes have piled up, the
+index is rebuilt in the background again.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from scipy import sparse
+from sklearn.decomposition import TruncatedSVD
+
+from .course_index import get_course_index, load_catalog, load_mapped, make_vectorizer, tfidf_weights
+from .instrumentation import span
+from .lookup_cache import LocalBackend, canonical_skills
+from .models import Project, ProjectMatchVector
+from .nlp import get_nlp
+from .project_index import load_ranked
+
+logger = logging.getLogger(__name__)
+
+MODEL_FORMAT_VERSION = 1
+ANN_FORMAT_VERSION = 1
+# Projects beyond this many are left out of the LSA training corpus
+MAX_TRAINING_PROJECTS = 100_000
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64
+# Vectors widened to float32 per matrix-vector product
+SCAN_BLOCK = 16384
+# Seconds between looks for a model after finding none
+MODEL_RETRY_INTERVAL = 60
+
+_lock = threading.Lock()
+_embedder = None
+_model_missing_at = None
+_course_ann = None  # (course index, model id, IVFIndex)
+_projects = None  # ProjectVectors of the current model
+_queries = None
+
+
+def normalize_rows(matrix):
+    """Rows scaled to unit length (all-zero rows stay zero), as float32."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms
+
+
+class LsaEmbedder:
+    """TF-IDF weights times the (terms x dimensions) singular vectors of the training corpus."""
+
+    def __init__(self, path):
+        self.path = path
+        self.manifest = _read_manifest(path)
+        if self.manifest.get('format_version') != MODEL_FORMAT_VERSION:
+            raise ValueError(f"Unsupported embedding model format in {path}")
+        self.vocabulary = load_mapped(os.path.join(path, 'vocabulary.npy'))
+        self.idf = load_mapped(os.path.join(path, 'idf.npy'))
+        self.components = load_mapped(os.path.join(path, 'components.npy'))
+        self.dimensions = self.components.shape[1]
+        self.model_id = f"lsa-{self.manifest['fingerprint'][:12]}"
+        self._analyze = make_vectorizer().build_analyzer()
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for i, text in enumerate(texts):
+            columns, weights = tfidf_weights(self._analyze, self.vocabulary, self.idf, text)
+            if columns is not None:
+                vectors[i] = weights @ self.components[columns]
+        return normalize_rows(vectors)
+
+
+class SpacyEmbedder:
+    """Averaged word vectors of a spaCy pipeline."""
+
+    def __init__(self, nlp):
+        self.nlp = nlp
+        self.dimensions = nlp.vocab.vectors_length
+        self.model_id = f"spacy-{nlp.meta.get('lang')}_{nlp.meta.get('name')}-{nlp.meta.get('version')}"
+
+    def encode(self, texts):
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for i, doc in enumerate(self.nlp.pipe(texts)):
+            vectors[i] = doc.vector
+        return normalize_rows(vectors)
+
+
+def training_texts():
+    """Course titles and intros plus project texts: the corpus the LSA model is fitted on."""
+    df = load_catalog(settings.COURSE_CATALOG_PATH)
+    texts = (df['Title'].fillna('') + " " + df['Short Intro'].fillna('')).astype(str).tolist()
+    projects = Project.objects.order_by('pk').values_list('title', 'description', 'required_skills')
+    texts.extend(" ".join(fields) for fields in projects[:MAX_TRAINING_PROJECTS].iterator(chunk_size=5000))
+    return texts
+
+
+def build_model(path=None, dimensions=None, texts=None):
+    """Fits the LSA model on ``texts`` (default: ``training_texts()``) and writes it to ``path``."""
+    path = path or settings.EMBEDDINGS['MODEL_DIR']
+    dimensions = dimensions or settings.EMBEDDINGS['DIMENSIONS']
+    texts = training_texts() if texts is None else texts
+    started = time.perf_counter()
+
+    vectorizer = make_vectorizer()
+    with span('embedding.fit'):
+        matrix = vectorizer.fit_transform(texts)
+        dimensions = max(1, min(dimensions, matrix.shape[0] - 1, matrix.shape[1] - 1))
+        svd = TruncatedSVD(n_components=dimensions, random_state=0).fit(matrix)
+    components = np.ascontiguousarray(svd.components_.T, dtype=np.float32)
+    # sklearn numbers terms in sorted order, which is also the order of their UTF-8 bytes
+    vocabulary = np.array([term.encode('utf-8') for term in vectorizer.get_feature_names_out()], dtype=bytes)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    np.save(os.path.join(tmp_path, 'vocabulary.npy'), vocabulary)
+    np.save(os.path.join(tmp_path, 'idf.npy'), vectorizer.idf_.astype(np.float32))
+    np.save(os.path.join(tmp_path, 'components.npy'), components)
+    fingerprint = hashlib.sha256(vocabulary.tobytes() + components.tobytes()).hexdigest()
+    with open(os.path.join(tmp_path, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump({
+            'format_version': MODEL_FORMAT_VERSION,
+            'fingerprint': fingerprint,
+            'documents': len(texts),
+            'terms': len(vocabulary),
+            'dimensions': dimensions,
+            'explained_variance': float(svd.explained_variance_ratio_.sum()),
+            'built_at': time.time(),
+        }, f)
+
+    # Readers that mapped the previous files keep them after unlink
+    old_path = f"{path}.{os.getpid()}.old"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    logger.info(f"Fitted the embedding model ({len(texts)} documents, {len(vocabulary)} terms, "
+                f"{dimensions} dimensions) in {time.perf_counter() - started:.2f}s.")
+    return path
+
+
+def spherical_kmeans(vectors, n_lists, seed=0):
+    """Unit-length centroids of ``n_lists`` clusters of unit vectors, fitted on a sample."""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_lists * KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))], dtype=np.float32)
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)]
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = assign_lists(sample, centroids)
+        members = sparse.csr_matrix(
+            (np.ones(len(sample), dtype=np.float32), (assignment, np.arange(len(sample)))),
+            shape=(n_lists, len(sample)))
+        sums = members @ sample
+        # Lists that lost every member restart from a random sample vector
+        empty = np.flatnonzero(np.bincount(assignment, minlength=n_lists) == 0)
+        sums[empty] = sample[rng.choice(len(sample), len(empty))]
+        centroids = normalize_rows(sums)
+    return centroids
+
+
+def assign_lists(vectors, centroids, chunk_size=8192):
+    """The closest centroid (highest dot product) of each vector."""
+    assignment = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), chunk_size):
+        block = np.asarray(vectors[start:start + chunk_size], dtype=np.float32)
+        assignment[start:start + chunk_size] = np.argmax(block @ centroids.T, axis=1)
+    return assignment
+
+
+def default_lists(n):
+    return 1 if n < settings.EMBEDDINGS['EXACT_BELOW'] else int(4 * np.sqrt(n))
+
+
+class IVFIndex:
+    """
+    Inverted-file index over unit vectors. Each vector is filed under its
+    closest centroid, and the vectors are stored grouped by list, so a
+    probed list is one contiguous slice of ``vectors``.
+    """
+
+    def __init__(self, ids, vectors, centroids, offsets):
+        self.ids = ids
+        self.vectors = vectors
+        self.centroids = centroids
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, ids, vectors, n_lists=None, seed=0):
+        """Indexes the unit ``vectors`` of ``ids`` in ``n_lists`` lists (default: ``default_lists``)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n_lists = max(1, min(default_lists(len(vectors)) if n_lists is None else n_lists, len(vectors)))
+        if n_lists == 1:
+            centroids = np.zeros((1, vectors.shape[1]), dtype=np.float32)
+            assignment = np.zeros(len(vectors), dtype=np.int64)
+        else:
+            centroids = spherical_kmeans(vectors, n_lists, seed)
+            assignment = assign_lists(vectors, centroids)
+        order = np.argsort(assignment, kind='stable')
+        offsets = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_lists), out=offsets[1:])
+        # Widening float16 costs more than the scan itself, so the exact-scan (small) case stays float32
+        dtype = np.float32 if n_lists == 1 else np.float16
+        return cls(np.asarray(ids, dtype=np.int64)[order], vectors[order].astype(dtype), centroids, offsets)
+
+    def search(self, query, k=10, n_probe=None, min_score=None):
+        """Up to ``k`` ``(id, score)`` pairs scoring above ``min_score``, best first."""
+        n_probe = settings.EMBEDDINGS['N_PROBE'] if n_probe is None else n_probe
+        min_score = settings.EMBEDDINGS['MIN_SCORE'] if min_score is None else min_score
+        if not len(self) or k <= 0 or not query.any():
+            return []
+        with span('ann.search'):
+            if n_probe >= self.n_lists:
+                spans = [(0, len(self))]
+            else:
+                lists = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+                spans = [(self.offsets[i], self.offsets[i + 1]) for i in lists]
+            ids = np.concatenate([self.ids[start:end] for start, end in spans])
+            # float16 products don't go through BLAS; widen a block at a time instead
+            scores = np.concatenate([
+                self.vectors[block:min(block + SCAN_BLOCK, end)].astype(np.float32, copy=False) @ query
+                for start, end in spans for block in range(start, end, SCAN_BLOCK)
+            ] or [np.zeros(0, dtype=np.float32)])
+
+            candidates = np.flatnonzero(scores > min_score)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            # Highest score first; ties go to the lower id
+            candidates = candidates[np.lexsort((ids[candidates], -scores[candidates]))]
+        return [(int(ids[i]), float(scores[i])) for i in candidates]
+
+    def save(self, path):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        os.makedirs(tmp_path, exist_ok=True)
+        for name in ('ids', 'vectors', 'centroids', 'offsets'):
+            np.save(os.path.join(tmp_path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(tmp_path, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump({'format_version': ANN_FORMAT_VERSION, 'size': len(self), 'lists': self.n_lists}, f)
+        try:
+            os.rename(tmp_path, path)
+        except OSError:  # another worker saved the same index first
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path):
+        if _read_manifest(path).get('format_version') != ANN_FORMAT_VERSION:
+            raise ValueError(f"Unsupported embedding index format in {path}")
+        return cls(*(load_mapped(os.path.join(path, f'{name}.npy'))
+                     for name in ('ids', 'vectors', 'centroids', 'offsets')))
+
+
+def get_embedder():
+    """The embedding model, or None while there is none to load (see ``manage.py build_embeddings``)."""
+    global _embedder, _model_missing_at
+    if _embedder is None:
+        if _model_missing_at is not None and time.monotonic() - _model_missing_at < MODEL_RETRY_INTERVAL:
+            return None
+        with _lock:
+            if _embedder is None:
+                try:
+                    _embedder = _load_embedder()
+                    _model_missing_at = None
+                except (OSError, ValueError, KeyError) as e:
+                    if _model_missing_at is None:
+                        logger.warning(f"No usable embedding model in {settings.EMBEDDINGS['MODEL_DIR']} ({e}); "
+                                       f"ranking with TF-IDF until `python manage.py build_embeddings` fits one.")
+                    _model_missing_at = time.monotonic()
+    return _embedder
+
+
+def _load_embedder():
+    conf = settings.EMBEDDINGS
+    if conf['MODEL'] == 'spacy':
+        nlp = get_nlp()
+        if nlp.vocab.vectors_length:
+            return SpacyEmbedder(nlp)
+        logger.warning(f"spaCy model '{settings.SPACY_MODEL}' has no word vectors, using the LSA model.")
+    return LsaEmbedder(conf['MODEL_DIR'])
+
+
+def embed_skills(skills, embedder):
+    """The unit query vector of a user's skills, cached per canonical skill set."""
+    global _queries
+    if _queries is None:
+        _queries = LocalBackend(settings.EMBEDDINGS['QUERY_CACHE'])
+    key = (embedder.model_id, canonical_skills(skills))
+    vector = _queries.get(key)
+    if vector is None:
+        with span('embedding.encode'):
+            vector = embedder.encode([", ".join(key[1])])[0]
+        _queries.set(key, vector, None)
+    return vector
+
+
+def get_course_ann(embedder):
+    """``(course index, IVFIndex of its courses)`` for the current course index build."""
+    global _course_ann
+    index = get_course_index()
+    cached = _course_ann
+    if cached is None or cached[0] is not index or cached[1] != embedder.model_id:
+        with _lock:
+            cached = _course_ann
+            if cached is None or cached[0] is not index or cached[1] != embedder.model_id:
+                cached = _course_ann = (index, embedder.model_id, _load_or_build_course_ann(index, embedder))
+    return cached[0], cached[2]
+
+
+def _load_or_build_course_ann(index, embedder):
+    path = os.path.join(index.path, f'embeddings-{embedder.model_id}')
+    try:
+        return IVFIndex.load(path)
+    except (OSError, ValueError):
+        pass
+    started = time.perf_counter()
+    with span('embedding.encode'):
+        vectors = embedder.encode([f"{course.name} {course.description}" for course in index.courses])
+    IVFIndex.build(np.arange(len(vectors)), vectors).save(path)
+    logger.info(f"Embedded {len(vectors)} courses in {time.perf_counter() - started:.2f}s.")
+    return IVFIndex.load(path)
+
+
+def project_text(title, description, required_skills):
+    return " ".join((title, description, required_skills))
+
+
+def encode_vector(vector):
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def decode_vector(data):
+    return np.frombuffer(data, dtype=np.float32)
+
+
+def index_project(project):
+    """Stores the vector of a saved project and applies it to this process's project index."""
+    embedder = get_embedder()
+    if embedder is None:
+        return
+    vector = embedder.encode([project_text(project.title, project.description, project.required_skills)])[0]
+    ProjectMatchVector.objects.filter(project=project).update(
+        embedding=encode_vector(vector), embedding_model=embedder.model_id, updated_at=timezone.now())
+    if _projects is not None and _projects.model_id == embedder.model_id:
+        _projects.add(project.pk, vector)
+
+
+def unindex_project(project_id):
+    if _projects is not None:
+        _projects.remove(project_id)
+
+
+def embed_missing_projects(batch_size=1000):
+    """Stores vectors for projects with none from the current model; returns the count, or None without a model."""
+    embedder = get_embedder()
+    if embedder is None:
+        return None
+    missing = (Project.objects.filter(match_vector__isnull=False)
+               .exclude(match_vector__embedding_model=embedder.model_id).order_by('pk')
+               .values_list('pk', 'title', 'description', 'required_skills'))
+    total = 0
+    rows = list(missing[:batch_size])
+    while rows:
+        vectors = embedder.encode([project_text(*fields) for _, *fields in rows])
+        now = timezone.now()
+        ProjectMatchVector.objects.bulk_update(
+            [ProjectMatchVector(project_id=pk, embedding=encode_vector(vector), embedding_model=embedder.model_id,
+                                updated_at=now) for (pk, *_), vector in zip(rows, vectors)],
+            ['embedding', 'embedding_model', 'updated_at'])
+        total += len(rows)
+        rows = list(missing[:batch_size])
+    if total:
+        logger.info(f"Embedded {total} projects.")
+    return total
+
+
+class ProjectVectors:
+    """
+    The IVF index of the stored project vectors of one model, plus the
+    vectors added and the projects removed since it was built (``seq``
+    orders them against rebuilds). ``ann`` is None until the first
+    background build finishes.
+    """
+
+    def __init__(self, model_id, dimensions):
+        self.model_id = model_id
+        self.dimensions = dimensions
+        self.ann = None
+        self.ann_ids = set()
+        self.pending = {}  # project id -> (seq, vector)
+        self.removed = {}  # project id -> seq
+        self.seq = 0
+        self.building = False
+        self.synced_at = timezone.now()
+        self.checked_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        added = sum(pk not in self.ann_ids for pk in self.pending)
+        dropped = sum(pk in self.ann_ids for pk in self.removed)
+        return len(self.ann_ids) + added - dropped
+
+    def add(self, project_id, vector):
+        with self.lock:
+            self.seq += 1
+            self.pending[project_id] = (self.seq, np.asarray(vector, dtype=np.float32))
+            self.removed.pop(project_id, None)
+
+    def remove(self, project_id):
+        with self.lock:
+            self.seq += 1
+            self.removed[project_id] = self.seq
+            self.pending.pop(project_id, None)
+
+    def changes(self):
+        return len(self.pending) + len(self.removed)
+
+    def search(self, query, k):
+        """Like ``IVFIndex.search`` over the live vectors, or None before the first build."""
+        with self.lock:
+            ann, pending, removed = self.ann, dict(self.pending), set(self.removed)
+        if ann is None:
+            return None
+        skip = removed | set(pending)
+        ranked = [(pk, score) for pk, score in ann.search(query, k + len(skip)) if pk not in skip]
+        if pending:
+            ids = list(pending)
+            scores = np.stack([vector for _, vector in pending.values()]) @ query
+            min_score = settings.EMBEDDINGS['MIN_SCORE']
+            ranked += [(pk, float(score)) for pk, score in zip(ids, scores) if score > min_score]
+        # Highest score first; ties go to the lower id
+        return sorted(ranked, key=lambda pair: (-pair[1], pair[0]))[:k]
+
+    def rebuild(self):
+        """Builds the IVF index from the stored vectors and swaps it in, keeping later changes pending."""
+        with self.lock:
+            seq = self.seq
+        started = time.perf_counter()
+        ids, vectors = [], []
+        rows = ProjectMatchVector.objects.filter(embedding_model=self.model_id).order_by('project_id')
+        for pk, data in rows.values_list('project_id', 'embedding').iterator(chunk_size=5000):
+            ids.append(pk)
+            vectors.append(decode_vector(data))
+        with span('embedding.index'):
+            ann = IVFIndex.build(ids, np.stack(vectors) if vectors else np.zeros((0, self.dimensions)))
+        with self.lock:
+            self.ann = ann
+            self.ann_ids = set(ids)
+            self.pending = {pk: entry for pk, entry in self.pending.items() if entry[0] > seq}
+            self.removed = {pk: s for pk, s in self.removed.items() if s > seq}
+        logger.info(f"Built the project embedding index: {len(ids)} projects in {time.perf_counter() - started:.2f}s.")
+
+    def catch_up(self):
+        """Applies project vectors stored or deleted by other processes."""
+        since = self.synced_at - timedelta(seconds=1)  # overlap so a save committed mid-check isn't missed
+        self.synced_at = timezone.now()
+        changed = ProjectMatchVector.objects.filter(updated_at__gte=since, embedding_model=self.model_id)
+        for pk, data in changed.values_list('project_id', 'embedding'):
+            self.add(pk, decode_vector(data))
+        stored = ProjectMatchVector.objects.filter(embedding_model=self.model_id)
+        if stored.count() != len(self):
+            stored = set(stored.values_list('project_id', flat=True))
+            for pk in (self.ann_ids | set(self.pending)) - stored - set(self.removed):
+                self.remove(pk)
+
+    def start_rebuild(self):
+        """Rebuilds in a background thread, unless one is already running."""
+        with self.lock:
+            if self.building:
+                return
+            self.building = True
+        threading.Thread(target=self._rebuild_in_background, name='project-embeddings', daemon=True).start()
+
+    def _rebuild_in_background(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            logger.error(f"Rebuilding the project embedding index failed: {e}")
+        finally:
+            with self.lock:
+                self.building = False
+            connection.close()  # this thread's own connection
+
+
+def get_project_vectors(embedder):
+    """This process's ``ProjectVectors`` for ``embedder``; starts, and keeps up, its background builds."""
+    global _projects
+    projects = _projects
+    if projects is None or projects.model_id != embedder.model_id:
+        with _lock:
+            if _projects is None or _projects.model_id != embedder.model_id:
+                _projects = ProjectVectors(embedder.model_id, embedder.dimensions)
+                _projects.start_rebuild()
+            return _projects
+    if time.monotonic() - projects.checked_at >= settings.PROJECT_INDEX['CHECK_INTERVAL']:
+        with _lock:
+            if time.monotonic() - projects.checked_at >= settings.PROJECT_INDEX['CHECK_INTERVAL']:
+                projects.checked_at = time.monotonic()
+                projects.catch_up()
+                if projects.changes() >= settings.EMBEDDINGS['REBUILD_AFTER']:
+                    projects.start_rebuild()
+    return projects
+
+
+def top_courses(skills, k=5):
+    """The ``k`` courses closest to ``skills``, or None without a model."""
+    embedder = get_embedder()
+    if embedder is None:
+        return None
+    vector = embed_skills(skills, embedder)
+    index, ann = get_course_ann(embedder)
+    return [index.courses[row] for row, _ in ann.search(vector, k)]
+
+
+def top_projects(skills, k=None):
+    """The ``k`` projects closest to ``skills``, each with a ``match_score``; None until the index is ready."""
+    embedder = get_embedder()
+    if embedder is None:
+        return None
+    ranked = get_project_vectors(embedder).search(embed_skills(skills, embedder), k or settings.PROJECT_INDEX['TOP_K'])
+    return None if ranked is None else load_ranked(ranked)
+
+
+def reset_embeddings():
+    """Drops the in-process model and indexes so the next call reloads them."""
+    global _embedder, _model_missing_at, _course_ann, _projects, _queries
+    with _lock:
+        _embedder = _model_missing_at = _course_ann = _projects = _queries = None
+
+
+def _read_manifest(path):
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,431 @@
+"""
+Hashed TF-IDF matching (``MATCH_ENGINE = 'hashing'``).
+
+The fitted indexes (core/course_index.py, core/project_index.py) number
+their terms over the corpus they were built from, so adding one course or
+project means refitting everything. Here a term's column is a stable hash
+of the term itself (sklearn's ``FeatureHasher``: MurmurHash3 modulo
+``HASHING_INDEX['N_FEATURES']``), so a document is featurized from its
+own terms alone and every worker puts a term in the same column.
+
+Document frequencies are a per-column counter that adds and removals
+keep up to date, and the IDF is applied on the query side only:
+documents are stored as L2-normalised term counts, queries as their
+counts times ``idf ** 2``, normalised. That keeps the numerator of the
+usual TF-IDF cosine (``tf_q * idf * tf_d * idf``) and only measures
+document length without IDF, which ranks close to a refit index as long
+as documents rarely repeat their common words (course intros and skill
+lists don't; see benchmarks/incremental_updates.py). A stored document
+never has to be reweighted, so adding or removing one is O(its terms),
+and scores only depend on which documents are indexed, not on the order
+the updates arrived in: workers that have seen the same changes agree
+(to float rounding, until their next compactions).
+
+Updates work like the candidate search index (core/candidate_index.py):
+new documents go to a pending segment that queries read alongside the
+main postings and removed ones are tombstoned. Once pending entries plus
+tombstones reach ``COMPACT_AFTER``, a background thread merges them into
+new main postings while queries and updates carry on.
+
+Projects are indexed by their stored skill vectors, like the project
+match index (projects without one wait for ``manage.py index_projects``),
+and follow saves and deletes through the project signals and, for
+changes made by other processes, ``ProjectMatchVector.updated_at``.
+Courses are indexed by the words of their title and intro; when the
+catalog CSV changes, only the rows that were added or removed are applied.
+"""
+import logging
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+from scipy import sparse
+from sklearn.feature_extraction import FeatureHasher
+
+from .course_index import CATALOG_FIELDS, Course, catalog_changed, catalog_fingerprint, load_catalog, make_vectorizer
+from .instrumentation import span
+from .models import ProjectMatchVector
+from .project_index import load_ranked, project_skills
+
+logger = logging.getLogger(__name__)
+
+
+class HashedTfidfIndex:
+    """
+    Cosine ranking over hashed term counts. Documents are added under a
+    key with the terms to index, a ``rank`` that breaks score ties (lowest
+    first) and the ``item`` searches return (the key by default).
+    Writers take a lock; readers only hold it to snapshot the segments.
+    """
+
+    def __init__(self, n_features=None, compact_after=None):
+        conf = settings.HASHING_INDEX
+        self.n_features = n_features or conf['N_FEATURES']
+        self.compact_after = compact_after or conf['COMPACT_AFTER']
+        self.hasher = FeatureHasher(self.n_features, input_type='string', alternate_sign=False, dtype=np.float32)
+        self.size = 0                      # ordinals handed out so far
+        self.live = np.zeros(0, dtype=bool)
+        self.ranks = np.zeros(0, dtype=np.int64)
+        self.items = []                    # ordinal -> search result
+        self.columns = []                  # ordinal -> hashed columns (to undo its df on removal)
+        self.signatures = []               # ordinal -> hash of the indexed terms
+        self.ordinals = {}                 # key -> ordinal
+        self.df = np.zeros(self.n_features, dtype=np.int32)
+        # Main postings, column-major: (indptr, ordinals, weights)
+        self.main = (np.zeros(self.n_features + 1, dtype=np.int64), np.zeros(0, np.int32), np.zeros(0, np.float32))
+        self.pending = defaultdict(list)   # column -> [(ordinal, weight)]
+        self.merging = {}                  # the pending segment a running compaction is merging
+        self.pending_count = 0
+        self.dead = 0
+        self._lock = threading.RLock()
+        self._compact_lock = threading.Lock()
+        self._compaction = None
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def keys(self):
+        with self._lock:
+            return list(self.ordinals)
+
+    def featurize(self, term_lists):
+        """(documents x n_features) CSR of L2-normalised hashed term counts."""
+        matrix = self.hasher.transform(term_lists)
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        matrix.data /= np.repeat(norms, np.diff(matrix.indptr)).astype(np.float32)
+        return matrix
+
+    @classmethod
+    def build(cls, docs, **kwargs):
+        """Builds an index from ``(key, terms, rank, item)`` tuples, as if each were ``add``ed."""
+        index = cls(**kwargs)
+        docs = list(docs)
+        matrix = index.featurize([terms for _, terms, _, _ in docs])
+        kept = []
+        with index._lock:
+            for row, (key, terms, rank, item) in enumerate(docs):
+                if key in index.ordinals:  # a repeated key keeps its first document
+                    continue
+                columns = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+                index._allocate(key, item, rank, hash(tuple(terms)), columns)
+                kept.append(row)
+            if len(kept) < len(docs):
+                matrix = matrix[kept]
+            postings = matrix.T.tocsr()
+            postings.sort_indices()
+            index.main = (postings.indptr.astype(np.int64), postings.indices.astype(np.int32), postings.data)
+            index.df = np.bincount(matrix.indices, minlength=index.n_features).astype(np.int32)
+        return index
+
+    # -- updating ------------------------------------------------------------
+
+    def add(self, key, terms, rank, item=None):
+        """Indexes (or re-indexes) a document; unchanged documents are left alone."""
+        terms = list(terms)
+        signature = hash(tuple(terms))
+        with self._lock:
+            ordinal = self.ordinals.get(key)
+            if ordinal is not None and self.signatures[ordinal] == signature:
+                return
+            self._remove(key)
+            row = self.featurize([terms])
+            ordinal = self._allocate(key, item, rank, signature, row.indices)
+            for column, weight in zip(row.indices.tolist(), row.data.tolist()):
+                self.pending[column].append((ordinal, weight))
+            self.df[row.indices] += 1
+            self.pending_count += len(row.indices)
+            self._maybe_compact()
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+            self._maybe_compact()
+
+    def _remove(self, key):
+        ordinal = self.ordinals.pop(key, None)
+        if ordinal is not None:
+            self.live[ordinal] = False
+            self.df[self.columns[ordinal]] -= 1
+            self.items[ordinal] = self.columns[ordinal] = None
+            self.dead += 1
+
+    def _allocate(self, key, item, rank, signature, columns):
+        if self.size == len(self.live):
+            capacity = max(1024, 2 * self.size)
+            self.ranks = np.resize(self.ranks, capacity)
+            live = np.zeros(capacity, dtype=bool)
+            live[:self.size] = self.live[:self.size]
+            self.live = live
+        ordinal = self.size
+        self.ranks[ordinal] = rank
+        self.live[ordinal] = True
+        self.items.append(key if item is None else item)
+        self.columns.append(columns)
+        self.signatures.append(signature)
+        self.size += 1
+        self.ordinals[key] = ordinal
+        return ordinal
+
+    def _maybe_compact(self):
+        if self.pending_count + self.dead < self.compact_after:
+            return
+        if self._compaction is None or not self._compaction.is_alive():
+            self._compaction = threading.Thread(target=self.compact, name='hashed-index-compaction', daemon=True)
+            self._compaction.start()
+
+    def compact(self):
+        """
+        Merges the pending segment into new main postings and drops the
+        tombstoned entries. Updates made meanwhile go to a fresh pending
+        segment; documents removed meanwhile stay masked until the next
+        compaction.
+        """
+        with self._compact_lock:
+            with self._lock:
+                merging = self.merging = self.pending
+                self.pending = defaultdict(list)
+                self.pending_count = 0
+                self.dead = 0
+                live = self.live[:self.size].copy()
+                indptr, ordinals, weights = self.main
+
+            started = time.perf_counter()
+            columns = np.repeat(np.arange(self.n_features, dtype=np.int64), np.diff(indptr))
+            extra = [(column, ordinal, weight) for column, entries in merging.items() for ordinal, weight in entries]
+            if extra:
+                extra_columns, extra_ordinals, extra_weights = zip(*extra)
+                columns = np.concatenate([columns, np.array(extra_columns, dtype=np.int64)])
+                ordinals = np.concatenate([ordinals, np.array(extra_ordinals, dtype=np.int32)])
+                weights = np.concatenate([weights, np.array(extra_weights, dtype=np.float32)])
+            keep = live[ordinals]
+            postings = sparse.csr_matrix(
+                (weights[keep], (columns[keep], ordinals[keep])), shape=(self.n_features, len(live)))
+            postings.sort_indices()
+            with self._lock:
+                self.main = (postings.indptr.astype(np.int64), postings.indices.astype(np.int32), postings.data)
+                self.merging = {}
+        logger.info(f"Compacted the hashed index: {len(self)} documents, {postings.nnz} postings "
+                    f"in {time.perf_counter() - started:.2f}s.")
+
+    # -- querying ------------------------------------------------------------
+
+    @staticmethod
+    def query_weights(counts, df, n):
+        """Query weights: term counts times ``idf ** 2``, L2-normalised."""
+        # Smoothed IDF over the indexed documents, as in sklearn's TfidfVectorizer
+        idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+        weights = counts * idf * idf
+        return weights / np.sqrt(weights @ weights)
+
+    def search(self, terms, k=10, min_score=0.0):
+        """Up to ``k`` ``(item, score)`` pairs scoring above ``min_score``, best first."""
+        row = self.hasher.transform([list(terms)])
+        columns = row.indices
+        if k <= 0 or not len(columns):
+            return []
+        with self._lock:
+            n, size, live = len(self.ordinals), self.size, self.live
+            (indptr, ordinals, weights), df = self.main, self.df[columns]
+            # Copies, so entries appended meanwhile (past ``size``) aren't read
+            extra = [(column, segment[column][:]) for segment in (self.merging, self.pending)
+                     for column in columns.tolist() if segment.get(column)]
+        if not n:
+            return []
+
+        with span('hashing.score'):
+            query = dict(zip(columns.tolist(), self.query_weights(row.data, df, n).tolist()))
+            scores = np.zeros(size, dtype=np.float32)
+            for column, weight in query.items():
+                start, end = indptr[column], indptr[column + 1]
+                scores[ordinals[start:end]] += np.float32(weight) * weights[start:end]
+            for column, entries in extra:
+                pending_ordinals, pending_weights = zip(*entries)
+                scores[list(pending_ordinals)] += np.float32(query[column]) * np.array(pending_weights, np.float32)
+
+        candidates = np.flatnonzero((scores > min_score) & live[:size])
+        if len(candidates) > k:
+            # Everything above the k-th best score, then ties broken by rank
+            candidate_scores = scores[candidates]
+            kth = np.partition(candidate_scores, len(candidates) - k)[len(candidates) - k]
+            above = candidates[candidate_scores > kth]
+            ties = candidates[candidate_scores == kth]
+            candidates = np.concatenate([above, ties[np.argsort(self.ranks[ties], kind='stable')][:k - len(above)]])
+        order = candidates[np.lexsort((self.ranks[candidates], -scores[candidates]))]
+        ranked = [(self.items[i], float(scores[i])) for i in order]
+        return [(item, score) for item, score in ranked if item is not None]  # removed since the snapshot
+
+
+# -- shared instances ----------------------------------------------------------
+
+_lock = threading.Lock()
+_projects = None
+_synced_at = None
+_checked_at = 0.0
+_courses = None
+_catalog = None
+_course_checked_at = 0.0
+_sync_thread = None
+
+
+def project_terms(skills):
+    """A user's skills normalised like project skills, as query terms."""
+    return project_skills(skills)
+
+
+def get_project_index():
+    """The shared project index: built on first use, then kept in sync with the project vectors."""
+    global _projects, _checked_at
+    if _projects is None:
+        with _lock:
+            if _projects is None:
+                _projects = _load_projects()
+                _checked_at = time.monotonic()
+            return _projects
+
+    if time.monotonic() - _checked_at >= settings.PROJECT_INDEX['CHECK_INTERVAL']:
+        with _lock:
+            if time.monotonic() - _checked_at >= settings.PROJECT_INDEX['CHECK_INTERVAL']:
+                _checked_at = time.monotonic()
+                _catch_up(_projects)
+    return _projects
+
+
+def index_project(project_id, skills):
+    """Applies a saved project's canonical skills to the index, if this process has loaded it."""
+    if _projects is not None:
+        _projects.add(project_id, skills, rank=project_id)
+
+
+def unindex_project(project_id):
+    if _projects is not None:
+        _projects.remove(project_id)
+
+
+def top_projects(skills, k=None):
+    """The ``k`` best matching projects for ``skills``, each with a ``match_score``."""
+    ranked = get_project_index().search(project_terms(skills), k or settings.PROJECT_INDEX['TOP_K'])
+    return load_ranked(ranked)
+
+
+def _project_docs(rows):
+    for pk, stored in rows:
+        yield pk, stored.split(",") if stored else [], pk, None
+
+
+def _load_projects():
+    global _synced_at
+    started = time.perf_counter()
+    _synced_at = timezone.now()
+    rows = ProjectMatchVector.objects.values_list('project_id', 'skills').iterator(chunk_size=5000)
+    index = HashedTfidfIndex.build(_project_docs(rows))
+    logger.info(f"Built the hashed project index: {len(index)} projects in {time.perf_counter() - started:.2f}s.")
+    return index
+
+
+def _catch_up(index):
+    """Applies project vectors saved or deleted by other processes."""
+    global _synced_at
+    since = _synced_at - timedelta(seconds=1)  # overlap so a save committed mid-check isn't missed
+    _synced_at = timezone.now()
+    changed = ProjectMatchVector.objects.filter(updated_at__gte=since).values_list('project_id', 'skills')
+    for pk, terms, rank, _ in _project_docs(changed):
+        index.add(pk, terms, rank)
+
+    if ProjectMatchVector.objects.count() != len(index):
+        stored = set(ProjectMatchVector.objects.values_list('project_id', flat=True))
+        for pk in index.keys():
+            if pk not in stored:
+                index.remove(pk)
+
+
+def get_course_index():
+    """
+    The shared course index, built from the catalog CSV on first use.
+    Every ``COURSE_INDEX_CHECK_INTERVAL`` seconds the CSV is checked; if
+    it changed, the added and removed rows are applied in the background.
+    """
+    global _courses, _catalog, _course_checked_at
+    if _courses is None:
+        with _lock:
+            if _courses is None:
+                _catalog = catalog_fingerprint(settings.COURSE_CATALOG_PATH)
+                started = time.perf_counter()
+                _courses = HashedTfidfIndex.build(_course_docs())
+                _course_checked_at = time.monotonic()
+                logger.info(f"Built the hashed course index: {len(_courses)} courses "
+                            f"in {time.perf_counter() - started:.2f}s.")
+            return _courses
+
+    if time.monotonic() - _course_checked_at >= settings.COURSE_INDEX_CHECK_INTERVAL:
+        with _lock:
+            if time.monotonic() - _course_checked_at >= settings.COURSE_INDEX_CHECK_INTERVAL:
+                _course_checked_at = time.monotonic()
+                _check_catalog()
+    return _courses
+
+
+def top_courses(skills, k=5):
+    """The ``k`` best matching courses for ``skills`` (a list or the stored ", "-joined string)."""
+    text = skills if isinstance(skills, str) else " ".join(skills)
+    analyze = make_vectorizer().build_analyzer()
+    ranked = get_course_index().search(analyze(text), k, min_score=settings.COURSE_MIN_SCORE)
+    return [course for course, _ in ranked]
+
+
+def sync_courses():
+    """Applies the catalog rows added or removed since the index was built. Returns (added, removed)."""
+    global _catalog
+    fingerprint = catalog_fingerprint(settings.COURSE_CATALOG_PATH)
+    index = _courses
+    docs = list(_course_docs())
+    current = {doc[0] for doc in docs}
+    known = set(index.keys())
+    added = [doc for doc in docs if doc[0] not in known]
+    removed = known - current
+    for key, terms, rank, item in added:
+        index.add(key, terms, rank, item)
+    for key in removed:
+        index.remove(key)
+    _catalog = fingerprint
+    logger.info(f"Synced the hashed course index: {len(added)} courses added, {len(removed)} removed.")
+    return len(added), len(removed)
+
+
+def reset_hashing_index():
+    global _projects, _synced_at, _checked_at, _courses, _catalog, _course_checked_at
+    with _lock:
+        _projects, _synced_at, _checked_at = None, None, 0.0
+        _courses, _catalog, _course_checked_at = None, None, 0.0
+
+
+def _course_docs():
+    """``(key, terms, rank, Course)`` per catalog row; a row's key is its field values."""
+    df = load_catalog(settings.COURSE_CATALOG_PATH)
+    analyze = make_vectorizer().build_analyzer()
+    columns = [df[column].fillna('').astype(str).tolist() for _, column in CATALOG_FIELDS]
+    fields = [field for field, _ in CATALOG_FIELDS]
+    for row, values in enumerate(zip(*columns)):
+        course = Course(**dict(zip(fields, values)))
+        yield values, analyze(f"{course.name} {course.description}"), row, course
+
+
+def _check_catalog():
+    global _sync_thread
+    if _sync_thread is not None and _sync_thread.is_alive():
+        return
+    if _catalog is not None and catalog_changed(_catalog):
+        logger.info("Course catalog changed, updating the hashed course index in the background.")
+        _sync_thread = threading.Thread(target=_sync, name='hashed-course-sync', daemon=True)
+        _sync_thread.start()
+
+
+def _sync():
+    try:
+        sync_courses()
+    except Exception as e:
+        logger.error(f"Hashed course index update failed: {e}")
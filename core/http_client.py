@@ -0,0 +1,256 @@
+"""
+Shared HTTP client for the outbound job and repository APIs.
+
+One ``UpstreamClient`` per upstream keeps a pooled keep-alive
+``requests.Session``, applies explicit connect/read timeouts, retries
+transient failures with exponential backoff (honouring ``Retry-After``
+and GitHub's ``X-RateLimit-*`` headers) and trips a circuit breaker when
+an upstream keeps failing so requests short-circuit instead of queueing.
+
+The breaker sees one outcome per ``get()``, however many attempts it
+took: a success, a failure (the last attempt raised or got a retryable
+status) or a long rate limit that holds it open. Its failure threshold
+therefore counts failed requests, and a half-open trial always settles.
+"""
+import email.utils
+import logging
+import random
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+from .instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+REQUEST_DURATION = metrics.histogram(
+    'upstream_request_duration_seconds', "Latency of outbound API requests.", ('upstream',))
+REQUESTS = metrics.counter(
+    'upstream_requests_total', "Outbound API responses by status code.", ('upstream', 'status'))
+ERRORS = metrics.counter(
+    'upstream_request_errors_total', "Failed outbound API attempts by reason.", ('upstream', 'reason'))
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive failures and rejects
+    calls for ``reset_timeout`` seconds, then lets one trial call through
+    (half-open) to decide whether to close again.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.open_until = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.open_until == 0.0:
+            return 'closed'
+        return 'open' if time.monotonic() < self.open_until else 'half-open'
+
+    def allow(self):
+        with self._lock:
+            if self.open_until == 0.0:
+                return True
+            if time.monotonic() < self.open_until or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.open_until = 0.0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.failures >= self.failure_threshold or self.open_until:
+                self.open_until = time.monotonic() + self.reset_timeout
+
+    def hold_open(self, seconds):
+        """Opens the circuit for ``seconds`` (e.g. until a rate limit resets)."""
+        with self._lock:
+            self._trial_in_flight = False
+            self.open_until = max(self.open_until, time.monotonic() + seconds)
+
+
+def retry_after_seconds(response):
+    """
+    How long the upstream asked us to wait, from ``Retry-After`` (seconds
+    or HTTP date) or GitHub's exhausted ``X-RateLimit-Reset``; ``None`` if
+    it didn't say.
+    """
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        if retry_after.strip().isdigit():
+            return float(retry_after)
+        try:
+            return max(email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            pass
+
+    if response.headers.get('X-RateLimit-Remaining') == '0':
+        reset = response.headers.get('X-RateLimit-Reset')
+        if reset and reset.isdigit():
+            return max(int(reset) - time.time(), 0.0)
+    return None
+
+
+def is_rate_limited(response):
+    if response.status_code == 429:
+        return True
+    # GitHub answers 403 when the primary or secondary rate limit is hit
+    return response.status_code == 403 and (
+        response.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in response.headers
+    )
+
+
+class UpstreamClient:
+    def __init__(self, name, connect_timeout=3.05, read_timeout=10.0, max_retries=2, backoff_factor=0.5,
+                 max_retry_wait=5.0, pool_maxsize=10, breaker=None):
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_retry_wait = max_retry_wait
+        self.breaker = breaker or CircuitBreaker(failure_threshold=5, reset_timeout=30)
+        self.session = self.make_session(pool_maxsize)
+
+    def make_session(self, pool_maxsize):
+        # requests pools connections per host inside each adapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def backoff(self, attempt):
+        delay = self.backoff_factor * (2 ** attempt)
+        return delay + random.uniform(0, delay / 10)
+
+    def get(self, url, **kwargs):
+        """
+        GET ``url`` with pooling, timeouts, retries and the circuit breaker.
+        Returns the final response (which may still be an error status) or
+        raises ``requests.RequestException`` / ``CircuitOpenError``.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        with span(f'upstream.{self.name}'):
+            return self._get(url, **kwargs)
+
+    def _get(self, url, **kwargs):
+        self.check_breaker()
+        try:
+            response = self._attempts(url, **kwargs)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.record_outcome(response)
+        return response
+
+    def _attempts(self, url, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.RequestException as e:
+                reason = 'timeout' if isinstance(e, requests.Timeout) else 'connection'
+                self.record_error(started, reason)
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"{self.name} request failed ({reason}), retrying: {e}")
+                time.sleep(self.backoff(attempt))
+                continue
+
+            delay = self.retry_delay(started, response, attempt)
+            if delay is None:
+                return response
+            time.sleep(delay)
+
+    def check_breaker(self):
+        if not self.breaker.allow():
+            ERRORS.inc(upstream=self.name, reason='circuit_open')
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+
+    def record_error(self, started, reason):
+        """Records an attempt that got no response."""
+        REQUEST_DURATION.observe(time.perf_counter() - started, upstream=self.name)
+        ERRORS.inc(upstream=self.name, reason=reason)
+
+    def record_outcome(self, response):
+        """Settles the breaker with the response handed to the caller."""
+        if not is_rate_limited(response) and response.status_code not in RETRY_STATUSES:
+            self.breaker.record_success()
+            return
+        wait = retry_after_seconds(response) if is_rate_limited(response) else None
+        if wait is not None and wait > self.max_retry_wait:
+            # Not worth holding workers; short-circuit until the limit resets
+            logger.warning(f"{self.name} rate limited for {wait:.0f}s")
+            self.breaker.hold_open(wait)
+        else:
+            self.breaker.record_failure()
+
+    def retry_delay(self, started, response, attempt):
+        """
+        Records a response; returns ``None`` to hand it to the caller, or
+        the seconds to wait before the next attempt.
+        """
+        REQUEST_DURATION.observe(time.perf_counter() - started, upstream=self.name)
+        REQUESTS.inc(upstream=self.name, status=response.status_code)
+
+        rate_limited = is_rate_limited(response)
+        if not rate_limited and response.status_code not in RETRY_STATUSES:
+            return None
+
+        wait = retry_after_seconds(response)
+        if rate_limited:
+            ERRORS.inc(upstream=self.name, reason='rate_limited')
+            if wait is not None and wait > self.max_retry_wait:
+                return None
+        else:
+            ERRORS.inc(upstream=self.name, reason=f'http_{response.status_code}')
+
+        if attempt == self.max_retries:
+            return None
+        delay = min(wait if wait is not None else self.backoff(attempt), self.max_retry_wait)
+        logger.warning(f"{self.name} answered {response.status_code}, retrying in {delay:.2f}s")
+        return delay
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(name):
+    """Returns the shared client for an upstream, configured from ``settings.UPSTREAM_HTTP``."""
+    with _clients_lock:
+        if name not in _clients:
+            conf = settings.UPSTREAM_HTTP
+            _clients[name] = UpstreamClient(
+                name,
+                connect_timeout=conf['CONNECT_TIMEOUT'],
+                read_timeout=conf['READ_TIMEOUT'],
+                max_retries=conf['MAX_RETRIES'],
+                backoff_factor=conf['BACKOFF_FACTOR'],
+                max_retry_wait=conf['MAX_RETRY_WAIT'],
+                pool_maxsize=conf['POOL_MAXSIZE'],
+                breaker=CircuitBreaker(conf['BREAKER_FAILURE_THRESHOLD'], conf['BREAKER_RESET_TIMEOUT']),
+            )
+        return _clients[name]
@@ -0,0 +1,133 @@
+"""
+Request-level timing and profiling.
+
+``span(name)`` times a block of code (PDF extraction, spaCy, TF-IDF,
+upstream calls, template rendering...). Every span is recorded in the
+``span_duration_seconds`` histogram and, during a request, in that
+request's timings, which ``core.middleware.request_timing_middleware``
+turns into a ``Server-Timing`` header and a log line.
+
+Request timings live in a context variable, so spans recorded on the
+dashboard fan-out threads and in async tasks count towards the request
+that started them (``core.aggregation`` copies the context into its
+executors).
+
+A sampled share of requests can run under cProfile
+(``INSTRUMENTATION['PROFILE_SAMPLE_RATE']``); the profile is written to
+``PROFILE_DIR`` when the request is slower than
+``SLOW_REQUEST_THRESHOLD``. Read it with ``python -m pstats <file>``.
+cProfile only sees the thread it runs on (the fan-out threads are not
+included) and only one request per process is profiled at a time.
+"""
+import contextvars
+import cProfile
+import logging
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+
+from django.conf import settings
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+SPAN_DURATION = metrics.histogram(
+    'span_duration_seconds', "Time spent in instrumented code paths.", ('span',))
+REQUEST_DURATION = metrics.histogram(
+    'http_request_duration_seconds', "Request latency by view.", ('view', 'method', 'status'))
+
+_timings = contextvars.ContextVar('request_timings', default=None)
+_profiling = threading.Lock()  # cProfile can't nest, so one profiled request at a time
+
+
+def record(name, seconds):
+    SPAN_DURATION.observe(seconds, span=name)
+    timings = _timings.get()
+    if timings is not None:
+        timings.append((name, seconds))
+
+
+class span:
+    """``with span(name):`` times the enclosed block as ``name``."""
+    # A plain class rather than @contextmanager: spans sit on per-query paths
+    __slots__ = ('name', 'started')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.started)
+
+
+def summarize(timings):
+    """Total seconds per span name, in the order the names first appeared."""
+    totals = {}
+    for name, seconds in timings:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return totals
+
+
+class RequestTimer:
+    """Collects one request's spans and, if sampled, profiles it."""
+
+    def __init__(self, request):
+        self.request = request
+        self.timings = []
+        self.profiler = None
+        conf = settings.INSTRUMENTATION
+        if conf['PROFILE_SAMPLE_RATE'] and random.random() < conf['PROFILE_SAMPLE_RATE']:
+            if _profiling.acquire(blocking=False):
+                self.profiler = cProfile.Profile()
+
+    def __enter__(self):
+        self._token = _timings.set(self.timings)
+        self.started = time.perf_counter()
+        if self.profiler is not None:
+            self.profiler.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.started
+        if self.profiler is not None:
+            self.profiler.disable()
+            _profiling.release()
+        _timings.reset(self._token)
+
+    def finish(self, response):
+        """Records the request and annotates ``response``; returns it."""
+        request = self.request
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else 'unresolved'
+        REQUEST_DURATION.observe(self.elapsed, view=view, method=request.method, status=response.status_code)
+
+        totals = summarize(self.timings)
+        if settings.INSTRUMENTATION['SERVER_TIMING']:
+            entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in totals.items()]
+            response['Server-Timing'] = ", ".join(entries + [f"total;dur={self.elapsed * 1000:.1f}"])
+
+        spans = ",".join(f"{name}={seconds * 1000:.1f}" for name, seconds in totals.items()) or "-"
+        logger.info(f"request method={request.method} path={request.path} view={view} "
+                    f"status={response.status_code} duration_ms={self.elapsed * 1000:.1f} spans={spans}")
+
+        if self.elapsed >= settings.INSTRUMENTATION['SLOW_REQUEST_THRESHOLD']:
+            path = self.dump_profile() if self.profiler is not None else None
+            logger.warning(f"Slow request {request.method} {request.path} took {self.elapsed * 1000:.0f}ms"
+                           + (f"; profile written to {path}" if path else ""))
+        return response
+
+    def dump_profile(self):
+        directory = settings.INSTRUMENTATION['PROFILE_DIR']
+        os.makedirs(directory, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9]+', '-', self.request.path).strip('-') or 'root'
+        name = f"{datetime.now():%Y%m%d-%H%M%S}-{self.request.method}-{slug}-{self.elapsed * 1000:.0f}ms.prof"
+        path = os.path.join(directory, name)
+        self.profiler.dump_stats(path)
+        return path
@@ -0,0 +1,219 @@
+"""
+Locally harvested job index.
+
+``manage.py harvest_jobs`` (run periodically, e.g. hourly from cron)
+searches Adzuna for each of ``JOB_INDEX['SKILLS']`` (by default the
+built-in skill vocabulary, not the Skill table) in each of
+``JOB_INDEX['LOCATIONS']``, ``PAGES`` pages deep, and stores the listings
+as ``JobPosting`` rows, one per Adzuna job id however many searches
+return it. Listings whose indexed text hasn't changed only get their
+``last_seen`` refreshed; ones no harvest has returned for
+``MAX_AGE_DAYS`` are deleted.
+
+With ``JOB_SOURCE = 'index'`` the dashboard ranks these rows against the
+user's skills instead of calling Adzuna on each view: on SQLite, one
+FTS5 ``MATCH`` over title, company and description ordered by bm25
+(the table and its triggers are created by migration 0010); elsewhere,
+or without FTS5, a ``LIKE`` filter ordered by posting date. Only the
+``CANDIDATES`` most recently stored matches are ranked, which bounds the
+search time however many postings match a common skill.
+"""
+import logging
+import time
+from datetime import timedelta
+
+import requests
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.html import strip_tags
+
+from .http_client import CircuitOpenError, get_client
+from .instrumentation import span
+from .lookup_cache import canonical_skills
+from .models import JobPosting
+from .skills import SKILL_KEYWORDS
+
+logger = logging.getLogger(__name__)
+
+FTS_TABLE = 'core_jobposting_fts'
+# bm25 column weights: title, company, description
+FTS_WEIGHTS = (4.0, 1.0, 1.0)
+
+INDEXED_FIELDS = ['title', 'company', 'description']
+STORED_FIELDS = ['country', 'location', 'posted_at', 'data', 'last_seen']
+
+_fts_available = {}
+
+
+def harvest_skills():
+    """The skills searched for: ``JOB_INDEX['SKILLS']``, or the built-in vocabulary if that is empty."""
+    return list(settings.JOB_INDEX['SKILLS'] or SKILL_KEYWORDS)
+
+
+def harvest_jobs(skills=None, locations=None, pages=None, results_per_page=None):
+    """
+    Fetches and stores the listings for ``skills`` in ``locations``, then
+    expires old ones. Paging stops at the first short page. Returns counts
+    of what was done.
+    """
+    from .utils import adzuna_request, adzuna_results
+
+    conf = settings.JOB_INDEX
+    skills = skills or harvest_skills()
+    locations = locations or conf['LOCATIONS']
+    pages = pages or conf['PAGES']
+    results_per_page = results_per_page or conf['RESULTS_PER_PAGE']
+
+    stats = {'requests': 0, 'failed': 0, 'fetched': 0, 'created': 0, 'updated': 0, 'refreshed': 0}
+    seen = set()
+    started = time.perf_counter()
+    client = get_client('adzuna')
+    try:
+        for location in locations:
+            for skill in skills:
+                for page in range(1, pages + 1):
+                    endpoint, params = adzuna_request(skill, location, page=page, results_per_page=results_per_page)
+                    stats['requests'] += 1
+                    try:
+                        response = client.get(endpoint, params=params)
+                    except CircuitOpenError:
+                        raise
+                    except requests.RequestException as e:
+                        logger.error(f"Adzuna harvest of {skill!r} in {location} (page {page}) failed: {e}")
+                        stats['failed'] += 1
+                        break
+                    if response.status_code != 200:
+                        logger.error(f"Adzuna harvest of {skill!r} in {location} (page {page}) "
+                                     f"got status {response.status_code}")
+                        stats['failed'] += 1
+                        break
+                    results = adzuna_results(response)
+                    stats['fetched'] += len(results)
+                    fresh = []
+                    for result in results:
+                        job_id = str(result.get('id') or '')
+                        if job_id and job_id not in seen:
+                            seen.add(job_id)
+                            fresh.append(result)
+                    for name, count in store_results(fresh, location).items():
+                        stats[name] += count
+                    if len(results) < results_per_page:
+                        break
+    except CircuitOpenError as e:
+        logger.error(f"Adzuna harvest stopped: {e}")
+        stats['failed'] += 1
+
+    stats['expired'] = expire_jobs()
+    stats['seconds'] = time.perf_counter() - started
+    logger.info(f"Harvested {len(seen)} distinct jobs with {stats['requests']} requests in {stats['seconds']:.1f}s.")
+    return stats
+
+
+def make_posting(result, country, seen_at):
+    return JobPosting(
+        job_id=str(result['id']),
+        country=country,
+        title=strip_tags(result.get('title') or '')[:255],
+        company=strip_tags((result.get('company') or {}).get('display_name') or '')[:255],
+        location=((result.get('location') or {}).get('display_name') or '')[:255],
+        description=strip_tags(result.get('description') or ''),
+        posted_at=parse_datetime(result.get('created') or ''),
+        data=result,
+        last_seen=seen_at,
+    )
+
+
+def store_results(results, country, seen_at=None):
+    """
+    Upserts one page of Adzuna results by job id. Only rows whose indexed
+    text changed are rewritten in full (and so re-indexed), and unchanged
+    ones just get ``last_seen``; returns the created/updated/refreshed counts.
+    """
+    seen_at = seen_at or timezone.now()
+    postings = {}
+    for result in results:
+        if result.get('id'):
+            posting = make_posting(result, country, seen_at)
+            postings[posting.job_id] = posting
+
+    existing = {row[0]: row[1:] for row in JobPosting.objects.filter(job_id__in=list(postings))
+                .values_list('job_id', 'pk', 'data', *INDEXED_FIELDS)}
+    created, updated, changed, refreshed = [], [], [], []
+    for job_id, posting in postings.items():
+        if job_id not in existing:
+            created.append(posting)
+            continue
+        pk, data, *indexed = existing[job_id]
+        posting.pk = pk
+        if indexed != [getattr(posting, field) for field in INDEXED_FIELDS]:
+            updated.append(posting)
+        elif data != posting.data:
+            changed.append(posting)
+        else:
+            refreshed.append(pk)
+
+    with transaction.atomic():
+        # ignore_conflicts: a concurrent harvest may have inserted the same job since the lookup
+        JobPosting.objects.bulk_create(created, ignore_conflicts=True)
+        JobPosting.objects.bulk_update(updated, INDEXED_FIELDS + STORED_FIELDS)
+        JobPosting.objects.bulk_update(changed, STORED_FIELDS)
+        JobPosting.objects.filter(pk__in=refreshed).update(last_seen=seen_at)
+    return {'created': len(created), 'updated': len(updated) + len(changed), 'refreshed': len(refreshed)}
+
+
+def expiry_cutoff():
+    return timezone.now() - timedelta(days=settings.JOB_INDEX['MAX_AGE_DAYS'])
+
+
+def expire_jobs():
+    """Deletes postings no harvest has returned for ``MAX_AGE_DAYS``; returns how many."""
+    deleted, _ = JobPosting.objects.filter(last_seen__lt=expiry_cutoff()).delete()
+    return deleted
+
+
+def fts_available():
+    key = (connection.alias, connection.settings_dict['NAME'])
+    if key not in _fts_available:
+        _fts_available[key] = (connection.vendor == 'sqlite'
+                               and FTS_TABLE in connection.introspection.table_names())
+    return _fts_available[key]
+
+
+def fts_query(skills):
+    """An FTS5 query matching any of ``skills``, each as a quoted phrase."""
+    return " OR ".join('"' + skill.replace('"', '""') + '"' for skill in skills)
+
+
+def search_jobs(skills, location='us', k=None):
+    """
+    The ``k`` stored listings in ``location`` that best match ``skills``,
+    as the Adzuna result dicts ``fetch_real_time_jobs`` returns.
+    """
+    skills = canonical_skills(skills)
+    if not skills:
+        return []
+    k = k or settings.JOB_INDEX['TOP_K']
+    with span('jobs.search'):
+        if fts_available():
+            # bm25 is computed for every row ranked, which dominates for common skills:
+            # only the CANDIDATES most recently stored matches (an id range) are ranked
+            weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+            match = (f"{FTS_TABLE} f JOIN core_jobposting j ON j.id = f.rowid "
+                     f"WHERE {FTS_TABLE} MATCH %s AND j.country = %s AND j.last_seen >= %s")
+            query, cutoff = fts_query(skills), connection.ops.adapt_datetimefield_value(expiry_cutoff())
+            postings = JobPosting.objects.raw(
+                f"SELECT j.id, j.data FROM {match} AND f.rowid >= ("
+                f"SELECT MIN(rowid) FROM (SELECT f.rowid FROM {match} ORDER BY f.rowid DESC LIMIT %s)) "
+                f"ORDER BY bm25({FTS_TABLE}, {weights}), j.posted_at DESC LIMIT %s",
+                [query, location, cutoff, query, location, cutoff, settings.JOB_INDEX['CANDIDATES'], k],
+            )
+        else:
+            matches = Q()
+            for skill in skills:
+                matches |= Q(title__icontains=skill) | Q(description__icontains=skill)
+            postings = (JobPosting.objects.filter(matches, country=location, last_seen__gte=expiry_cutoff())
+                        .only('data')[:k])
+        return [posting.data for posting in postings]
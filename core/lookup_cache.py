@@ -0,0 +1,287 @@
+"""
+TTL + LRU response cache for the external job / repository lookups.
+
+Keys are built from a canonical skill set (lowercased, deduplicated,
+sorted) so users with the same skills in a different order or case share
+entries. Entries are fresh for ``TTL`` seconds and may then be served
+stale for another ``STALE_TTL`` seconds while a background refresh runs.
+
+Two backends are available: an in-process LRU (``local``) and Django's
+cache framework (``django``), which lets several gunicorn workers share
+hits when a shared cache (file, Redis, memcached...) is configured.
+
+``cached_lookup`` also wraps coroutine functions (the async fetchers of
+the ASGI deployment); they share entries with their sync counterparts.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+_refresh_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='lookup-cache-refresh')
+_refresh_tasks = set()  # keeps background refresh tasks of async lookups alive
+
+
+def canonical_skills(skills):
+    """Returns the skills as a sorted tuple of unique lowercase names."""
+    if not skills:
+        return ()
+    if isinstance(skills, str):
+        skills = skills.split(",")
+    return tuple(sorted({s.strip().lower() for s in skills if s and s.strip()}))
+
+
+class LocalBackend:
+    """Bounded in-process store with least-recently-used eviction."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, timeout):
+        """Stores ``entry`` and returns how many entries were evicted."""
+        evicted = 0
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    async def aget(self, key):
+        return self.get(key)
+
+    async def aset(self, key, entry, timeout):
+        return self.set(key, entry, timeout)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DjangoCacheBackend:
+    """Stores entries in a Django cache so every worker sees them."""
+
+    def __init__(self, name, alias='default'):
+        self.prefix = f"lookup:{name}:"
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def _key(self, key):
+        # Hash the key so it is valid for every cache backend (e.g. memcached)
+        return self.prefix + hashlib.sha1(repr(key).encode()).hexdigest()
+
+    def get(self, key):
+        return self.cache.get(self._key(key))
+
+    def set(self, key, entry, timeout):
+        # Size limits and eviction are left to the cache backend itself
+        self.cache.set(self._key(key), entry, timeout=timeout)
+        return 0
+
+    async def aget(self, key):
+        return await self.cache.aget(self._key(key))
+
+    async def aset(self, key, entry, timeout):
+        await self.cache.aset(self._key(key), entry, timeout=timeout)
+        return 0
+
+    def clear(self):
+        self.cache.clear()
+
+
+class LookupCache:
+    def __init__(self, name, backend, ttl, stale_ttl=0):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._counters = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'evictions': 0, 'refreshes': 0, 'errors': 0}
+        self._counter_lock = threading.Lock()
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+
+    def _count(self, counter, n=1):
+        with self._counter_lock:
+            self._counters[counter] += n
+
+    def stats(self):
+        with self._counter_lock:
+            return dict(self._counters)
+
+    def get_or_compute(self, key, compute):
+        now = time.time()
+        entry = self.backend.get(key)
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                self._count('hits')
+                return value
+            if now < stale_until:
+                self._count('stale_hits')
+                self._refresh_in_background(key, compute)
+                return value
+
+        self._count('misses')
+        value = compute()
+        self._store(key, value)
+        return value
+
+    async def aget_or_compute(self, key, compute):
+        """``get_or_compute`` for a coroutine function ``compute``."""
+        now = time.time()
+        entry = await self.backend.aget(key)
+        if entry is not None:
+            value, fresh_until, stale_until = entry
+            if now < fresh_until:
+                self._count('hits')
+                return value
+            if now < stale_until:
+                self._count('stale_hits')
+                self._refresh_in_task(key, compute)
+                return value
+
+        self._count('misses')
+        value = await compute()
+        await self._astore(key, value)
+        return value
+
+    def _entry(self, value):
+        now = time.time()
+        return (value, now + self.ttl, now + self.ttl + self.stale_ttl)
+
+    def _store(self, key, value):
+        # Lookups return [] on upstream errors; don't pin those in the cache
+        if not value:
+            return
+        evicted = self.backend.set(key, self._entry(value), timeout=self.ttl + self.stale_ttl)
+        if evicted:
+            self._count('evictions', evicted)
+
+    async def _astore(self, key, value):
+        if not value:
+            return
+        evicted = await self.backend.aset(key, self._entry(value), timeout=self.ttl + self.stale_ttl)
+        if evicted:
+            self._count('evictions', evicted)
+
+    def _refresh_in_background(self, key, compute):
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._store(key, compute())
+                self._count('refreshes')
+            except Exception as e:
+                self._count('errors')
+                logger.error(f"Background refresh of {self.name} cache failed: {e}")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        _refresh_executor.submit(refresh)
+
+    def _refresh_in_task(self, key, compute):
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        async def refresh():
+            try:
+                await self._astore(key, await compute())
+                self._count('refreshes')
+            except Exception as e:
+                self._count('errors')
+                logger.error(f"Background refresh of {self.name} cache failed: {e}")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(key)
+
+        task = asyncio.get_running_loop().create_task(refresh())
+        _refresh_tasks.add(task)
+        task.add_done_callback(_refresh_tasks.discard)
+
+    def clear(self):
+        self.backend.clear()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_lookup_cache(name):
+    """Returns the named cache, configured from ``settings.LOOKUP_CACHE``."""
+    with _caches_lock:
+        if name not in _caches:
+            conf = settings.LOOKUP_CACHE
+            if conf['BACKEND'] == 'django':
+                backend = DjangoCacheBackend(name, alias=conf['CACHE_ALIAS'])
+            else:
+                backend = LocalBackend(conf['MAX_ENTRIES'])
+            _caches[name] = LookupCache(name, backend, ttl=conf['TTL'], stale_ttl=conf['STALE_TTL'])
+        return _caches[name]
+
+
+def cache_stats():
+    """Hit/miss/eviction counters for every lookup cache in this process."""
+    with _caches_lock:
+        return {name: cache.stats() for name, cache in _caches.items()}
+
+
+def cached_lookup(name, key_func):
+    """
+    Decorator caching ``fn`` in the named lookup cache under
+    ``key_func(*args, **kwargs)``. The uncached function stays available
+    as ``fn.uncached``.
+    """
+    def decorator(fn):
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not settings.LOOKUP_CACHE['ENABLED']:
+                    return await fn(*args, **kwargs)
+                key = key_func(*args, **kwargs)
+                return await get_lookup_cache(name).aget_or_compute(key, lambda: fn(*args, **kwargs))
+
+            async_wrapper.uncached = fn
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not settings.LOOKUP_CACHE['ENABLED']:
+                return fn(*args, **kwargs)
+            key = key_func(*args, **kwargs)
+            return get_lookup_cache(name).get_or_compute(key, lambda: fn(*args, **kwargs))
+
+        wrapper.uncached = fn
+        return wrapper
+    return decorator
@@ -0,0 +1,73 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from benchmarks import suite
+
+
+class Command(BaseCommand):
+    help = ("Runs the benchmark suite (benchmarks/suite.py) on synthetic data in a throwaway database "
+            "and compares the results with a JSON baseline; exits non-zero on regressions.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--case', choices=list(suite.CASES), action='append',
+                            help="Only run this case (repeatable). Default: all.")
+        parser.add_argument('--scale', action='append',
+                            help="Rows / words per case: 1k, 10k, 100k or a number (repeatable). Default: 1k.")
+        parser.add_argument('--repeat', type=int, default=50, help="Timed calls per case.")
+        parser.add_argument('--budget', type=float, default=10.0,
+                            help="Seconds per case after which it stops early (with at least 5 calls).")
+        parser.add_argument('--baseline', default=suite.DEFAULT_BASELINE, help="Baseline JSON file to compare with.")
+        # Shared CI runners vary by +-25% from run to run; tighten this on dedicated hardware
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help="Allowed growth of the fastest call / peak memory over the baseline, as a ratio.")
+        parser.add_argument('--update-baseline', action='store_true',
+                            help="Write the results to the baseline file instead of comparing.")
+        parser.add_argument('--output', help="Also write the results to this JSON file.")
+
+    def handle(self, *args, **options):
+        try:
+            scales = [suite.parse_scale(value) for value in options['scale'] or ['1k']]
+        except ValueError as e:
+            raise CommandError(f"Invalid --scale: {e}")
+        baseline = {}
+        if not options['update_baseline'] and os.path.exists(options['baseline']):
+            baseline = suite.load_baseline(options['baseline'])
+
+        def report(key, entry):
+            before = baseline.get(key)
+            change = f"  ({entry['min_ms'] / suite.expected(entry, before, 'min_ms') - 1:+.0%} min)" if before else ""
+            self.stdout.write(
+                f"{key:28s} min={entry['min_ms']:8.2f}ms p50={entry['p50_ms']:8.2f}ms p95={entry['p95_ms']:8.2f}ms "
+                f"p99={entry['p99_ms']:8.2f}ms {entry['ops_per_s']:8.1f}/s peak={entry['peak_kib']:8.1f}KiB "
+                f"n={entry['samples']}{change}")
+
+        # Synthetic projects, users and resumes go into a test database, never the real one
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            results = suite.run(cases=options['case'], scales=scales, repeat=options['repeat'],
+                                budget=options['budget'], report=report)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['output']:
+            suite.write_results(options['output'], results, options['repeat'])
+        if options['update_baseline']:
+            suite.write_results(options['baseline'], results, options['repeat'])
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}."))
+            return
+        if not baseline:
+            self.stdout.write(f"No baseline at {options['baseline']}; run with --update-baseline to record one.")
+            return
+
+        regressions = suite.compare(results, baseline, options['tolerance'])
+        for key, metric, old, new in regressions:
+            self.stderr.write(f"{key}: {metric} expected {old:.2f}, got {new:.2f} ({new / old - 1:+.0%})")
+        if regressions:
+            raise CommandError(f"{len(regressions)} benchmark metric(s) regressed by more than "
+                               f"{options['tolerance']:.0%}.")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.course_index import CourseIndex, build_index
+
+
+class Command(BaseCommand):
+    help = "Fits the TF-IDF course index from the course catalog CSV and persists it to disk."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--csv', default=settings.COURSE_CATALOG_PATH, help="Path to the course catalog CSV.")
+        parser.add_argument('--index-dir', default=settings.COURSE_INDEX_DIR, help="Directory to write the index into.")
+
+    def handle(self, *args, **options):
+        build_path = build_index(options['csv'], options['index_dir'])
+        index = CourseIndex(build_path)
+        self.stdout.write(self.style.SUCCESS(f"Course index ready at {build_path} ({len(index)} courses)."))
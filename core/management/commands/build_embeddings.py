@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.embeddings import (LsaEmbedder, build_model, embed_missing_projects, get_course_ann, get_embedder,
+                             reset_embeddings)
+from core.project_index import index_missing_projects
+
+
+class Command(BaseCommand):
+    help = ("Fits the LSA embedding model on the course catalog and projects, then embeds "
+            "the courses and projects for MATCH_ENGINE = 'embedding'.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model-dir', default=settings.EMBEDDINGS['MODEL_DIR'],
+                            help="Directory to write the model into.")
+        parser.add_argument('--dimensions', type=int, default=settings.EMBEDDINGS['DIMENSIONS'])
+
+    def handle(self, *args, **options):
+        path = build_model(options['model_dir'], options['dimensions'])
+        model = LsaEmbedder(path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Embedding model ready at {path} ({model.manifest['terms']} terms, {model.dimensions} dimensions, "
+            f"{model.manifest['explained_variance']:.0%} of the variance)."))
+
+        if options['model_dir'] == settings.EMBEDDINGS['MODEL_DIR'] and settings.EMBEDDINGS['MODEL'] == 'lsa':
+            reset_embeddings()
+            _, ann = get_course_ann(get_embedder())
+            self.stdout.write(self.style.SUCCESS(f"Indexed {len(ann)} courses in {ann.n_lists} list(s)."))
+            index_missing_projects()  # projects are embedded onto their skill vector rows
+            self.stdout.write(self.style.SUCCESS(f"Embedded {embed_missing_projects()} projects."))
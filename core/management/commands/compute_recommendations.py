@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.models import Recommendation
+from core.recommendations import compute_recommendations
+
+
+class Command(BaseCommand):
+    help = "Precomputes every profile's top courses and projects into the recommendations table."
+
+    def add_arguments(self, parser):
+        conf = settings.BATCH_RECOMMENDATIONS
+        parser.add_argument('--kind', choices=[Recommendation.COURSE, Recommendation.PROJECT], action='append',
+                            help="Only compute this kind (repeatable). Default: both.")
+        parser.add_argument('--workers', type=int, default=conf['WORKERS'],
+                            help="Scoring processes; 0 scores in this process.")
+        parser.add_argument('--chunk-size', type=int, default=conf['CHUNK_SIZE'], help="Users scored per chunk.")
+        parser.add_argument('--k-courses', type=int, default=conf['K_COURSES'])
+        parser.add_argument('--k-projects', type=int, default=conf['K_PROJECTS'])
+
+    def handle(self, *args, **options):
+        def progress(users, seconds):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"  {users} users, {users / seconds:.0f} users/s")
+
+        stats = compute_recommendations(
+            kinds=options['kind'] or [Recommendation.COURSE, Recommendation.PROJECT],
+            workers=options['workers'],
+            chunk_size=options['chunk_size'],
+            k_courses=options['k_courses'],
+            k_projects=options['k_projects'],
+            progress=progress,
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Computed recommendations for {stats['users']} users in {stats['seconds']:.1f}s "
+            f"({stats['users_per_second']:.0f} users/s)."))
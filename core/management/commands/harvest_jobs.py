@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.job_index import harvest_jobs
+
+
+class Command(BaseCommand):
+    help = "Fetches Adzuna listings for the curated skills into the local job index and expires old ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skills', help="Comma-separated skills to search (default: JOB_INDEX['SKILLS'] or the built-in vocabulary).")
+        parser.add_argument('--locations', help="Comma-separated Adzuna countries (default: JOB_INDEX['LOCATIONS']).")
+        parser.add_argument('--pages', type=int, help="Pages per search (default: JOB_INDEX['PAGES']).")
+
+    def handle(self, *args, **options):
+        split = lambda value: [v.strip() for v in value.split(',') if v.strip()] if value else None
+        stats = harvest_jobs(skills=split(options['skills']), locations=split(options['locations']),
+                             pages=options['pages'])
+        message = (f"{stats['requests']} requests ({stats['failed']} failed), {stats['fetched']} listings: "
+                   f"{stats['created']} new, {stats['updated']} changed, {stats['refreshed']} unchanged, "
+                   f"{stats['expired']} expired in {stats['seconds']:.1f}s.")
+        style = self.style.WARNING if stats['failed'] else self.style.SUCCESS
+        self.stdout.write(style(message))
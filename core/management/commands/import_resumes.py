@@ -0,0 +1,46 @@
+import os
+import statistics
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.resume_import import import_resumes
+
+
+class Command(BaseCommand):
+    help = ("Creates or updates a user and profile for every resume PDF in a directory "
+            "(jane.doe.pdf -> user jane.doe), skipping files that were already imported.")
+
+    def add_arguments(self, parser):
+        conf = settings.RESUME_IMPORT
+        parser.add_argument('directory', help="Folder of resume PDFs (searched recursively).")
+        parser.add_argument('--workers', type=int, default=conf['WORKERS'],
+                            help="Parsing processes; 0 parses in this process. Default: one per available core.")
+        parser.add_argument('--batch-size', type=int, default=conf['BATCH_SIZE'], help="Files written per transaction.")
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        if not os.path.isdir(directory):
+            raise CommandError(f"{directory} is not a directory.")
+        verbosity = options['verbosity']
+        step = max(1, options['batch_size'])
+
+        def progress(item, done, total):
+            name = os.path.relpath(item.path, directory)
+            if item.error is not None:
+                self.stderr.write(f"  {name}: failed ({item.error})")
+            elif verbosity > 1:
+                timing = f"{item.seconds * 1000:.0f}ms" if item.seconds is not None else "cached"
+                self.stdout.write(f"  {name} -> {item.username}: {len(item.skills)} skills, {timing}")
+            if verbosity > 0 and (done % step == 0 or done == total):
+                self.stdout.write(f"{done}/{total} files")
+
+        stats = import_resumes(directory, workers=options['workers'], batch_size=options['batch_size'],
+                               progress=progress)
+        parse = stats['parse_seconds']
+        timing = (f"; parse time per file median={statistics.median(parse) * 1000:.0f}ms "
+                  f"max={max(parse) * 1000:.0f}ms" if parse else "")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {stats['imported']} of {stats['found']} resumes in {stats['seconds']:.1f}s "
+            f"({stats['files_per_second']:.1f} files/s); {stats['skipped']} already imported, "
+            f"{stats['failed']} failed{timing}."))
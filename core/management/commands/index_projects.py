@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.project_index import index_missing_projects
+
+
+class Command(BaseCommand):
+    help = "Stores skill vectors for projects that are missing one (or for every project with --rebuild)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Recompute the vectors of every project.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = index_missing_projects(rebuild=options['rebuild'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} projects."))
+        if settings.MATCH_ENGINE == 'embedding':
+            from core.embeddings import embed_missing_projects
+            embedded = embed_missing_projects(batch_size=options['batch_size'])
+            if embedded is None:
+                self.stdout.write(self.style.WARNING("No embedding model yet: run `python manage.py build_embeddings`."))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"Embedded {embedded} projects."))
@@ -0,0 +1,28 @@
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.nlp_service import NlpService
+
+
+class Command(BaseCommand):
+    help = ("Runs the NLP service: loads the spaCy model, skill matcher and course index once and "
+            "serves skill extraction and course ranking to the web workers over a Unix socket.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=settings.NLP_SERVICE['SOCKET'],
+                            help="Socket path. Default: NLP_SERVICE['SOCKET'].")
+
+    def handle(self, *args, **options):
+        if not options['socket']:
+            raise CommandError("Set NLP_SERVICE_SOCKET or pass --socket.")
+        service = NlpService(options['socket']).start()
+        # shutdown() waits for serve_forever, so it has to run on another thread
+        stop = lambda *_: threading.Thread(target=service.shutdown).start()
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        self.stdout.write(self.style.SUCCESS(f"NLP service listening on {options['socket']}."))
+        service.serve_forever()
+        self.stdout.write(f"Stopped after {service.served} requests in {service.batches} batches.")
@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.resume_jobs import process_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Parses queued resume uploads and merges the detected skills into their profiles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain the queue once and exit.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds between polls of an empty queue.")
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            count = process_pending_jobs()
+            if count:
+                self.stdout.write(f"Processed {count} resume job(s) in {time.perf_counter() - started:.2f}s.")
+            if options['once']:
+                break
+            if not count:
+                time.sleep(options['interval'])
@@ -0,0 +1,120 @@
+"""
+Minimal in-process metrics registry (counters and histograms with labels),
+exported in the Prometheus text format by ``render_prometheus``.
+"""
+import bisect
+import itertools
+import threading
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        """Returns ``{label_values: value}``."""
+        with self._lock:
+            return dict(self._values)
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        # Only the value's own bucket is counted here; samples() accumulates them
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {'buckets': [0] * (len(self.buckets) + 1), 'count': 0, 'sum': 0.0}
+            state['buckets'][i] += 1
+            state['count'] += 1
+            state['sum'] += value
+
+    def samples(self):
+        """Returns ``{label_values: {'buckets': [...], 'count': n, 'sum': s}}`` (buckets are cumulative)."""
+        with self._lock:
+            return {key: {'buckets': list(itertools.accumulate(v['buckets'][:-1])), 'count': v['count'], 'sum': v['sum']}
+                    for key, v in self._values.items()}
+
+
+def _get_or_create(cls, name, documentation, labelnames, **kwargs):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, documentation, labelnames, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} is already registered as a {metric.kind}")
+        return metric
+
+
+def counter(name, documentation, labelnames=()):
+    return _get_or_create(Counter, name, documentation, labelnames)
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+
+def all_metrics():
+    with _registry_lock:
+        return list(_registry.values())
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def render_prometheus():
+    """Every registered metric in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    for metric in sorted(all_metrics(), key=lambda m: m.name):
+        documentation = metric.documentation.replace('\\', '\\\\').replace('\n', '\\n')
+        lines.append(f"# HELP {metric.name} {documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for key, value in sorted(metric.samples().items()):
+            labels = dict(zip(metric.labelnames, key))
+            if metric.kind == 'counter':
+                lines.append(f"{metric.name}{_labels(labels)} {_number(value)}")
+                continue
+            for bound, count in zip(metric.buckets, value['buckets']):
+                lines.append(f"{metric.name}_bucket{_labels({**labels, 'le': _number(bound)})} {count}")
+            lines.append(f"{metric.name}_bucket{_labels({**labels, 'le': '+Inf'})} {value['count']}")
+            lines.append(f"{metric.name}_sum{_labels(labels)} {_number(value['sum'])}")
+            lines.append(f"{metric.name}_count{_labels(labels)} {value['count']}")
+    return "\n".join(lines) + "\n"
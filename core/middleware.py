@@ -0,0 +1,23 @@
+from asgiref.sync import iscoroutinefunction
+from django.utils.decorators import sync_and_async_middleware
+
+from .instrumentation import RequestTimer
+
+
+@sync_and_async_middleware
+def request_timing_middleware(get_response):
+    """
+    Times every request: ``Server-Timing`` header, a log line, request
+    metrics and the optional slow-request profile (see core/instrumentation.py).
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            with RequestTimer(request) as timer:
+                response = await get_response(request)
+            return timer.finish(response)
+    else:
+        def middleware(request):
+            with RequestTimer(request) as timer:
+                response = get_response(request)
+            return timer.finish(response)
+    return middleware
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:37
+
+import core.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_resumejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeCache',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(blank=True, default='', max_length=255)),
+                ('text', models.TextField(blank=True, null=True)),
+                ('text_version', models.CharField(blank=True, default='', max_length=32)),
+                ('skills', models.TextField(blank=True, null=True)),
+                ('skills_version', models.CharField(blank=True, default='', max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='resume',
+            field=models.FileField(blank=True, null=True, storage=core.storage.DeduplicatingStorage(), upload_to='resumes/'),
+        ),
+    ]
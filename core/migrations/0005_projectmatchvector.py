@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_resumecache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectMatchVector',
+            fields=[
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='match_vector', serialize=False, to='core.project')),
+                ('skills', models.TextField(blank=True, default='')),
+                ('skills_version', models.CharField(blank=True, default='', max_length=64)),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+        ),
+    ]
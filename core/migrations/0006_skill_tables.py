@@ -0,0 +1,77 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_projectmatchvector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weight', models.FloatField(default=1.0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.project')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='projects', through='core.ProjectSkill', to='core.skill'),
+        ),
+        migrations.CreateModel(
+            name='SkillAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('alias', models.CharField(max_length=100, unique=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='core.skill')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserSkill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('manual', 'Entered manually'), ('resume', 'Found in resume')], default='manual', max_length=10)),
+                ('weight', models.FloatField(default=1.0)),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.userprofile')),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.skill')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='skill_tags',
+            field=models.ManyToManyField(blank=True, related_name='profiles', through='core.UserSkill', to='core.skill'),
+        ),
+        migrations.AddIndex(
+            model_name='projectskill',
+            index=models.Index(fields=['skill', 'project'], name='core_projec_skill_i_fa66d6_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='projectskill',
+            constraint=models.UniqueConstraint(fields=('project', 'skill'), name='unique_project_skill'),
+        ),
+        migrations.AddIndex(
+            model_name='userskill',
+            index=models.Index(fields=['skill', 'profile'], name='core_usersk_skill_i_ccc3a8_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='userskill',
+            constraint=models.UniqueConstraint(fields=('profile', 'skill', 'source'), name='unique_user_skill_source'),
+        ),
+    ]
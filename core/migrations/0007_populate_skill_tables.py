@@ -0,0 +1,104 @@
+from django.db import migrations
+
+# The vocabulary as it stood when this migration was written, frozen here so
+# later edits to core.skills don't change what it seeds
+SKILL_KEYWORDS = [
+    "python", "django", "machine learning", "javascript", "react",
+    "java", "sql", "html", "css", "data analysis", "flask",
+    "node.js", "angular", "vue.js", "docker", "kubernetes",
+    "aws", "azure", "git", "rest api", "graphql", "mongodb",
+    "postgresql", "linux", "bash", "pandas", "numpy", "tensorflow",
+    "pytorch", "scikit-learn", "big data", "spark", "hadoop"
+]
+
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "ml": "machine learning",
+    "js": "javascript",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node.js",
+    "node js": "node.js",
+    "vuejs": "vue.js",
+    "vue": "vue.js",
+    "angularjs": "angular",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "rest apis": "rest api",
+    "restful api": "rest api",
+    "restful apis": "rest api",
+    "amazon web services": "aws",
+    "microsoft azure": "azure",
+    "apache spark": "spark",
+    "pyspark": "spark",
+    "apache hadoop": "hadoop",
+    "html5": "html",
+    "css3": "css",
+}
+
+
+def split_names(text, aliases):
+    names = {name.strip().lower() for name in (text or '').split(",") if name.strip()}
+    return {aliases.get(name, name) for name in names}
+
+
+def populate(apps, schema_editor):
+    Skill = apps.get_model('core', 'Skill')
+    SkillAlias = apps.get_model('core', 'SkillAlias')
+    UserProfile = apps.get_model('core', 'UserProfile')
+    UserSkill = apps.get_model('core', 'UserSkill')
+    Project = apps.get_model('core', 'Project')
+    ProjectSkill = apps.get_model('core', 'ProjectSkill')
+    ResumeJob = apps.get_model('core', 'ResumeJob')
+
+    Skill.objects.bulk_create([Skill(name=name) for name in SKILL_KEYWORDS], ignore_conflicts=True)
+    skill_ids = dict(Skill.objects.values_list('name', 'pk'))
+    SkillAlias.objects.bulk_create(
+        [SkillAlias(alias=alias, skill_id=skill_ids[name]) for alias, name in SKILL_ALIASES.items() if name in skill_ids],
+        ignore_conflicts=True,
+    )
+
+    def skill_id(name):
+        if name not in skill_ids:
+            skill_ids[name] = Skill.objects.create(name=name).pk
+        return skill_ids[name]
+
+    # Skills that came out of a finished resume parse are tagged as such
+    resume_skills = {}
+    for profile_id, skills in ResumeJob.objects.filter(status='done').values_list('profile_id', 'skills'):
+        resume_skills.setdefault(profile_id, set()).update(split_names(skills, SKILL_ALIASES))
+
+    user_skills = []
+    for profile_id, skills in UserProfile.objects.values_list('pk', 'skills').iterator():
+        for name in split_names(skills, SKILL_ALIASES):
+            source = 'resume' if name in resume_skills.get(profile_id, ()) else 'manual'
+            user_skills.append(UserSkill(profile_id=profile_id, skill_id=skill_id(name), source=source))
+    UserSkill.objects.bulk_create(user_skills, batch_size=1000, ignore_conflicts=True)
+
+    # Project text is free-form, so only known skills are kept; saving a
+    # project (or `manage.py index_projects --rebuild`) re-derives them with the matcher
+    project_skills = []
+    for project_id, skills in Project.objects.values_list('pk', 'required_skills').iterator():
+        for name in split_names(skills, SKILL_ALIASES):
+            if name in skill_ids:
+                project_skills.append(ProjectSkill(project_id=project_id, skill_id=skill_ids[name]))
+    ProjectSkill.objects.bulk_create(project_skills, batch_size=1000, ignore_conflicts=True)
+
+
+def unpopulate(apps, schema_editor):
+    # The text columns are still the source of truth, so the rows can just go
+    for model in ('UserSkill', 'ProjectSkill', 'SkillAlias', 'Skill'):
+        apps.get_model('core', model).objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_skill_tables'),
+    ]
+
+    operations = [
+        migrations.RunPython(populate, unpopulate),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_userprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Recommendation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('course', 'Course'), ('project', 'Project')], max_length=10)),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('course', models.JSONField(blank=True, null=True)),
+                ('skills_digest', models.CharField(max_length=32)),
+                ('computed_at', models.DateTimeField()),
+                ('profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='core.userprofile')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.project')),
+            ],
+            options={
+                'ordering': ['profile', 'kind', 'rank'],
+                'constraints': [models.UniqueConstraint(fields=('profile', 'kind', 'rank'), name='unique_recommendation_rank')],
+            },
+        ),
+    ]
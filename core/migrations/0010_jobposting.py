@@ -0,0 +1,76 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:13
+
+from django.db import OperationalError, migrations, models
+
+# External-content FTS5 table over the postings, kept in step by triggers.
+# The update trigger only fires for the indexed columns, so a harvest that
+# just refreshes last_seen doesn't rewrite the index.
+FTS_SQL = [
+    """CREATE VIRTUAL TABLE core_jobposting_fts USING fts5(
+        title, company, description, content='core_jobposting', content_rowid='id')""",
+    """CREATE TRIGGER core_jobposting_fts_insert AFTER INSERT ON core_jobposting BEGIN
+        INSERT INTO core_jobposting_fts(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END""",
+    """CREATE TRIGGER core_jobposting_fts_delete AFTER DELETE ON core_jobposting BEGIN
+        INSERT INTO core_jobposting_fts(core_jobposting_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+    END""",
+    """CREATE TRIGGER core_jobposting_fts_update AFTER UPDATE OF title, company, description ON core_jobposting BEGIN
+        INSERT INTO core_jobposting_fts(core_jobposting_fts, rowid, title, company, description)
+        VALUES ('delete', old.id, old.title, old.company, old.description);
+        INSERT INTO core_jobposting_fts(rowid, title, company, description)
+        VALUES (new.id, new.title, new.company, new.description);
+    END""",
+]
+
+
+def create_fts(apps, schema_editor):
+    # Other databases (and SQLite builds without FTS5) search with LIKE instead, see core/job_index.py
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    try:
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("CREATE VIRTUAL TABLE temp.core_fts5_probe USING fts5(x)")
+            cursor.execute("DROP TABLE temp.core_fts5_probe")
+    except OperationalError:
+        return
+    for statement in FTS_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for name in ('insert', 'delete', 'update'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS core_jobposting_fts_{name}")
+    schema_editor.execute("DROP TABLE IF EXISTS core_jobposting_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recommendation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.CharField(max_length=64, unique=True)),
+                ('country', models.CharField(max_length=8)),
+                ('title', models.CharField(max_length=255)),
+                ('company', models.CharField(blank=True, default='', max_length=255)),
+                ('location', models.CharField(blank=True, default='', max_length=255)),
+                ('description', models.TextField(blank=True, default='')),
+                ('posted_at', models.DateTimeField(blank=True, null=True)),
+                ('data', models.JSONField()),
+                ('last_seen', models.DateTimeField(db_index=True)),
+            ],
+            options={
+                'ordering': ['-posted_at'],
+            },
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+    ]
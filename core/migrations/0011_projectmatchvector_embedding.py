@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-18 17:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_jobposting'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectmatchvector',
+            name='embedding',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='projectmatchvector',
+            name='embedding_model',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+    ]
@@ -4,6 +4,77 @@ from django.db import models
 from django.db import models
 from django.contrib.auth.models import User
 
+from .storage import DeduplicatingStorage
+
+
+class SkillManager(models.Manager):
+    def normalize(self, names):
+        """Maps names and aliases to canonical skill names (lowercased, deduplicated)."""
+        names = {name.strip().lower() for name in names if name and name.strip()}
+        aliases = dict(SkillAlias.objects.filter(alias__in=names).values_list('alias', 'skill__name'))
+        return sorted({aliases.get(name, name) for name in names})
+
+    def resolve(self, names, create=False):
+        """
+        Returns the Skill rows for ``names``. Unknown names are skipped, so
+        free text (profile skills, project requirements) can't grow the
+        vocabulary; curated sources (migrations, the admin) pass ``create``.
+        """
+        names = self.normalize(names)
+        if create:
+            self.bulk_create([Skill(name=name) for name in names], ignore_conflicts=True)
+        return list(self.filter(name__in=names))
+
+
+class Skill(models.Model):
+    """A canonical skill name, e.g. "kubernetes"."""
+    name = models.CharField(max_length=100, unique=True)
+
+    objects = SkillManager()
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
+class SkillAlias(models.Model):
+    """
+    An alternative spelling of a skill, e.g. "k8s" for "kubernetes", used by
+    ``Skill.objects.normalize``. Extraction from text matches core.skills'
+    SKILL_ALIASES instead, so an alias added here isn't found in resumes.
+    """
+    alias = models.CharField(max_length=100, unique=True)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+
+    def __str__(self):
+        return f"{self.alias} -> {self.skill}"
+
+
+class SkillOverlapQuerySet(models.QuerySet):
+    """Skill lookups in SQL for models with a ``skill_tags`` many-to-many to Skill."""
+
+    def with_skill(self, name):
+        return self.filter(skill_tags__name__in=Skill.objects.normalize([name])).distinct()
+
+    def with_any_skills(self, names):
+        """Rows sharing at least one skill, annotated with ``skill_overlap`` and best first."""
+        return self.annotate_overlap(names).filter(skill_overlap__gt=0).order_by('-skill_overlap', 'pk')
+
+    def with_all_skills(self, names):
+        names = Skill.objects.normalize(names)
+        return self._annotate_overlap(names).filter(skill_overlap=len(names))
+
+    def annotate_overlap(self, names):
+        """Annotates ``skill_overlap``: how many of ``names`` each row has."""
+        return self._annotate_overlap(Skill.objects.normalize(names))
+
+    def _annotate_overlap(self, canonical_names):
+        return self.annotate(skill_overlap=models.Count(
+            'skill_tags', filter=models.Q(skill_tags__name__in=canonical_names), distinct=True))
+
+
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     skills = models.TextField(blank=True, null=True)
@@ -11,7 +82,15 @@ class UserProfile(models.Model):
     availability = models.CharField(max_length=100, blank=True, null=True)
     linkedin_url = models.URLField(blank=True, null=True)
     github_url = models.URLField(blank=True, null=True)
-    resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    resume = models.FileField(upload_to='resumes/', storage=DeduplicatingStorage(), blank=True, null=True)
+    skill_tags = models.ManyToManyField(Skill, through='UserSkill', related_name='profiles', blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = SkillOverlapQuerySet.as_manager()
+
+    class Meta:
+        permissions = [('search_candidates', 'Can search candidate profiles')]
+
     def __str__(self):
         return self.user.username
 
@@ -20,6 +99,167 @@ class Project(models.Model):
     description = models.TextField()
     required_skills = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    skill_tags = models.ManyToManyField(Skill, through='ProjectSkill', related_name='projects', blank=True)
+
+    objects = SkillOverlapQuerySet.as_manager()
+
+    def __str__(self):
+        return self.title
+
+
+class UserSkill(models.Model):
+    MANUAL = 'manual'
+    RESUME = 'resume'
+    SOURCE_CHOICES = [
+        (MANUAL, 'Entered manually'),
+        (RESUME, 'Found in resume'),
+    ]
+
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES, default=MANUAL)
+    weight = models.FloatField(default=1.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'skill', 'source'], name='unique_user_skill_source'),
+        ]
+        indexes = [models.Index(fields=['skill', 'profile'])]
+
+    def __str__(self):
+        return f"{self.profile} - {self.skill} ({self.source})"
+
+
+class ProjectSkill(models.Model):
+    project = models.ForeignKey(Project, on_delete=models.CASCADE)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE)
+    weight = models.FloatField(default=1.0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'skill'], name='unique_project_skill'),
+        ]
+        indexes = [models.Index(fields=['skill', 'project'])]
+
+    def __str__(self):
+        return f"{self.project} - {self.skill}"
+
+class ResumeJob(models.Model):
+    """A queued resume parse; skills are merged into the profile when it completes."""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Processing'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='resume_jobs')
+    resume_name = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+    skills = models.TextField(blank=True, default='')
+    error = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.profile} - {self.resume_name} ({self.status})"
+
+
+class ResumeCache(models.Model):
+    """
+    Extraction results keyed on the SHA-256 of the PDF bytes. Entries made
+    by an older text extractor or skill vocabulary are ignored on read.
+    """
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    file_name = models.CharField(max_length=255, blank=True, default='')
+    text = models.TextField(blank=True, null=True)
+    text_version = models.CharField(max_length=32, blank=True, default='')
+    skills = models.TextField(blank=True, null=True)
+    skills_version = models.CharField(max_length=64, blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.sha256
+
+
+class ProjectMatchVector(models.Model):
+    """
+    The canonical skills of a project, kept up to date on save so the match
+    index can be (re)built without re-running the skill matcher.
+    """
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, primary_key=True, related_name='match_vector')
+    skills = models.TextField(blank=True, default='')  # ","-joined canonical skill names
+    skills_version = models.CharField(max_length=64, blank=True, default='')
+    # float32 unit vector of the project text, for MATCH_ENGINE = 'embedding' (core/embeddings.py)
+    embedding = models.BinaryField(null=True, blank=True)
+    embedding_model = models.CharField(max_length=64, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.project} ({self.skills})"
+
+
+class Recommendation(models.Model):
+    """
+    A precomputed course or project recommendation, written by
+    ``manage.py compute_recommendations``. ``skills_digest`` records the
+    skills it was computed from, so edits to the profile invalidate it.
+    """
+    COURSE = 'course'
+    PROJECT = 'project'
+    KIND_CHOICES = [
+        (COURSE, 'Course'),
+        (PROJECT, 'Project'),
+    ]
+
+    profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='recommendations')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, related_name='+')
+    course = models.JSONField(null=True, blank=True)  # name, created_by, description, know_more
+    skills_digest = models.CharField(max_length=32)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['profile', 'kind', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['profile', 'kind', 'rank'], name='unique_recommendation_rank'),
+        ]
+
+    def __str__(self):
+        return f"{self.profile} - {self.kind} #{self.rank}"
+
+
+class JobPosting(models.Model):
+    """
+    A job listing harvested from Adzuna by ``manage.py harvest_jobs``.
+    ``data`` is the listing as the API returned it, so harvested jobs are
+    shown exactly like live ones. Title, company and description are
+    full-text indexed (see migration 0010); ``last_seen`` is the latest
+    harvest that returned the listing, and old ones are expired.
+    """
+    job_id = models.CharField(max_length=64, unique=True)  # Adzuna's id
+    country = models.CharField(max_length=8)  # the Adzuna country searched, e.g. "us"
+    title = models.CharField(max_length=255)
+    company = models.CharField(max_length=255, blank=True, default='')
+    location = models.CharField(max_length=255, blank=True, default='')
+    description = models.TextField(blank=True, default='')
+    posted_at = models.DateTimeField(null=True, blank=True)
+    data = models.JSONField()
+    last_seen = models.DateTimeField(db_index=True)
+
+    class Meta:
+        ordering = ['-posted_at']
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return f"{self.title} ({self.company})"
@@ -0,0 +1,80 @@
+"""
+Lazy, thread-safe access to the spaCy pipeline and the skill matcher.
+
+Nothing is loaded at import time, so ``manage.py migrate``/``check`` and
+test runs don't pay for the model. Skill extraction only needs the
+tokenizer, so every trained component is excluded when loading.
+With ``PRELOAD_MODELS`` enabled, ``preload()`` runs from the WSGI module
+so a ``gunicorn --preload`` master loads everything once and workers
+share the pages copy-on-write after fork. With ``NLP_SERVICE['SOCKET']``
+set, workers don't load the model at all: ``get_skill_matcher()`` hands
+extraction to the NLP service process (core/nlp_service.py).
+"""
+import gc
+import logging
+import threading
+
+import spacy
+from django.conf import settings
+
+from .skills import SkillMatcher
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_nlp = None
+_skill_matcher = None
+
+
+def load_nlp():
+    try:
+        return spacy.load(settings.SPACY_MODEL, exclude=settings.SPACY_EXCLUDE)
+    except OSError:
+        # Only the tokenizer is used, and the blank English pipeline has the same one
+        logger.warning(f"spaCy model '{settings.SPACY_MODEL}' is not installed, using a blank English tokenizer.")
+        return spacy.blank("en")
+
+
+def get_nlp():
+    global _nlp
+    if _nlp is None:
+        with _lock:
+            if _nlp is None:
+                _nlp = load_nlp()
+    return _nlp
+
+
+def get_skill_matcher():
+    """The skill matcher; the NLP service's stand-in when ``NLP_SERVICE['SOCKET']`` is set."""
+    if settings.NLP_SERVICE['SOCKET']:
+        from .nlp_service import get_remote_matcher
+        return get_remote_matcher()
+    return get_local_skill_matcher()
+
+
+def get_local_skill_matcher():
+    """The skill matcher of this process, loading the model on first use."""
+    global _skill_matcher
+    if _skill_matcher is None:
+        nlp = get_nlp()
+        with _lock:
+            if _skill_matcher is None:
+                _skill_matcher = SkillMatcher(nlp)
+    return _skill_matcher
+
+
+def preload():
+    """Loads the model, skill matcher and course index up front (e.g. in the gunicorn master)."""
+    from .course_index import get_course_index
+
+    if settings.NLP_SERVICE['SOCKET']:
+        logger.info("Not preloading models: the NLP service holds them.")
+        return
+    get_skill_matcher()
+    try:
+        get_course_index()
+    except Exception as e:
+        logger.error(f"Could not preload the course index: {e}")
+    # Keep the preloaded objects out of GC passes so workers don't dirty their shared pages
+    gc.freeze()
+    logger.info("Preloaded NLP model, skill matcher and course index.")
@@ -0,0 +1,391 @@
+"""
+Optional NLP sidecar: one process owns the spaCy pipeline, the skill
+matcher and the course index, and every web worker sends it skill
+extraction and course ranking over a Unix-domain socket instead of
+loading them itself.
+
+    python manage.py nlp_service      # listens on NLP_SERVICE['SOCKET']
+
+Workers use it whenever ``NLP_SERVICE['SOCKET']`` is set:
+``get_skill_matcher()`` returns a ``RemoteSkillMatcher`` and the TF-IDF
+path of ``get_courses`` asks the service. If the service can't be
+reached (or answers with an error) the call is done in-process instead,
+loading the model on first need, and the circuit breaker keeps workers
+from retrying the socket for ``RETRY_AFTER`` seconds.
+
+Messages are a 4-byte big-endian length followed by a JSON body:
+
+    {"op": "extract", "texts": [...]}             -> {"results": [[skill, ...], ...]}
+    {"op": "courses", "queries": [...], "k": 5}   -> {"results": [[course dict, ...], ...]}
+    {"op": "vocabulary"}                          -> {"results": [skill, ...]}
+
+and ``{"error": "..."}`` on failure, including for malformed messages,
+which are refused before they reach the dispatcher, and for requests not
+answered within ``TIMEOUT`` seconds. Clients wait ``REPLY_MARGIN``
+seconds longer than that, so an overloaded service is reported by its
+error reply rather than by a socket timeout that would trip the client's
+breaker. Each connection has one request in flight at a time. One
+dispatcher thread does all the work: it takes the requests queued from
+every connection (up to ``BATCH_SIZE`` texts, waiting ``BATCH_WAIT``
+seconds for more if that is set) and runs their extraction texts through
+``nlp.pipe`` together.
+"""
+import json
+import logging
+import os
+import queue
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+from .course_index import Course, get_course_index
+from .http_client import CircuitBreaker
+from .instrumentation import span
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct('>I')
+MAX_MESSAGE = 64 * 2**20
+REPLY_MARGIN = 0.5  # seconds a client waits beyond TIMEOUT for the service's own timeout reply
+
+
+def send_message(sock, payload):
+    body = json.dumps(payload).encode('utf-8')
+    sock.sendall(HEADER.pack(len(body)) + body)
+
+
+def recv_message(sock):
+    """The next message on ``sock``, or None if the peer closed the connection."""
+    header = _recv_exactly(sock, HEADER.size)
+    if header is None:
+        return None
+    (length,) = HEADER.unpack(header)
+    if length > MAX_MESSAGE:
+        raise ValueError(f"Message of {length} bytes is over the {MAX_MESSAGE} byte limit")
+    body = _recv_exactly(sock, length)
+    if body is None:
+        raise ConnectionError("Connection closed mid-message")
+    return json.loads(body)
+
+
+def _recv_exactly(sock, size):
+    chunks, remaining = [], size
+    while remaining:
+        chunk = sock.recv(min(remaining, 1 << 20))
+        if not chunk:
+            if remaining == size:
+                return None
+            raise ConnectionError("Connection closed mid-message")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+# -- server --------------------------------------------------------------------
+
+# The list of strings each op takes (None: no list)
+LIST_FIELDS = {'extract': 'texts', 'courses': 'queries', 'vocabulary': None}
+
+
+def message_error(message):
+    """Why ``message`` can't be served, or None if it is well formed."""
+    if not isinstance(message, dict):
+        return "Expected a JSON object"
+    op = message.get('op')
+    if op not in LIST_FIELDS:
+        return f"Unknown op {op!r}"
+    if LIST_FIELDS[op] is None:
+        return None
+    items = message.get(LIST_FIELDS[op])
+    if not isinstance(items, list) or not all(isinstance(item, str) for item in items):
+        return f"{LIST_FIELDS[op]!r} must be a list of strings"
+    k = message.get('k', 5)
+    if op == 'courses' and (not isinstance(k, int) or isinstance(k, bool) or k < 1):
+        return "'k' must be a positive integer"
+    return None
+
+
+class _Request:
+    __slots__ = ('message', 'reply', 'done')
+
+    def __init__(self, message):
+        self.message = message
+        self.reply = None
+        self.done = threading.Event()
+
+    @property
+    def size(self):
+        field = LIST_FIELDS[self.message['op']]
+        return len(self.message[field]) if field else 0
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                message = recv_message(self.request)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Dropping NLP service connection: {e}")
+                return
+            if message is None:
+                return
+            error = message_error(message)
+            if error:
+                reply = {'error': error}
+            else:
+                request = _Request(message)
+                self.server.service.requests.put(request)
+                if request.done.wait(self.server.service.timeout):
+                    reply = request.reply
+                else:
+                    reply = {'error': f"No answer within {self.server.service.timeout}s"}
+            try:
+                send_message(self.request, reply)
+            except OSError:
+                return
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    # Connecting to a Unix socket whose backlog is full fails at once (EAGAIN) rather
+    # than waiting, and socketserver's default of 5 is less than one burst of workers
+    request_queue_size = 128
+
+
+class NlpService:
+    """The sidecar: a threaded Unix socket server in front of one dispatcher thread."""
+
+    def __init__(self, path=None, batch_size=None, batch_wait=None, timeout=None):
+        conf = settings.NLP_SERVICE
+        self.path = path or conf['SOCKET']
+        self.timeout = timeout or conf['TIMEOUT']
+        self.batch_size = batch_size or conf['BATCH_SIZE']
+        self.batch_wait = conf['BATCH_WAIT'] if batch_wait is None else batch_wait
+        self.requests = queue.Queue()
+        self.batches = 0
+        self.served = 0
+        self.server = None
+
+    def start(self):
+        """Loads the models, binds the socket and starts the dispatcher; ``serve_forever`` then accepts."""
+        from .nlp import get_local_skill_matcher
+
+        self.matcher = get_local_skill_matcher()
+        get_course_index()
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # left over from a service that didn't shut down cleanly
+        self.server = _Server(self.path, _Handler)
+        self.server.service = self
+        threading.Thread(target=self._dispatch, name='nlp-service-dispatch', daemon=True).start()
+        logger.info(f"NLP service listening on {self.path}.")
+        return self
+
+    def serve_forever(self):
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def shutdown(self):
+        self.server.shutdown()
+
+    def _dispatch(self):
+        while True:
+            batch = [self.requests.get()]
+            texts = batch[0].size
+            deadline = time.monotonic() + self.batch_wait
+            while texts < self.batch_size:
+                try:
+                    request = self.requests.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                batch.append(request)
+                texts += request.size
+            try:
+                self._run(batch)
+            except Exception as e:
+                # Whatever went wrong, answer every request so no connection waits on it
+                logger.exception(f"NLP service batch failed: {e}")
+                for r in batch:
+                    if r.reply is None:
+                        r.reply = {'error': str(e)}
+            finally:
+                for r in batch:
+                    r.done.set()
+
+    def _run(self, batch):
+        self.batches += 1
+        self.served += len(batch)
+        extract = [r for r in batch if r.message.get('op') == 'extract']
+        if extract:
+            try:
+                texts = [text for r in extract for text in r.message['texts']]
+                with span('nlp_service.extract'):
+                    results = self.matcher.extract_many(texts, batch_size=self.batch_size)
+                start = 0
+                for r in extract:
+                    end = start + len(r.message['texts'])
+                    r.reply = {'results': results[start:end]}
+                    start = end
+            except Exception as e:
+                logger.error(f"NLP service extraction failed: {e}")
+                for r in extract:
+                    r.reply = {'error': str(e)}
+        for r in batch:
+            if r.reply is None:
+                r.reply = self._answer(r.message)
+
+    def _answer(self, message):
+        try:
+            if message.get('op') == 'courses':
+                index = get_course_index()
+                k = message.get('k', 5)
+                return {'results': [[course.as_dict() for course in index.top_courses(query, k=k)]
+                                    for query in message['queries']]}
+            if message.get('op') == 'vocabulary':
+                return {'results': self.matcher.skills}
+            return {'error': f"Unknown op {message.get('op')!r}"}
+        except Exception as e:
+            logger.error(f"NLP service request failed: {e}")
+            return {'error': str(e)}
+
+
+# -- client --------------------------------------------------------------------
+
+class NlpServiceClient:
+    """One connection per thread to the service; calls return None when it can't answer."""
+
+    def __init__(self, path=None, timeout=None, retry_after=None):
+        conf = settings.NLP_SERVICE
+        self.path = path or conf['SOCKET']
+        self.timeout = timeout or conf['TIMEOUT']
+        self.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=retry_after or conf['RETRY_AFTER'])
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def call(self, op, **payload):
+        if not self.breaker.allow():
+            return None
+        try:
+            sock = self._connection()
+            send_message(sock, {'op': op, **payload})
+            reply = recv_message(sock)
+            if reply is None:
+                raise ConnectionError("NLP service closed the connection")
+        except (OSError, ValueError) as e:
+            self._close()
+            self.breaker.record_failure()
+            logger.warning(f"NLP service unavailable, working in-process for {self.breaker.reset_timeout}s: {e}")
+            return None
+        self.breaker.record_success()
+        if 'error' in reply:
+            logger.error(f"NLP service error: {reply['error']}")
+            return None
+        return reply['results']
+
+    def extract(self, texts):
+        return self.call('extract', texts=list(texts))
+
+    def top_courses(self, queries, k=5):
+        results = self.call('courses', queries=list(queries), k=k)
+        if results is None:
+            return None
+        return [[Course(**course) for course in courses] for courses in results]
+
+    def _connection(self):
+        if self._pid != os.getpid():
+            # Forked since connecting (e.g. a preloading master): don't share the parent's sockets
+            self._local, self._pid = threading.local(), os.getpid()
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout + REPLY_MARGIN)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+
+class RemoteSkillMatcher:
+    """``SkillMatcher`` stand-in that extracts through the service, or in-process when it can't."""
+
+    def __init__(self, client):
+        self.client = client
+        self._skills = None
+
+    @property
+    def skills(self):
+        """The service's vocabulary (asked for once), or the local one while it can't answer."""
+        if self._skills is None:
+            skills = self.client.call('vocabulary')
+            if skills is None:
+                return self.local().skills
+            self._skills = skills
+        return self._skills
+
+    def local(self):
+        from .nlp import get_local_skill_matcher
+        return get_local_skill_matcher()
+
+    def extract(self, text):
+        return self.extract_many([text])[0]
+
+    def extract_many(self, texts, batch_size=256):
+        texts = list(texts)
+        results = self.client.extract(texts)
+        return results if results is not None else self.local().extract_many(texts, batch_size)
+
+    def find(self, text):
+        # Spans aren't served; nothing on the request path needs them
+        return self.local().find(text)
+
+    def counts(self, text):
+        return Counter(self.extract(text))
+
+
+_lock = threading.Lock()
+_client = None
+_matcher = None
+
+
+def get_client():
+    global _client, _matcher
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = NlpServiceClient()
+                _matcher = RemoteSkillMatcher(_client)
+    return _client
+
+
+def get_remote_matcher():
+    get_client()
+    return _matcher
+
+
+def top_courses(text, k=5):
+    """The ``k`` best courses for ``text`` from the service, or None if it can't answer."""
+    results = get_client().top_courses([text], k)
+    return None if results is None else results[0]
+
+
+def reset_client():
+    global _client, _matcher
+    with _lock:
+        _client = _matcher = None
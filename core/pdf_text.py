@@ -0,0 +1,99 @@
+"""
+Streaming, bounded-memory text extraction from PDF uploads.
+
+The PDF is never read into memory as a whole: uploads spooled to disk
+by Django are opened from their temporary path, in-memory uploads are
+parsed in place, and anything else is copied in chunks to a spooled
+temporary file. pdfminer then lays out one page at a time, so callers
+can stop early, and a page cap and time budget (checked between pages)
+bound the work.
+"""
+import io
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from pdfminer.high_level import extract_pages
+from pdfminer.layout import LAParams, LTTextContainer
+
+logger = logging.getLogger(__name__)
+
+# Non-seekable streams are spooled to disk past this size
+SPOOL_MAX_SIZE = 1 << 20
+
+
+def _raw_file(pdf_file):
+    # Django's File/UploadedFile wrap the real file object in .file
+    return getattr(pdf_file, 'file', pdf_file)
+
+
+@contextmanager
+def open_pdf(pdf_file):
+    """Yields a seekable binary file for a path, Django upload or file-like object."""
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, 'rb') as f:
+            yield f
+    elif hasattr(pdf_file, 'temporary_file_path'):
+        # TemporaryUploadedFile: read from Django's temp file without copying it
+        with open(pdf_file.temporary_file_path(), 'rb') as f:
+            yield f
+    elif isinstance(_raw_file(pdf_file), io.IOBase) and _raw_file(pdf_file).seekable():
+        # In-memory upload or open file: parse it in place (pdfminer wants an io object)
+        raw = _raw_file(pdf_file)
+        position = raw.tell()
+        raw.seek(0)
+        try:
+            yield raw
+        finally:
+            raw.seek(position)
+    else:
+        chunks = pdf_file.chunks() if hasattr(pdf_file, 'chunks') else iter(lambda: pdf_file.read(64 * 1024), b'')
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+            for chunk in chunks:
+                spool.write(chunk)
+            spool.seek(0)
+            yield spool
+
+
+class PdfPages:
+    """
+    Iterates over the text of each page, stopping after ``max_pages`` pages
+    or once ``time_budget`` seconds have been spent. The budget is checked
+    at page boundaries: pdfminer lays a page out in one call, so a page
+    that starts within the budget is finished and yielded, and the total
+    can overrun by up to one page's layout time. After iteration,
+    ``truncated`` says why it stopped early ('max_pages' / 'time_budget'),
+    or is None if every page was read, and ``seconds`` is the time spent
+    extracting (excluding the caller's work between pages).
+    """
+
+    def __init__(self, pdf_file, max_pages=None, time_budget=None):
+        self.pdf_file = pdf_file
+        self.max_pages = max_pages
+        self.time_budget = time_budget
+        self.pages_read = 0
+        self.truncated = None
+        self.seconds = 0.0
+
+    def __iter__(self):
+        deadline = time.monotonic() + self.time_budget if self.time_budget else None
+        with open_pdf(self.pdf_file) as fp:
+            # maxpages=max_pages + 1 lets us tell "exactly max_pages" from "more than that"
+            limit = self.max_pages + 1 if self.max_pages else 0
+            started = time.perf_counter()
+            for page in extract_pages(fp, maxpages=limit, laparams=LAParams()):
+                if self.max_pages and self.pages_read >= self.max_pages:
+                    self.truncated = 'max_pages'
+                    logger.warning(f"PDF has more than {self.max_pages} pages; the rest was skipped.")
+                    return
+                self.pages_read += 1
+                text = "".join(element.get_text() for element in page if isinstance(element, LTTextContainer)) + "\f"
+                self.seconds += time.perf_counter() - started
+                yield text
+                started = time.perf_counter()
+                if deadline is not None and time.monotonic() > deadline:
+                    self.truncated = 'time_budget'
+                    logger.warning(f"PDF extraction stopped after {self.pages_read} pages (time budget).")
+                    return
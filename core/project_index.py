@@ -0,0 +1,237 @@
+"""
+Precomputed project match index.
+
+A project's required skills are normalised once, when the project is
+saved, and stored as a ``ProjectMatchVector`` (and as ProjectSkill rows
+for SQL lookups): every comma-separated entry counts as a skill, known
+aliases are mapped to their skill, and the skill matcher adds the known
+skills it finds inside longer entries. Each worker
+builds a sparse (projects x skills) TF-IDF matrix from those rows, so
+ranking projects for a user is one sparse mat-vec product plus a partial
+sort, and only the top ``k`` projects are loaded from the database.
+
+The index is rebuilt from the stored vectors when they change:
+immediately after a save or delete in the same process, and otherwise
+when a cheap count/last-updated check (at most every
+``PROJECT_INDEX['CHECK_INTERVAL']`` seconds) sees changes made by other
+processes. Projects created without signals (``bulk_create``, fixtures)
+have no vector and aren't ranked until ``manage.py index_projects``
+stores one; requests never compute vectors.
+"""
+import logging
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from django.db.models import Count, Max
+from scipy import sparse
+
+from .lookup_cache import LocalBackend, canonical_skills
+from .models import Project, ProjectMatchVector
+from .nlp import get_skill_matcher
+from .skill_tags import replace_project_skills, split_skills
+from .skills import SKILL_ALIASES, vocabulary_fingerprint
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_index = None
+_signature = None
+_checked_at = 0.0
+_stale = True
+
+# Bump when project_skills changes so index_projects recomputes the stored vectors
+PROJECT_SKILLS_VERSION = 2
+
+
+def vectors_version():
+    return f"{vocabulary_fingerprint()}/{PROJECT_SKILLS_VERSION}"
+
+
+def project_skills(required_skills):
+    """
+    Sorted skills of a project's (or user's) comma-separated skills: each
+    entry as ``canonical_skills`` normalises it, aliases mapped to their
+    skill, plus the known skills the matcher finds inside the entries.
+    """
+    entries = canonical_skills(required_skills)
+    found = get_skill_matcher().extract(", ".join(entries))
+    return sorted({SKILL_ALIASES.get(entry, entry) for entry in entries} | set(found))
+
+
+def index_project(project):
+    """Stores the skill vector (and ProjectSkill rows) of one project; returns its skills."""
+    skills = project_skills(project.required_skills)
+    ProjectMatchVector.objects.update_or_create(project=project, defaults={
+        'skills': ",".join(skills),
+        'skills_version': vectors_version(),
+    })
+    replace_project_skills({project.pk: skills})
+    mark_stale()
+    return skills
+
+
+def index_missing_projects(rebuild=False, batch_size=1000):
+    """
+    Stores vectors for projects that have none, or that were indexed with an
+    older skill vocabulary (every project when ``rebuild``). Returns the count.
+    """
+    version = vectors_version()
+    projects = Project.objects.all() if rebuild else Project.objects.exclude(match_vector__skills_version=version)
+    total = 0
+    batch = []
+    for pk, required_skills in projects.values_list('pk', 'required_skills').iterator(chunk_size=batch_size):
+        batch.append(ProjectMatchVector(
+            project_id=pk, skills=",".join(project_skills(required_skills)), skills_version=version))
+        if len(batch) >= batch_size:
+            total += _save_vectors(batch)
+            batch = []
+    if batch:
+        total += _save_vectors(batch)
+    if total:
+        logger.info(f"Indexed skill vectors for {total} projects.")
+        mark_stale()
+    return total
+
+
+def _save_vectors(vectors):
+    ProjectMatchVector.objects.bulk_create(
+        vectors, update_conflicts=True, unique_fields=['project'],
+        update_fields=['skills', 'skills_version', 'updated_at'],
+    )
+    replace_project_skills({vector.project_id: split_skills(vector.skills) for vector in vectors})
+    return len(vectors)
+
+
+class ProjectMatchIndex:
+    """
+    Ranks projects by cosine similarity of TF-IDF weighted skill vectors.
+    ``project_skills`` holds one sequence of canonical skills per project id.
+    """
+
+    def __init__(self, project_ids, project_skills, user_vector_cache=None):
+        self.project_ids = np.asarray(project_ids, dtype=np.int64)
+        self.skills = sorted({skill for skills in project_skills for skill in skills})
+        self.columns = {skill: i for i, skill in enumerate(self.skills)}
+
+        lengths = np.fromiter((len(skills) for skills in project_skills), dtype=np.int64, count=len(project_skills))
+        indptr = np.zeros(len(project_skills) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        indices = np.fromiter(
+            (self.columns[skill] for skills in project_skills for skill in skills),
+            dtype=np.int32, count=int(indptr[-1]),
+        )
+
+        # Smoothed IDF, as in sklearn's TfidfVectorizer, then L2-normalised rows
+        n = len(self.project_ids)
+        df = np.bincount(indices, minlength=len(self.skills))
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+        data = self.idf[indices]
+        rows = np.repeat(np.arange(n), lengths)
+        norms = np.sqrt(np.bincount(rows, weights=data.astype(np.float64) ** 2, minlength=n))
+        data /= norms[rows].astype(np.float32)
+        self.matrix = sparse.csr_matrix((data, indices, indptr), shape=(n, len(self.skills)))
+
+        cache_size = user_vector_cache or settings.PROJECT_INDEX['USER_VECTOR_CACHE']
+        self._user_vectors = LocalBackend(cache_size)
+
+    def __len__(self):
+        return len(self.project_ids)
+
+    def user_vector(self, skills):
+        """The user's normalised query vector, cached per canonical skill set."""
+        key = canonical_skills(skills)
+        vector = self._user_vectors.get(key)
+        if vector is None:
+            vector = np.zeros(len(self.skills), dtype=np.float32)
+            for skill in project_skills(key):
+                column = self.columns.get(skill)
+                if column is not None:
+                    vector[column] = self.idf[column]
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector /= norm
+            self._user_vectors.set(key, vector, None)
+        return vector
+
+    def top_k(self, skills, k=10):
+        """Up to ``k`` (project_id, score) pairs, best first. Projects sharing no skill are left out."""
+        vector = self.user_vector(skills)
+        if not len(self) or not vector.any():
+            return []
+        scores = self.matrix @ vector
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(scores[candidates], -k)[-k:]]
+        # Highest score first; ties go to the older project
+        order = candidates[np.lexsort((self.project_ids[candidates], -scores[candidates]))]
+        return [(int(self.project_ids[i]), float(scores[i])) for i in order]
+
+
+def get_project_index():
+    """The current index, rebuilt first if the stored project vectors changed."""
+    global _index, _signature, _checked_at, _stale
+    interval = settings.PROJECT_INDEX['CHECK_INTERVAL']
+    if _index is not None and not _stale and time.monotonic() - _checked_at < interval:
+        return _index
+    with _lock:
+        if _index is None or _stale or time.monotonic() - _checked_at >= interval:
+            # Cleared before checking so a save that lands meanwhile marks it again
+            _stale = False
+            signature = _current_signature()
+            if _index is None or signature != _signature:
+                _index = _load_index()
+                _signature = signature
+            _checked_at = time.monotonic()
+    return _index
+
+
+def mark_stale():
+    """Makes the next lookup in this process check for changes right away."""
+    global _stale
+    _stale = True
+
+
+def reset_project_index():
+    global _index, _signature, _checked_at, _stale
+    with _lock:
+        _index, _signature, _checked_at, _stale = None, None, 0.0, True
+
+
+def top_projects(skills, k=None):
+    """The ``k`` best matching projects for ``skills``, each with a ``match_score``."""
+    return load_ranked(get_project_index().top_k(skills, k or settings.PROJECT_INDEX['TOP_K']))
+
+
+def load_ranked(ranked):
+    """The projects of ``(project_id, score)`` pairs, in order, each with a ``match_score``."""
+    projects = Project.objects.in_bulk([pk for pk, _ in ranked])
+    matches = []
+    for pk, score in ranked:
+        project = projects.get(pk)
+        if project is not None:  # deleted since the index was built
+            project.match_score = score
+            matches.append(project)
+    return matches
+
+
+def _current_signature():
+    vectors = ProjectMatchVector.objects.aggregate(count=Count('pk'), updated=Max('updated_at'))
+    return vectors['count'], vectors['updated']
+
+
+def _load_index():
+    started = time.perf_counter()
+    project_ids, skills = [], []
+    for pk, stored in ProjectMatchVector.objects.values_list('project_id', 'skills').iterator(chunk_size=5000):
+        project_ids.append(pk)
+        skills.append(stored.split(",") if stored else [])
+    index = ProjectMatchIndex(project_ids, skills)
+    logger.info(f"Built the project match index: {len(index)} projects, {len(index.skills)} skills "
+                f"in {time.perf_counter() - started:.2f}s.")
+    missing = Project.objects.count() - len(index)
+    if missing > 0:
+        logger.warning(f"{missing} projects have no skill vector and aren't ranked; "
+                       f"run `python manage.py index_projects`.")
+    return index
@@ -0,0 +1,219 @@
+"""
+Batch (offline) course and project recommendations.
+
+``manage.py compute_recommendations`` scores every profile against the
+whole course catalog and project table in chunks of users: one sparse
+matrix product per chunk gives a dense (users x items) block, and
+``argpartition`` keeps the top ``k`` per row. The block size is capped
+by ``BATCH_RECOMMENDATIONS['MAX_CHUNK_MB']`` so memory stays bounded
+however many items there are. Chunks are scored in a process pool and
+written to the ``Recommendation`` table by the parent process, which the
+dashboard then reads instead of querying the indexes per request.
+"""
+import hashlib
+import logging
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .lookup_cache import canonical_skills
+from .models import Project, Recommendation, UserProfile
+from .workers import init_recommendation_worker, recommend_chunk
+
+logger = logging.getLogger(__name__)
+
+# Rows per INSERT when a chunk's recommendations are written
+INSERT_BATCH_SIZE = 1000
+
+
+def skills_digest(skills):
+    """Short hash of a canonical skill set; identifies what a recommendation was computed from."""
+    return hashlib.sha256(",".join(canonical_skills(skills)).encode()).hexdigest()[:32]
+
+
+def top_k_rows(scores, k):
+    """
+    Per row of a dense score block, the column indices and scores of the
+    ``k`` best entries, best first. Entries scoring 0 are marked with -1.
+    """
+    n_rows, n_cols = scores.shape
+    k = min(k, n_cols)
+    if k == 0:
+        return np.zeros((n_rows, 0), dtype=np.int64), np.zeros((n_rows, 0), dtype=scores.dtype)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1, kind='stable')
+    top = np.take_along_axis(top, order, axis=1)
+    top_scores = np.take_along_axis(top_scores, order, axis=1)
+    top[top_scores <= 0] = -1
+    return top, top_scores
+
+
+def course_block(course_index, skills_list):
+    """(users x courses) cosine similarities for a chunk of users."""
+    queries = course_index.query_matrix([skills or '' for skills in skills_list])
+    # Course rows and queries are L2-normalised; matrix.T is the stored term-major postings
+    return (queries @ course_index.matrix.T).toarray()
+
+
+def project_block(project_index, skills_list):
+    """(users x projects) cosine similarities for a chunk of users."""
+    users = np.vstack([project_index.user_vector(skills) for skills in skills_list])
+    return np.asarray((project_index.matrix @ users.T).T)
+
+
+def score_chunk(rows, course_index, project_index, k_courses, k_projects):
+    """
+    Scores ``(profile_id, skills)`` rows and returns, per profile,
+    ``(profile_id, digest, [(course_row, score)], [(project_id, score)])``.
+    """
+    skills_list = [skills for _, skills in rows]
+    courses = [[] for _ in rows]
+    projects = [[] for _ in rows]
+    if course_index is not None and len(course_index) and k_courses:
+        top, top_scores = top_k_rows(course_block(course_index, skills_list), k_courses)
+        for i in range(len(rows)):
+            courses[i] = [(int(c), float(s)) for c, s in zip(top[i], top_scores[i])
+                          if c >= 0 and s > settings.COURSE_MIN_SCORE]
+    if project_index is not None and len(project_index) and k_projects:
+        top, top_scores = top_k_rows(project_block(project_index, skills_list), k_projects)
+        for i in range(len(rows)):
+            projects[i] = [(int(project_index.project_ids[p]), float(s)) for p, s in zip(top[i], top_scores[i]) if p >= 0]
+    return [
+        (profile_id, skills_digest(skills), courses[i], projects[i])
+        for i, (profile_id, skills) in enumerate(rows)
+    ]
+
+
+def chunk_rows(n_items, chunk_size=None):
+    """Users per chunk so a dense (users x items) float32 block fits in MAX_CHUNK_MB."""
+    conf = settings.BATCH_RECOMMENDATIONS
+    chunk_size = chunk_size or conf['CHUNK_SIZE']
+    budget = conf['MAX_CHUNK_MB'] * 2**20 // (8 * max(n_items, 1))  # float64 headroom for the product
+    return max(1, min(chunk_size, budget))
+
+
+def load_indexes(kinds):
+    from .course_index import get_course_index
+    from .project_index import get_project_index
+
+    course_index = get_course_index() if Recommendation.COURSE in kinds else None
+    project_index = get_project_index() if Recommendation.PROJECT in kinds else None
+    return course_index, project_index
+
+
+def compute_recommendations(kinds=(Recommendation.COURSE, Recommendation.PROJECT), workers=None,
+                            chunk_size=None, k_courses=None, k_projects=None, progress=None):
+    """
+    Recomputes the stored recommendations of every profile with skills.
+    Returns ``{'users': n, 'seconds': t, 'users_per_second': r}``.
+    """
+    conf = settings.BATCH_RECOMMENDATIONS
+    workers = conf['WORKERS'] if workers is None else workers
+    k_courses = conf['K_COURSES'] if k_courses is None else k_courses
+    k_projects = conf['K_PROJECTS'] if k_projects is None else k_projects
+    started = time.perf_counter()
+
+    course_index, project_index = load_indexes(kinds)
+    n_items = max(len(course_index) if course_index is not None else 0,
+                  len(project_index) if project_index is not None else 0)
+    size = chunk_rows(n_items, chunk_size)
+    computed_at = timezone.now()
+
+    # Profiles without skills get nothing recommended
+    Recommendation.objects.filter(Q(profile__skills='') | Q(profile__skills__isnull=True)).delete()
+
+    total = 0
+
+    def save(results):
+        nonlocal total
+        save_chunk(results, kinds, course_index, computed_at)
+        total += len(results)
+        if progress:
+            progress(total, time.perf_counter() - started)
+
+    if workers > 0:
+        # spawn, as for resume jobs; each worker loads its own (memory-mapped / DB-built) indexes
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=init_recommendation_worker, initargs=(list(kinds),)) as pool:
+            in_flight = deque()
+            for rows in _profile_chunks(size):
+                in_flight.append(pool.submit(recommend_chunk, rows, k_courses, k_projects))
+                # Bound the number of pending results held in memory
+                while len(in_flight) >= 2 * workers:
+                    save(in_flight.popleft().result())
+            while in_flight:
+                save(in_flight.popleft().result())
+    else:
+        for rows in _profile_chunks(size):
+            save(score_chunk(rows, course_index, project_index, k_courses, k_projects))
+
+    # Cached dashboards may hold the previous recommendations
+    from .dashboard_cache import invalidate_all
+    invalidate_all()
+
+    seconds = time.perf_counter() - started
+    rate = total / seconds if seconds else 0.0
+    logger.info(f"Computed recommendations for {total} users in {seconds:.1f}s ({rate:.0f} users/s).")
+    return {'users': total, 'seconds': seconds, 'users_per_second': rate}
+
+
+def save_chunk(results, kinds, course_index, computed_at):
+    """Replaces the stored recommendations of the profiles in ``results``."""
+    recommendations = []
+    for profile_id, digest, courses, projects in results:
+        for rank, (row, score) in enumerate(courses):
+            recommendations.append(Recommendation(
+                profile_id=profile_id, kind=Recommendation.COURSE, rank=rank, score=score,
+                course=course_index.courses[row].as_dict(), skills_digest=digest, computed_at=computed_at))
+        for rank, (project_id, score) in enumerate(projects):
+            recommendations.append(Recommendation(
+                profile_id=profile_id, kind=Recommendation.PROJECT, rank=rank, score=score,
+                project_id=project_id, skills_digest=digest, computed_at=computed_at))
+    project_ids = {rec.project_id for rec in recommendations if rec.project_id is not None}
+
+    with transaction.atomic():
+        Recommendation.objects.filter(profile_id__in=[r[0] for r in results], kind__in=kinds).delete()
+        # A project deleted since the index was built would break the FK
+        live_projects = set(Project.objects.filter(pk__in=project_ids).values_list('pk', flat=True))
+        Recommendation.objects.bulk_create(
+            [rec for rec in recommendations if rec.project_id is None or rec.project_id in live_projects],
+            batch_size=INSERT_BATCH_SIZE)
+
+
+def stored_recommendations(profile):
+    """
+    The profile's precomputed recommendations that still match its skills:
+    ``{'course': [course dicts], 'project': [Projects with match_score]}``;
+    a kind is missing when there is nothing current for it.
+    """
+    if settings.MATCH_ENGINE != 'tfidf':
+        return {}  # they were scored with TF-IDF
+    digest = skills_digest(profile.skills)
+    found = {}
+    for rec in profile.recommendations.filter(skills_digest=digest).select_related('project'):
+        if rec.kind == Recommendation.COURSE:
+            found.setdefault(rec.kind, []).append(rec.course)
+        else:
+            rec.project.match_score = rec.score
+            found.setdefault(rec.kind, []).append(rec.project)
+    return found
+
+
+def _profile_chunks(size):
+    # Keyset pagination, so no cursor stays open while chunks are written
+    profiles = UserProfile.objects.exclude(Q(skills='') | Q(skills__isnull=True)).order_by('pk')
+    last = 0
+    while True:
+        rows = list(profiles.filter(pk__gt=last).values_list('pk', 'skills')[:size])
+        if not rows:
+            return
+        yield rows
+        last = rows[-1][0]
@@ -0,0 +1,48 @@
+"""
+Persisted cache of resume text and skills keyed on the PDF's SHA-256, so
+a file that was seen before (re-upload, profile update, duplicate) skips
+pdfminer and the skill matcher entirely.
+"""
+import logging
+
+from django.db import DatabaseError
+
+from .models import ResumeCache
+from .skills import vocabulary_fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Bump when text extraction changes (pdfminer settings, page handling...)
+TEXT_EXTRACTOR_VERSION = 'pdfminer-pages-1'
+
+
+def get_entry(digest):
+    try:
+        return ResumeCache.objects.filter(sha256=digest).first()
+    except DatabaseError as e:
+        logger.error(f"Resume cache lookup failed: {e}")
+        return None
+
+
+def cached_text(entry):
+    if entry is not None and entry.text is not None and entry.text_version == TEXT_EXTRACTOR_VERSION:
+        return entry.text
+    return None
+
+
+def cached_skills(entry):
+    if entry is not None and entry.skills is not None and entry.skills_version == vocabulary_fingerprint():
+        return entry.skills.split(", ") if entry.skills else []
+    return None
+
+
+def store(digest, text=None, skills=None):
+    defaults = {}
+    if text is not None:
+        defaults.update(text=text, text_version=TEXT_EXTRACTOR_VERSION)
+    if skills is not None:
+        defaults.update(skills=", ".join(skills), skills_version=vocabulary_fingerprint())
+    try:
+        ResumeCache.objects.update_or_create(sha256=digest, defaults=defaults)
+    except DatabaseError as e:
+        logger.error(f"Resume cache write failed: {e}")
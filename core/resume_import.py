@@ -0,0 +1,244 @@
+"""
+Bulk resume import for onboarding batches.
+
+``manage.py import_resumes <dir>`` walks a folder of PDFs and gives each
+one a user and profile: ``jane.doe.pdf`` belongs to the user
+``jane.doe``, who is created (without a usable password) if missing.
+Text and skills are extracted in a process pool, one file per task, and
+the parent writes users, profiles, skill rows, finished ``ResumeJob``
+rows and resume cache entries in one transaction per batch with
+``bulk_create`` / ``bulk_update``.
+
+Imports are idempotent: a file whose content is already its user's
+resume is skipped, and a file seen before by the resume cache (with the
+current vocabulary) isn't parsed again. Detected skills are merged into
+the profile's existing ones.
+
+Bulk writes skip the post_save signals, so this module does their work:
+UserSkill rows are added here and the updated profiles are applied to
+the candidate index on commit. Cached dashboards are keyed on the
+profile's skills and miss by themselves.
+"""
+import itertools
+import logging
+import multiprocessing
+import os
+import re
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.auth.hashers import make_password
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from . import resume_cache
+from .models import ResumeCache, ResumeJob, Skill, UserProfile, UserSkill
+from .resume_jobs import merge_skills
+from .skills import vocabulary_fingerprint
+from .storage import file_digest
+from .workers import extract_resume, init_worker
+
+logger = logging.getLogger(__name__)
+
+USERNAME_MAX_LENGTH = User._meta.get_field('username').max_length
+
+
+def find_resumes(directory):
+    """Paths of the PDFs under ``directory`` (recursively), sorted."""
+    paths = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        paths.extend(os.path.join(root, name) for name in files if name.lower().endswith('.pdf'))
+    return sorted(paths)
+
+
+def username_for(path):
+    """``resumes/Jane Doe.pdf`` -> ``Jane-Doe``: the file name, limited to the characters usernames allow."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return re.sub(r'[^\w.@+-]+', '-', stem).strip('-')[:USERNAME_MAX_LENGTH]
+
+
+class ResumeFile:
+    """One file of an import and, once parsed, its result."""
+    __slots__ = ('path', 'digest', 'username', 'skills', 'text', 'seconds', 'error')
+
+    def __init__(self, path, digest, username):
+        self.path = path
+        self.digest = digest
+        self.username = username
+        self.skills = self.text = self.error = None
+        self.seconds = None  # stays None for files served from the resume cache
+
+
+def import_resumes(directory, workers=None, batch_size=None, progress=None):
+    """
+    Imports every new resume under ``directory``. ``progress(item, done, total)``
+    is called as each file is written (``item.error`` is set for files that
+    failed). Returns counts of found / skipped / imported / failed files,
+    the elapsed seconds, files per second and the per-file parse times.
+    """
+    conf = settings.RESUME_IMPORT
+    workers = conf['WORKERS'] if workers is None else workers
+    batch_size = batch_size or conf['BATCH_SIZE']
+    started = time.perf_counter()
+
+    paths = find_resumes(directory)
+    items, skipped = _new_files(paths, batch_size)
+    stats = {'found': len(paths), 'skipped': skipped, 'imported': 0, 'failed': 0, 'parse_seconds': []}
+
+    # Files the resume cache has already parsed don't need a worker
+    cached, to_parse = [], []
+    for chunk in _chunks(items, batch_size):
+        entries = ResumeCache.objects.in_bulk([item.digest for item in chunk])
+        for item in chunk:
+            item.skills = resume_cache.cached_skills(entries.get(item.digest))
+            if item.skills is None:
+                to_parse.append(item)
+            else:
+                cached.append(item)
+
+    batch = []
+    done = 0
+    for item in itertools.chain(cached, _parse(to_parse, workers)):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            done = _flush(batch, stats, done, len(items), progress)
+    if batch:
+        _flush(batch, stats, done, len(items), progress)
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['files_per_second'] = (stats['imported'] + stats['failed']) / stats['seconds'] if stats['seconds'] else 0.0
+    logger.info(f"Imported {stats['imported']} resumes from {directory} in {stats['seconds']:.1f}s "
+                f"({stats['skipped']} already imported, {stats['failed']} failed).")
+    return stats
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _new_files(paths, batch_size):
+    """``(items, skipped)``: the files that aren't already their user's resume."""
+    items = []
+    skipped = 0
+    seen = set()
+    for chunk in _chunks(paths, batch_size):
+        digests = {path: file_digest(path) for path in chunk}
+        usernames = {path: username_for(path) for path in chunk}
+        stored = dict(ResumeCache.objects.filter(sha256__in=set(digests.values())).exclude(file_name='')
+                      .values_list('sha256', 'file_name'))
+        resumes = dict(UserProfile.objects.filter(user__username__in=set(usernames.values()))
+                       .values_list('user__username', 'resume'))
+        for path, digest in digests.items():
+            username = usernames[path]
+            imported = digest in stored and resumes.get(username) == stored[digest]
+            if imported or not username or (digest, username) in seen:
+                skipped += 1
+                continue
+            seen.add((digest, username))
+            items.append(ResumeFile(path, digest, username))
+    return items, skipped
+
+
+def _parse(items, workers):
+    """Yields the items with ``skills``/``text``/``seconds``/``error`` filled in, in order."""
+    if workers <= 0 or len(items) <= 1:
+        for item in items:
+            item.skills, item.text, item.seconds, item.error = extract_resume(item.path)
+            yield item
+        return
+
+    workers = min(workers, len(items))
+    # spawn, as for resume jobs; each worker loads the skill matcher once
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=init_worker) as pool:
+        in_flight = deque()
+        for item in items:
+            in_flight.append((item, pool.submit(extract_resume, item.path)))
+            # Bound the number of parsed texts held in memory
+            while len(in_flight) >= 4 * workers:
+                yield _collect(*in_flight.popleft())
+        while in_flight:
+            yield _collect(*in_flight.popleft())
+
+
+def _collect(item, future):
+    item.skills, item.text, item.seconds, item.error = future.result()
+    return item
+
+
+def _flush(batch, stats, done, total, progress):
+    ok = [item for item in batch if item.error is None]
+    if ok:
+        _save_batch(ok)
+    for item in batch:
+        done += 1
+        if item.error is None:
+            stats['imported'] += 1
+            if item.seconds is not None:
+                stats['parse_seconds'].append(item.seconds)
+        else:
+            stats['failed'] += 1
+            logger.error(f"Could not import {item.path}: {item.error}")
+        if progress:
+            progress(item, done, total)
+    batch.clear()
+    return done
+
+
+def _save_batch(items):
+    """Writes a batch of parsed resumes in one transaction."""
+    field = UserProfile._meta.get_field('resume')
+    now = timezone.now()
+    with transaction.atomic():
+        usernames = {item.username for item in items}
+        users = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+        User.objects.bulk_create([User(username=name, password=make_password(None))
+                                  for name in sorted(usernames - set(users))])
+        users = dict(User.objects.filter(username__in=usernames).values_list('username', 'pk'))
+
+        profiles = {profile.user_id: profile for profile in UserProfile.objects.filter(user_id__in=users.values())}
+        UserProfile.objects.bulk_create([UserProfile(user_id=user_id, skills='')
+                                         for user_id in set(users.values()) - set(profiles)])
+        profiles = {profile.user_id: profile for profile in UserProfile.objects.filter(user_id__in=users.values())}
+
+        cache_entries = []
+        jobs = []
+        for item in items:
+            profile = profiles[users[item.username]]
+            with open(item.path, 'rb') as f:
+                # The deduplicating storage also records the file name in the resume cache
+                profile.resume = field.storage.save(field.generate_filename(profile, os.path.basename(item.path)),
+                                                    File(f), max_length=field.max_length)
+            profile.skills = merge_skills(profile.skills, item.skills)
+            profile.updated_at = now  # bulk_update doesn't apply auto_now
+            jobs.append(ResumeJob(profile=profile, resume_name=profile.resume.name, status=ResumeJob.DONE,
+                                  skills=", ".join(item.skills)))
+            if item.text is not None:
+                cache_entries.append(ResumeCache(
+                    sha256=item.digest, file_name=profile.resume.name, text=item.text,
+                    text_version=resume_cache.TEXT_EXTRACTOR_VERSION,
+                    skills=", ".join(item.skills), skills_version=vocabulary_fingerprint()))
+
+        updated = list({profile.pk: profile for profile in profiles.values()}.values())
+        UserProfile.objects.bulk_update(updated, ['resume', 'skills', 'updated_at'])
+        ResumeJob.objects.bulk_create(jobs)
+        ResumeCache.objects.bulk_create(
+            cache_entries, update_conflicts=True, unique_fields=['sha256'],
+            update_fields=['text', 'text_version', 'skills', 'skills_version', 'updated_at'])
+
+        # The matcher returns canonical names, so no alias lookup per file
+        skill_ids = {skill.name: skill.pk for skill in Skill.objects.resolve(
+            {name for item in items for name in item.skills})}
+        UserSkill.objects.bulk_create([
+            UserSkill(profile=profiles[users[item.username]], skill_id=skill_ids[name], source=UserSkill.RESUME)
+            for item in items for name in item.skills if name in skill_ids
+        ], ignore_conflicts=True)
+
+        from .candidate_index import index_profile
+        transaction.on_commit(lambda: [index_profile(profile) for profile in updated])
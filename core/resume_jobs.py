@@ -0,0 +1,191 @@
+"""
+Asynchronous resume ingestion.
+
+Uploading a resume only stores the file and enqueues a ``ResumeJob``
+row. The parse (pdfminer + skill extraction, CPU-bound) runs in a local
+process pool; when it finishes the detected skills are merged into the
+profile. The queue lives in the database, so no broker is needed:
+``manage.py process_resume_jobs`` drains it from a separate process
+(and picks up jobs left behind by a crashed web worker).
+
+Jobs are idempotent: a resume already queued for a profile is not queued
+again, a finished job is never re-run, and merging skills is a set union.
+"""
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import ResumeJob, UserProfile, UserSkill
+from .skill_tags import add_profile_skills
+from .workers import init_worker, parse_resume
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn keeps the pool independent of the web process' threads and works on every platform
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.RESUME_JOBS['WORKERS'],
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=init_worker,
+            )
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        broken, _executor = _executor, None
+    if broken is not None:
+        broken.shutdown(wait=False, cancel_futures=True)
+    return get_executor()
+
+
+def merge_skills(existing, new_skills):
+    """Merges skills into a stored ", "-joined skills string."""
+    all_skills = set(existing.split(", ") if existing else [])
+    all_skills.update(new_skills)
+    all_skills.discard('')
+    return ", ".join(sorted(all_skills))
+
+
+def enqueue_resume(profile):
+    """
+    Queues the profile's current resume for parsing and returns the job.
+    Re-uploading the same file while a job is pending returns that job.
+    """
+    job = ResumeJob.objects.filter(
+        profile=profile,
+        resume_name=profile.resume.name,
+        status__in=[ResumeJob.PENDING, ResumeJob.RUNNING],
+    ).first()
+    if job is None:
+        job = ResumeJob.objects.create(profile=profile, resume_name=profile.resume.name)
+    transaction.on_commit(lambda: dispatch(job.pk))
+    return job
+
+
+def dispatch(job_id):
+    """Starts a pending job: inline when EAGER, on the local pool when WORKERS > 0."""
+    conf = settings.RESUME_JOBS
+    if conf['EAGER']:
+        run_job(job_id)
+    elif conf['WORKERS'] > 0:
+        job = _claim(job_id)
+        if job is not None:
+            try:
+                future = get_executor().submit(parse_resume, _resume_path(job))
+            except BrokenProcessPool:
+                # A pool process died; start a fresh pool
+                future = _reset_executor().submit(parse_resume, _resume_path(job))
+            future.add_done_callback(lambda f: _on_done(job_id, f))
+    # With WORKERS = 0 the job waits for `manage.py process_resume_jobs`
+
+
+def run_job(job_id):
+    """Claims and runs a job in the current process."""
+    job = _claim(job_id)
+    while job is not None:
+        try:
+            skills = parse_resume(_resume_path(job))
+        except Exception as e:
+            job = _claim(job_id) if _fail(job_id, e) else None
+        else:
+            _complete(job_id, skills)
+            return
+
+
+def process_pending_jobs(limit=None):
+    """Runs queued jobs (and requeues stale ones) in this process. Returns how many ran."""
+    requeue_stale_jobs()
+    ids = ResumeJob.objects.filter(status=ResumeJob.PENDING).order_by('created_at').values_list('pk', flat=True)
+    if limit:
+        ids = ids[:limit]
+    ids = list(ids)
+    for job_id in ids:
+        run_job(job_id)
+    return len(ids)
+
+
+def requeue_stale_jobs():
+    """Jobs left 'running' by a worker that died go back to the queue."""
+    cutoff = timezone.now() - timedelta(seconds=settings.RESUME_JOBS['STALE_AFTER'])
+    return ResumeJob.objects.filter(status=ResumeJob.RUNNING, updated_at__lt=cutoff).update(
+        status=ResumeJob.PENDING, updated_at=timezone.now())
+
+
+def retry_job(job):
+    """Puts a failed job back in the queue."""
+    if job.status == ResumeJob.FAILED:
+        ResumeJob.objects.filter(pk=job.pk, status=ResumeJob.FAILED).update(
+            status=ResumeJob.PENDING, attempts=0, error='', updated_at=timezone.now())
+        transaction.on_commit(lambda: dispatch(job.pk))
+
+
+def _resume_path(job):
+    return default_storage.path(job.resume_name)
+
+
+def _claim(job_id):
+    # Atomic compare-and-set so a job only ever runs in one place
+    claimed = ResumeJob.objects.filter(pk=job_id, status=ResumeJob.PENDING).update(
+        status=ResumeJob.RUNNING, updated_at=timezone.now())
+    return ResumeJob.objects.get(pk=job_id) if claimed else None
+
+
+def _on_done(job_id, future):
+    # Runs on the pool's callback thread, which needs its own DB connection
+    close_old_connections()
+    try:
+        error = future.exception()
+        if error is None:
+            _complete(job_id, future.result())
+        elif _fail(job_id, error):
+            dispatch(job_id)
+    except Exception as e:
+        logger.error(f"Could not record the result of resume job {job_id}: {e}")
+    finally:
+        close_old_connections()
+
+
+def _complete(job_id, skills):
+    with transaction.atomic():
+        job = ResumeJob.objects.select_for_update().select_related('profile').get(pk=job_id)
+        if job.status != ResumeJob.RUNNING:
+            return
+        profile = UserProfile.objects.select_for_update().get(pk=job.profile_id)
+        add_profile_skills(profile, skills, source=UserSkill.RESUME)
+        profile.skills = merge_skills(profile.skills, skills)
+        profile.save(update_fields=['skills', 'updated_at'])
+
+        job.status = ResumeJob.DONE
+        job.skills = ", ".join(skills)
+        job.error = ''
+        job.save(update_fields=['status', 'skills', 'error', 'updated_at'])
+    logger.info(f"Resume job {job_id} merged {len(skills)} skills into profile {job.profile_id}.")
+
+
+def _fail(job_id, error):
+    """Records a failed attempt; returns True if the job was requeued for another try."""
+    job = ResumeJob.objects.get(pk=job_id)
+    job.attempts += 1
+    job.error = str(error)
+    retry = job.attempts < settings.RESUME_JOBS['MAX_ATTEMPTS']
+    job.status = ResumeJob.PENDING if retry else ResumeJob.FAILED
+    job.save(update_fields=['attempts', 'error', 'status', 'updated_at'])
+    logger.error(f"Resume job {job_id} failed (attempt {job.attempts}): {error}")
+    return retry
@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Project, UserProfile
+from .skill_tags import sync_profile_skills
+
+
+# The index modules pull in spaCy/numpy, so they are imported on first use rather than at app load
+@receiver(post_save, sender=Project)
+def index_saved_project(sender, instance, raw=False, **kwargs):
+    if not raw:  # fixtures are indexed on the next rebuild
+        from .project_index import index_project
+        from . import hashing_index
+        hashing_index.index_project(instance.pk, index_project(instance))
+        if settings.MATCH_ENGINE == 'embedding':
+            from . import embeddings
+            embeddings.index_project(instance)
+    # Any project can change anyone's ranked projects
+    from .dashboard_cache import invalidate_all
+    invalidate_all()
+
+
+@receiver(post_delete, sender=Project)
+def drop_deleted_project(sender, instance, **kwargs):
+    # The vector row goes with the project (CASCADE); just rebuild the index
+    from .project_index import mark_stale
+    mark_stale()
+    from . import embeddings, hashing_index
+    hashing_index.unindex_project(instance.pk)
+    embeddings.unindex_project(instance.pk)
+    from .dashboard_cache import invalidate_all
+    invalidate_all()
+
+
+@receiver(post_save, sender=UserProfile)
+def update_saved_profile(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is None or 'skills' in update_fields:
+        sync_profile_skills(instance)
+    from .candidate_index import index_profile
+    transaction.on_commit(lambda: index_profile(instance))
+    from .dashboard_cache import invalidate_profile
+    invalidate_profile(instance.pk)
+
+
+@receiver(post_delete, sender=UserProfile)
+def unindex_deleted_profile(sender, instance, **kwargs):
+    from .candidate_index import unindex_profile
+    profile_id = instance.pk
+    transaction.on_commit(lambda: unindex_profile(profile_id))
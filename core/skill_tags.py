@@ -0,0 +1,49 @@
+"""
+Keeps the normalized skill tables (UserSkill / ProjectSkill) in step with
+the ", "-joined ``skills`` / ``required_skills`` text the views display.
+
+Callers that know where a skill came from record it with
+``add_profile_skills`` before saving the profile; the post_save sync then
+only fills in skills it hasn't seen (as manual) and drops removed ones.
+Only names that are already Skill rows (or their aliases) are tagged: the
+text keeps whatever was typed, but a typo doesn't become a skill.
+"""
+from django.db import transaction
+
+from .models import ProjectSkill, Skill, UserSkill
+
+
+def split_skills(text):
+    return [name for name in (text or '').split(",") if name.strip()]
+
+
+def add_profile_skills(profile, names, source=UserSkill.MANUAL):
+    skills = Skill.objects.resolve(names)
+    UserSkill.objects.bulk_create(
+        [UserSkill(profile=profile, skill=skill, source=source) for skill in skills],
+        ignore_conflicts=True,
+    )
+
+
+def sync_profile_skills(profile):
+    """Makes the profile's UserSkill rows match its skills text."""
+    names = Skill.objects.normalize(split_skills(profile.skills))
+    with transaction.atomic():
+        UserSkill.objects.filter(profile=profile).exclude(skill__name__in=names).delete()
+        known = set(UserSkill.objects.filter(profile=profile).values_list('skill__name', flat=True))
+        missing = [name for name in names if name not in known]
+        if missing:
+            add_profile_skills(profile, missing)
+
+
+def replace_project_skills(project_skills):
+    """Replaces the ProjectSkill rows of each project id in ``{project_id: [canonical names]}``."""
+    skills = {skill.name: skill.pk for skill in Skill.objects.resolve(
+        {name for names in project_skills.values() for name in names})}
+    with transaction.atomic():
+        ProjectSkill.objects.filter(project_id__in=list(project_skills)).delete()
+        ProjectSkill.objects.bulk_create([
+            ProjectSkill(project_id=project_id, skill_id=skills[name])
+            for project_id, names in project_skills.items()
+            for name in names if name in skills
+        ])
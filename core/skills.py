@@ -0,0 +1,111 @@
+"""
+Skill matching engine.
+
+Builds a spaCy ``PhraseMatcher`` over the skill vocabulary (and aliases)
+and runs it on tokenizer output only, so a resume is scanned in one pass
+without the tagger/parser/NER, and multi-word skills such as
+"machine learning" or "rest api" are matched as phrases.
+"""
+import hashlib
+import json
+from collections import Counter
+from typing import NamedTuple
+
+from spacy.matcher import PhraseMatcher
+from spacy.util import filter_spans
+
+# Bump when matching behaviour changes so cached resume skills are recomputed
+SKILL_EXTRACTOR_VERSION = 1
+
+SKILL_KEYWORDS = [
+    "python", "django", "machine learning", "javascript", "react",
+    "java", "sql", "html", "css", "data analysis", "flask",
+    "node.js", "angular", "vue.js", "docker", "kubernetes",
+    "aws", "azure", "git", "rest api", "graphql", "mongodb",
+    "postgresql", "linux", "bash", "pandas", "numpy", "tensorflow",
+    "pytorch", "scikit-learn", "big data", "spark", "hadoop"
+]
+
+# Alternative spellings mapped to their canonical skill
+SKILL_ALIASES = {
+    "k8s": "kubernetes",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "ml": "machine learning",
+    "js": "javascript",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node.js",
+    "node js": "node.js",
+    "vuejs": "vue.js",
+    "vue": "vue.js",
+    "angularjs": "angular",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "rest apis": "rest api",
+    "restful api": "rest api",
+    "restful apis": "rest api",
+    "amazon web services": "aws",
+    "microsoft azure": "azure",
+    "apache spark": "spark",
+    "pyspark": "spark",
+    "apache hadoop": "hadoop",
+    "html5": "html",
+    "css3": "css",
+}
+
+
+def vocabulary_fingerprint(skills=SKILL_KEYWORDS, aliases=SKILL_ALIASES):
+    """Identifies the extractor version plus vocabulary that produced a set of skills."""
+    payload = json.dumps([sorted(skills), sorted(aliases.items())]).encode()
+    return f"{SKILL_EXTRACTOR_VERSION}:{hashlib.sha256(payload).hexdigest()[:16]}"
+
+
+class SkillMatch(NamedTuple):
+    skill: str       # canonical skill name
+    text: str        # text as it appeared
+    start_char: int
+    end_char: int
+
+
+class SkillMatcher:
+    def __init__(self, nlp, skills=SKILL_KEYWORDS, aliases=SKILL_ALIASES):
+        self.nlp = nlp
+        self.skills = list(skills)
+        self.matcher = PhraseMatcher(nlp.vocab, attr="LOWER")
+
+        phrases = {skill: [skill] for skill in self.skills}
+        for alias, skill in aliases.items():
+            if skill in phrases:
+                phrases[skill].append(alias)
+        for skill, variants in phrases.items():
+            # make_doc only runs the tokenizer
+            self.matcher.add(skill, [nlp.make_doc(variant) for variant in variants])
+
+    def find(self, text):
+        """Returns every skill occurrence in ``text``, in document order."""
+        if not text:
+            return []
+        return self.find_in_doc(self.nlp.make_doc(text))
+
+    def find_in_doc(self, doc):
+        matches = self.matcher(doc)
+        spans = [doc[start:end] for _, start, end in matches]
+        labels = {(start, end): self.nlp.vocab.strings[match_id] for match_id, start, end in matches}
+        # Prefer the longest match where phrases overlap (e.g. "big data" over "data")
+        return [
+            SkillMatch(labels[(span.start, span.end)], span.text, span.start_char, span.end_char)
+            for span in sorted(filter_spans(spans), key=lambda span: span.start)
+        ]
+
+    def extract(self, text):
+        """Canonical skill names in the order they occur (with repeats)."""
+        return [match.skill for match in self.find(text)]
+
+    def extract_many(self, texts, batch_size=256):
+        """``extract`` for many texts, tokenized in batches through ``nlp.pipe``."""
+        return [[match.skill for match in self.find_in_doc(doc)]
+                for doc in self.nlp.pipe((text or '' for text in texts), batch_size=batch_size)]
+
+    def counts(self, text):
+        return Counter(self.extract(text))
@@ -0,0 +1,52 @@
+"""
+Content-addressed handling of uploaded resumes.
+"""
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+def file_digest(pdf_file):
+    """
+    SHA-256 of an uploaded file, file-like object or path. File objects are
+    rewound afterwards so they can still be read.
+    """
+    digest = hashlib.sha256()
+    if hasattr(pdf_file, 'chunks'):
+        pdf_file.seek(0)
+        for chunk in pdf_file.chunks():
+            digest.update(chunk)
+        pdf_file.seek(0)
+    elif hasattr(pdf_file, 'read'):
+        position = pdf_file.tell()
+        for chunk in iter(lambda: pdf_file.read(1 << 20), b''):
+            digest.update(chunk)
+        pdf_file.seek(position)
+    else:
+        with open(pdf_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+@deconstructible
+class DeduplicatingStorage(FileSystemStorage):
+    """
+    Stores each distinct file once, named after its SHA-256 in the upload
+    directory (``resumes/<sha256>.pdf``): saving bytes that were uploaded
+    before returns the name of the existing copy instead of writing a new
+    one, and no uploader's file name is shown to the others.
+    """
+
+    def save(self, name, content, max_length=None):
+        from .models import ResumeCache
+
+        digest = file_digest(content)
+        directory, base = os.path.split(name)
+        name = os.path.join(directory, digest + os.path.splitext(base)[1].lower())
+        if not self.exists(name):
+            name = super().save(name, content, max_length=max_length)
+        ResumeCache.objects.update_or_create(sha256=digest, defaults={'file_name': name})
+        return name
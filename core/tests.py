@@ -1,3 +1,1532 @@
-from django.test import TestCase
+import csv
+import hashlib
+import io
+import json
+import os
+import pstats
+import runpy
+import shutil
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+import numpy as np
+import requests
+import spacy
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.core.management import call_command
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from benchmarks import suite as benchmark_suite
+
+from . import aggregation, async_views, course_index, embeddings, hashing_index, nlp, nlp_service, utils, views
+from .aggregation import agather_sources, gather_sources, reset_executors
+from .async_http import AsyncUpstreamClient
+from .candidate_index import CandidateIndex, QueryError, parse_query, reset_candidate_index
+from .course_index import Course, catalog_changed, get_course_index, make_vectorizer, reset_course_index
+from .embeddings import reset_embeddings
+from .hashing_index import HashedTfidfIndex, reset_hashing_index
+from .http_client import CircuitBreaker, CircuitOpenError, UpstreamClient
+from .job_index import harvest_jobs, harvest_skills, search_jobs, store_results
+from .lookup_cache import DjangoCacheBackend, LocalBackend, LookupCache, canonical_skills
+from .models import JobPosting, Project, ProjectMatchVector, Recommendation, ResumeCache, ResumeJob, Skill, UserProfile, UserSkill
+from .pdf_text import PdfPages, open_pdf
+from .project_index import ProjectMatchIndex, reset_project_index, top_projects
+from .recommendations import compute_recommendations, stored_recommendations, top_k_rows
+from .resume_jobs import enqueue_resume, process_pending_jobs
+from .skill_tags import add_profile_skills
+from .skills import SKILL_KEYWORDS, SkillMatcher
+
+
+class StubAPIServer:
+    """
+    Local HTTP server standing in for Adzuna / GitHub. ``routes`` maps a
+    path prefix to ``(delay_seconds, status, payload[, headers])``, to a
+    list of those served in order (the last one repeats), or to a function
+    of the request path returning one.
+    """
+
+    def __init__(self, routes):
+        self.routes = routes
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stub.requests.append(self.path)
+                for prefix, responses in stub.routes.items():
+                    if self.path.startswith(prefix):
+                        if callable(responses):
+                            response = responses(self.path)
+                        elif isinstance(responses, list):
+                            response = responses.pop(0) if len(responses) > 1 else responses[0]
+                        else:
+                            response = responses
+                        break
+                else:
+                    response = (0, 404, {})
+                delay, status, payload, headers = (tuple(response) + ({},))[:4]
+                time.sleep(delay)
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # the client gave up (e.g. a timeout test)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def make_pdf(*pages):
+    """Builds a minimal PDF with one page of text per argument."""
+    count = len(pages)
+    font = 3 + 2 * count
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(b"%d 0 R" % (3 + 2 * i) for i in range(count)), count),
+    ]
+    for i, text in enumerate(pages):
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET".encode()
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+                       b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (4 + 2 * i, font))
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    pdf = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    pdf += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return pdf
+
+
+ADZUNA_PAYLOAD = {'results': [{
+    'title': 'Backend Engineer',
+    'company': {'display_name': 'Acme'},
+    'location': {'display_name': 'Remote'},
+    'description': 'Python and Django',
+    'redirect_url': 'https://example.com/job/1',
+}]}
+GITHUB_PAYLOAD = {'items': [{'name': 'django', 'description': 'Web framework', 'html_url': 'https://github.com/django/django'}]}
+
+
+class UpstreamStubs:
+    def start_stubs(self, adzuna_delay=0, github_delay=0):
+        self.adzuna = StubAPIServer({'/jobs/': (adzuna_delay, 200, ADZUNA_PAYLOAD)})
+        self.github = StubAPIServer({'/search/repositories': (github_delay, 200, GITHUB_PAYLOAD)})
+        self.addCleanup(self.adzuna.close)
+        self.addCleanup(self.github.close)
+        for patcher in (
+            mock.patch.object(utils, 'ADZUNA_BASE_URL', f'{self.adzuna.url}/jobs'),
+            mock.patch.object(utils, 'GITHUB_API_URL', self.github.url),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class TempDirs:
+    def make_temp_dir(self):
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path, ignore_errors=True)
+        return path
+
+    def override(self, **overrides):
+        patcher = override_settings(**overrides)
+        patcher.enable()
+        self.addCleanup(patcher.disable)
+
+
+class CourseCatalog(TempDirs):
+    """A course catalog CSV of ``(title, intro, url, created by)`` rows in a temporary data directory."""
+
+    def use_catalog(self, rows, resets=(), **overrides):
+        """Points the catalog settings (plus ``overrides``) at ``rows``; ``resets`` run before and after the test."""
+        self.data_dir = self.make_temp_dir()
+        self.csv_path = f'{self.data_dir}/courses.csv'
+        self.write_catalog(rows)
+        self.override(COURSE_CATALOG_PATH=self.csv_path, COURSE_INDEX_DIR=f'{self.data_dir}/index', **overrides)
+        for reset in (reset_course_index, *resets):
+            reset()
+            self.addCleanup(reset)
+
+    def write_catalog(self, rows, mode='w'):
+        with open(self.csv_path, mode, encoding='utf-8', newline='') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            if mode == 'w':
+                writer.writerow(['Title', 'Short Intro', 'URL', 'Created by'])
+            writer.writerows(rows)
+
+
+class MediaRoot(TempDirs):
+    def use_media_root(self, **overrides):
+        self.override(MEDIA_ROOT=self.make_temp_dir(), **overrides)
+
+
+@override_settings(LOOKUP_CACHE={**settings.LOOKUP_CACHE, 'ENABLED': False})
+class DashboardFanOutTests(UpstreamStubs, TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_sources_run_concurrently(self):
+        self.start_stubs(adzuna_delay=0.4, github_delay=0.4)
+        started = time.monotonic()
+        results, unavailable = gather_sources({
+            'jobs': lambda: utils.fetch_real_time_jobs('python'),
+            'open_source': lambda: utils.fetch_open_source_projects('python'),
+        }, deadline=5)
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(unavailable, set())
+        self.assertEqual(results['jobs'][0]['title'], 'Backend Engineer')
+        self.assertEqual(results['open_source'][0]['name'], 'django')
+        self.assertLess(elapsed, 0.75)  # max() of the two, not the sum
+
+    def test_slow_source_is_marked_unavailable(self):
+        self.start_stubs(github_delay=1.5)
+        started = time.monotonic()
+        results, unavailable = gather_sources({
+            'jobs': lambda: utils.fetch_real_time_jobs('python'),
+            'open_source': lambda: utils.fetch_open_source_projects('python'),
+        }, timeouts={'open_source': 0.3}, deadline=5)
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(unavailable, {'open_source'})
+        self.assertIn('jobs', results)
+
+    def test_total_deadline_caps_every_source(self):
+        results, unavailable = gather_sources({
+            'fast': lambda: 'done',
+            'slow': lambda: time.sleep(1) or 'late',
+        }, timeouts={'slow': 10}, deadline=0.2)
+        self.assertEqual(results, {'fast': 'done'})
+        self.assertEqual(unavailable, {'slow'})
+
+    @override_settings(DASHBOARD_FANOUT_WORKERS=2)
+    def test_hung_source_does_not_starve_the_others(self):
+        reset_executors()
+        self.addCleanup(reset_executors)
+        release = threading.Event()
+        # Let the hung calls finish before the next test
+        self.addCleanup(aggregation._executor('hung').shutdown)
+        self.addCleanup(release.set)
+
+        # Hangs on every request, for longer than the pool has threads
+        for _ in range(4):
+            started = time.monotonic()
+            results, unavailable = gather_sources({'hung': lambda: release.wait(10), 'ok': lambda: 1}, deadline=0.2)
+            self.assertLess(time.monotonic() - started, 0.5)
+            self.assertEqual(results, {'ok': 1})
+            self.assertEqual(unavailable, {'hung'})
+
+    def test_failing_source_is_marked_unavailable(self):
+        def boom():
+            raise RuntimeError("upstream exploded")
+
+        results, unavailable = gather_sources({'ok': lambda: 1, 'broken': boom}, deadline=1)
+        self.assertEqual(results, {'ok': 1})
+        self.assertEqual(unavailable, {'broken'})
+
+    def test_pool_threads_close_their_database_connections(self):
+        calls = []
+        source = lambda: calls.append('source') or threading.current_thread().name
+        with mock.patch('core.aggregation.close_old_connections',
+                        side_effect=lambda: calls.append(threading.current_thread().name)):
+            results, _ = gather_sources({'jobs': source}, deadline=5)
+        # Before and after the source, on the thread that ran it
+        self.assertEqual(calls, [results['jobs'], 'source', results['jobs']])
+        self.assertTrue(results['jobs'].startswith('dashboard-fanout'))
+
+    @override_settings(DASHBOARD_SOURCE_TIMEOUTS={'jobs': 2, 'open_source': 0.3, 'courses': 2},
+                       DASHBOARD_LAZY_SECTIONS=[])
+    def test_dashboard_renders_available_sections(self):
+        self.start_stubs(github_delay=1.5)
+        user = User.objects.create_user('alice', password='pw-123456')
+        UserProfile.objects.create(user=user, skills='django, python')
+        self.client.force_login(user)
+
+        with mock.patch('core.views.get_courses', return_value=[]):
+            response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['unavailable'], {'open_source'})
+        self.assertEqual(response.context['jobs'][0]['company_name'], 'Acme')
+        self.assertEqual(response.context['open_source_projects'], [])
+
+    def test_slow_sections_load_after_the_page(self):
+        self.start_stubs(github_delay=1.0)
+        user = User.objects.create_user('alice', password='pw-123456')
+        UserProfile.objects.create(user=user, skills='django, python')
+        self.client.force_login(user)
+
+        started = time.monotonic()
+        with mock.patch('core.views.get_courses', return_value=[]):
+            response = self.client.get(reverse('dashboard'))
+        self.assertLess(time.monotonic() - started, 0.8)  # didn't wait for GitHub
+        self.assertEqual(response.context['lazy_sections'], ['jobs', 'open_source'])
+        self.assertNotIn('open_source_projects', response.context)
+        self.assertContains(response, reverse('dashboard_section', args=['open_source']))
+
+        section = self.client.get(reverse('dashboard_section', args=['open_source'])).json()
+        self.assertEqual(section['section'], 'open_source')
+        self.assertTrue(section['available'])
+        self.assertIn('View on GitHub', section['html'])
+        self.assertEqual(self.client.get(reverse('dashboard_section', args=['nope'])).status_code, 404)
+
+
+@override_settings(LOOKUP_CACHE={**settings.LOOKUP_CACHE, 'ENABLED': False}, DASHBOARD_LAZY_SECTIONS=[])
+class AsyncDashboardTests(UpstreamStubs, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', password='pw-123456')
+        UserProfile.objects.create(user=self.user, skills='django, python')
+        patcher = mock.patch('core.async_views.get_courses', return_value=[])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, path):
+        request = AsyncRequestFactory().get(path)
+        request.user = self.user
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        return request
+
+    async def test_upstreams_are_awaited_concurrently(self):
+        self.start_stubs(adzuna_delay=0.6, github_delay=0.6)
+        started = time.monotonic()
+        response = await async_views.dashboard(self.request(reverse('dashboard')))
+        self.assertLess(time.monotonic() - started, 1.1)  # max() of the two, not the sum
+        self.assertContains(response, 'Acme')
+        self.assertContains(response, 'View on GitHub')
+
+    async def test_slow_source_is_marked_unavailable(self):
+        self.start_stubs(github_delay=1.5)
+        started = time.monotonic()
+        results, unavailable = await agather_sources({
+            'jobs': lambda: utils.afetch_real_time_jobs('python'),
+            'open_source': lambda: utils.afetch_open_source_projects('python'),
+        }, timeouts={'open_source': 0.3}, deadline=5)
+
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertEqual(unavailable, {'open_source'})
+        self.assertEqual(results['jobs'][0]['title'], 'Backend Engineer')
+
+    async def test_sections(self):
+        self.start_stubs()
+        url = reverse('dashboard_section', args=['open_source'])
+        section = json.loads((await async_views.dashboard_section(self.request(url), 'open_source')).content)
+        self.assertTrue(section['available'])
+        self.assertIn('View on GitHub', section['html'])
+
+
+@override_settings(LOOKUP_CACHE={**settings.LOOKUP_CACHE, 'ENABLED': False}, DASHBOARD_LAZY_SECTIONS=[])
+class InstrumentationTests(UpstreamStubs, TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user('alice', password='pw-123456')
+        UserProfile.objects.create(user=user, skills='django, python')
+        self.client.force_login(user)
+
+    def test_server_timing_and_metrics(self):
+        self.start_stubs()
+        with override_settings(INSTRUMENTATION={**settings.INSTRUMENTATION, 'SERVER_TIMING': True}), \
+                mock.patch('core.views.get_courses', return_value=[]):
+            response = self.client.get(reverse('dashboard'))
+        timing = response['Server-Timing']
+        for name in ('upstream.adzuna', 'upstream.github', 'template', 'total'):
+            self.assertIn(f'{name};dur=', timing)
+
+        scrape = self.client.get(reverse('metrics'))
+        self.assertEqual(scrape['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        body = scrape.content.decode()
+        self.assertIn('# TYPE span_duration_seconds histogram', body)
+        self.assertIn('span_duration_seconds_bucket{span="upstream.github",le="+Inf"}', body)
+        self.assertIn('http_request_duration_seconds_count{view="dashboard",method="GET",status="200"}', body)
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.1.2.3').status_code, 403)
+
+    def test_slow_requests_are_profiled(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        conf = {**settings.INSTRUMENTATION, 'SERVER_TIMING': False, 'PROFILE_SAMPLE_RATE': 1.0,
+                'SLOW_REQUEST_THRESHOLD': 0, 'PROFILE_DIR': directory}
+        with override_settings(INSTRUMENTATION=conf):
+            response = self.client.get(reverse('home'))
+        self.assertNotIn('Server-Timing', response)
+        [name] = os.listdir(directory)
+        self.assertTrue(name.endswith('.prof') and '-GET-home-' in name)
+        self.assertTrue(pstats.Stats(os.path.join(directory, name)).total_calls)
+
+
+@override_settings(DASHBOARD_LAZY_SECTIONS=[])
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', password='pw')
+        self.profile = UserProfile.objects.create(user=self.user, skills='django, python')
+        self.client.force_login(self.user)
+        self.jobs = [{'title': 'First job'}]
+        for target, kwargs in (
+            ('core.views.fetch_real_time_jobs', {'side_effect': lambda skills: self.jobs}),
+            ('core.views.fetch_open_source_projects', {'return_value': []}),
+            ('core.views.get_courses', {'return_value': []}),
+        ):
+            patcher = mock.patch(target, **kwargs)
+            setattr(self, target.rsplit('.', 1)[1], patcher.start())
+            self.addCleanup(patcher.stop)
+
+    def render(self):
+        return self.client.get(reverse('dashboard'))
+
+    def test_payload_is_reused_until_something_changes(self):
+        self.render()
+        self.jobs = [{'title': 'Second job'}]
+        self.assertEqual(self.render().context['jobs'][0]['title'], 'First job')
+        self.assertEqual(self.fetch_real_time_jobs.call_count, 1)
+
+        Project.objects.create(title='web', description='', required_skills='Django')
+        self.assertEqual(self.render().context['jobs'][0]['title'], 'Second job')
+
+        self.jobs = [{'title': 'Third job'}]
+        self.profile.interests = 'backend'
+        self.profile.save()
+        self.assertEqual(self.render().context['jobs'][0]['title'], 'Third job')
+        self.assertEqual(self.fetch_real_time_jobs.call_count, 3)
+
+    def test_partial_payload_is_not_cached(self):
+        self.fetch_real_time_jobs.side_effect = RuntimeError("upstream down")
+        self.assertEqual(self.render().context['unavailable'], {'jobs'})
+        self.fetch_real_time_jobs.side_effect = lambda skills: self.jobs
+        self.assertEqual(self.render().context['unavailable'], set())
+        self.assertEqual(self.fetch_real_time_jobs.call_count, 2)
+
+    def test_section_fragments(self):
+        conf = {**settings.DASHBOARD_CACHE, 'ENABLED': False, 'FRAGMENT_TIMEOUT': 60}
+        with override_settings(DASHBOARD_CACHE=conf):
+            self.assertContains(self.render(), 'First job')
+            self.jobs = [{'title': 'Second job'}]
+            self.assertContains(self.render(), 'First job')  # same version, cached section
+            self.profile.skills = 'docker'
+            self.profile.save()
+            self.assertContains(self.render(), 'Second job')
+
+    def test_sections_are_cached_separately(self):
+        with override_settings(DASHBOARD_LAZY_SECTIONS=['jobs']):
+            self.assertNotIn('jobs', self.render().context)
+            url = reverse('dashboard_section', args=['jobs'])
+            self.assertIn('First job', self.client.get(url).json()['html'])
+            self.jobs = [{'title': 'Second job'}]
+            self.assertIn('First job', self.client.get(url).json()['html'])
+            self.profile.save()
+            self.assertIn('Second job', self.client.get(url).json()['html'])
+
+
+class LookupCacheTests(TestCase):
+    def test_canonical_skills(self):
+        self.assertEqual(canonical_skills("Python, django , python,,DJANGO"), ('django', 'python'))
+        self.assertEqual(canonical_skills(['SQL', 'aws']), canonical_skills('aws, sql'))
+        self.assertEqual(canonical_skills(None), ())
+
+    def test_lru_eviction_and_counters(self):
+        cache = LookupCache('test', LocalBackend(max_entries=2), ttl=60)
+        for key in ('a', 'b', 'a', 'c'):  # 'b' is least recently used when 'c' arrives
+            cache.get_or_compute(key, lambda key=key: [key])
+
+        self.assertEqual(cache.get_or_compute('a', lambda: ['recomputed']), ['a'])
+        self.assertEqual(cache.get_or_compute('b', lambda: ['recomputed']), ['recomputed'])
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (2, 4))
+        self.assertEqual(stats['evictions'], 2)
+
+    def test_stale_entries_are_served_while_refreshing(self):
+        cache = LookupCache('test', LocalBackend(max_entries=8), ttl=0.05, stale_ttl=60)
+        cache.get_or_compute('k', lambda: ['old'])
+        time.sleep(0.1)
+
+        refreshed = threading.Event()
+
+        def refresh():
+            refreshed.set()
+            return ['new']
+
+        self.assertEqual(cache.get_or_compute('k', refresh), ['old'])
+        self.assertTrue(refreshed.wait(2))
+        for _ in range(50):
+            if cache.stats()['refreshes']:
+                break
+            time.sleep(0.01)
+        self.assertEqual(cache.get_or_compute('k', lambda: ['miss']), ['new'])
+
+    def test_empty_results_are_not_cached(self):
+        cache = LookupCache('test', LocalBackend(max_entries=8), ttl=60)
+        cache.get_or_compute('k', lambda: [])
+        self.assertEqual(cache.get_or_compute('k', lambda: ['ok']), ['ok'])
+
+    def test_django_cache_backend(self):
+        cache = LookupCache('test', DjangoCacheBackend('test'), ttl=60)
+        cache.get_or_compute(('python',), lambda: ['shared'])
+        other_worker = LookupCache('test', DjangoCacheBackend('test'), ttl=60)
+        self.assertEqual(other_worker.get_or_compute(('python',), lambda: ['miss']), ['shared'])
+
+    async def test_async_lookups_share_entries(self):
+        cache = LookupCache('test', DjangoCacheBackend('test'), ttl=60)
+
+        async def compute():
+            return ['async']
+
+        self.assertEqual(await cache.aget_or_compute(('rust',), compute), ['async'])
+        self.assertEqual(cache.get_or_compute(('rust',), lambda: ['miss']), ['async'])
+        self.assertEqual(cache.stats()['hits'], 1)
+
+
+class UpstreamClientTests(TestCase):
+    def make_client(self, routes, **kwargs):
+        server = StubAPIServer(routes)
+        self.addCleanup(server.close)
+        kwargs.setdefault('backoff_factor', 0.01)
+        return server, UpstreamClient('stub', **kwargs)
+
+    def test_retries_transient_errors(self):
+        server, client = self.make_client({'/': [(0, 503, {}), (0, 502, {}), (0, 200, {'ok': True})]}, max_retries=2)
+        response = client.get(f'{server.url}/search')
+        self.assertEqual(response.json(), {'ok': True})
+        self.assertEqual(len(server.requests), 3)
+
+    def test_honours_retry_after(self):
+        server, client = self.make_client({'/': [(0, 429, {}, {'Retry-After': '1'}), (0, 200, {})]})
+        started = time.monotonic()
+        self.assertEqual(client.get(f'{server.url}/').status_code, 200)
+        self.assertGreaterEqual(time.monotonic() - started, 1.0)
+
+    def test_long_github_rate_limit_opens_circuit(self):
+        reset = str(int(time.time()) + 600)
+        server, client = self.make_client(
+            {'/': (0, 403, {}, {'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': reset})})
+        self.assertEqual(client.get(f'{server.url}/').status_code, 403)
+        with self.assertRaises(CircuitOpenError):
+            client.get(f'{server.url}/')
+        self.assertEqual(len(server.requests), 1)
+
+    def test_read_timeout(self):
+        server, client = self.make_client({'/': (1, 200, {})}, read_timeout=0.2, max_retries=0)
+        with self.assertRaises(requests.Timeout):
+            client.get(f'{server.url}/')
+
+    def test_circuit_breaker_short_circuits_and_recovers(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+        server, client = self.make_client(
+            {'/': [(0, 500, {}), (0, 500, {}), (0, 200, {})]}, max_retries=0, breaker=breaker)
+        for _ in range(2):
+            self.assertEqual(client.get(f'{server.url}/').status_code, 500)
+        with self.assertRaises(CircuitOpenError):
+            client.get(f'{server.url}/')
+
+        time.sleep(0.25)  # half-open: one trial request goes through
+        self.assertEqual(client.get(f'{server.url}/').status_code, 200)
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_breaker_counts_requests_not_attempts(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        server, client = self.make_client({'/': (0, 503, {})}, max_retries=2, breaker=breaker)
+        self.assertEqual(client.get(f'{server.url}/').status_code, 503)
+        self.assertEqual((len(server.requests), breaker.failures, breaker.state), (3, 1, 'closed'))
+        self.assertEqual(client.get(f'{server.url}/').status_code, 503)
+        self.assertEqual(breaker.state, 'open')
+
+    def test_rate_limited_half_open_trial_settles_the_breaker(self):
+        for max_retries, trial_status in ((0, 429), (1, 200)):
+            breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+            server, client = self.make_client(
+                {'/': [(0, 500, {}), (0, 429, {}, {'Retry-After': '0'}), (0, 200, {})]}, max_retries=0, breaker=breaker)
+            self.assertEqual(client.get(f'{server.url}/').status_code, 500)
+            time.sleep(0.15)
+            # The trial is rate limited on its last attempt, or retried straight away
+            client.max_retries = max_retries
+            self.assertEqual(client.get(f'{server.url}/').status_code, trial_status)
+            self.assertFalse(breaker._trial_in_flight)
+            time.sleep(0.15)
+            self.assertEqual(client.get(f'{server.url}/').status_code, 200)
+            self.assertEqual(breaker.state, 'closed')
+
+    async def test_async_client(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        server = StubAPIServer({'/': [(0, 503, {}), (0, 200, {'ok': True}), (0, 500, {})]})
+        self.addCleanup(server.close)
+        client = AsyncUpstreamClient('stub', max_retries=1, backoff_factor=0.01, breaker=breaker)
+        response = await client.get(f'{server.url}/')
+        self.assertEqual(response.json(), {'ok': True})
+
+        # The sync client sharing the breaker opens the circuit for both
+        sync_client = UpstreamClient('stub', max_retries=0, breaker=breaker)
+        for _ in range(2):
+            self.assertEqual(sync_client.get(f'{server.url}/').status_code, 500)
+        with self.assertRaises(CircuitOpenError):
+            await client.get(f'{server.url}/')
+        self.assertEqual(len(server.requests), 4)
+        await client.aclose()
+
+
+class LazyModelLoadingTests(TestCase):
+    def setUp(self):
+        for name in ('_nlp', '_skill_matcher'):
+            patcher = mock.patch.object(nlp, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_model_loads_once_on_first_use(self):
+        with mock.patch('core.nlp.load_nlp', side_effect=lambda: spacy.blank('en')) as load:
+            self.assertIsNone(nlp._nlp)
+            threads = [threading.Thread(target=nlp.get_skill_matcher) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            load.assert_called_once()
+            self.assertIs(nlp.get_skill_matcher().nlp, nlp.get_nlp())
+        self.assertEqual(nlp.get_skill_matcher().extract("python on k8s"), ['python', 'kubernetes'])
+
+    def test_loads_only_the_tokenizer_or_a_blank_pipeline(self):
+        with mock.patch('spacy.load', side_effect=OSError("not installed")) as load:
+            pipeline = nlp.load_nlp()
+        load.assert_called_once_with(settings.SPACY_MODEL, exclude=settings.SPACY_EXCLUDE)
+        self.assertEqual(pipeline.pipe_names, [])
+
+    def test_preload(self):
+        with mock.patch('core.nlp.load_nlp', side_effect=lambda: spacy.blank('en')), \
+                mock.patch('core.course_index.get_course_index') as course_index, \
+                mock.patch('gc.freeze') as freeze:
+            with override_settings(NLP_SERVICE={**settings.NLP_SERVICE, 'SOCKET': '/tmp/nlp.sock'}):
+                nlp.preload()  # the NLP service holds the models
+            self.assertIsNone(nlp._skill_matcher)
+            course_index.assert_not_called()
+
+            nlp.preload()
+            self.assertIsNotNone(nlp._skill_matcher)
+            course_index.assert_called_once()
+            freeze.assert_called_once()
+
+    def test_gunicorn_config_only_binds_gunicorn_settings(self):
+        names = runpy.run_path(str(settings.BASE_DIR / 'gunicorn.conf.py'))
+        self.assertEqual({name for name in names if not name.startswith('__')}, {'decouple', 'preload_app'})
+
+
+class SkillMatcherTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.matcher = SkillMatcher(spacy.blank("en"))
+
+    def test_multi_word_skills_and_aliases(self):
+        text = "Built Machine Learning models with sklearn, deployed on k8s behind a REST API."
+        self.assertEqual(self.matcher.extract(text), ['machine learning', 'scikit-learn', 'kubernetes', 'rest api'])
+
+    def test_longest_match_wins_and_positions(self):
+        text = "Big data and data analysis"
+        matches = self.matcher.find(text)
+        self.assertEqual([m.skill for m in matches], ['big data', 'data analysis'])
+        self.assertEqual(text[matches[1].start_char:matches[1].end_char], 'data analysis')
+
+    def test_counts(self):
+        self.assertEqual(self.matcher.counts("python, Python and django")['python'], 2)
+
+
+class ProjectMatchIndexTests(TestCase):
+    def setUp(self):
+        reset_project_index()
+        self.addCleanup(reset_project_index)
+
+    def make_project(self, title, required_skills):
+        return Project.objects.create(title=title, description='', required_skills=required_skills)
+
+    def test_ranks_projects_by_skill_overlap(self):
+        web = self.make_project('web', 'Python, Django, PostgreSQL')
+        ml = self.make_project('ml', 'python, machine learning, pandas')
+        self.make_project('frontend', 'React, CSS')
+
+        matches = top_projects('python, django', k=5)
+        self.assertEqual([p.title for p in matches], ['web', 'ml'])
+        self.assertGreater(matches[0].match_score, matches[1].match_score)
+        self.assertEqual(top_projects('python, django', k=1), [web])
+        self.assertEqual(top_projects('ml, pandas')[0], ml)  # aliases resolve to canonical skills
+
+    def test_follows_saves_and_deletes(self):
+        project = self.make_project('infra', 'docker')
+        self.assertEqual(top_projects('kubernetes'), [])
+
+        project.required_skills = 'docker, k8s'
+        project.save()
+        self.assertEqual(ProjectMatchVector.objects.get(project=project).skills, 'docker,kubernetes')
+        self.assertEqual(top_projects('kubernetes'), [project])
+
+        project.delete()
+        self.assertEqual(top_projects('kubernetes'), [])
+
+    def test_ranks_skills_outside_the_built_in_vocabulary(self):
+        systems = self.make_project('systems', 'Rust, Go, TypeScript, React')
+        self.assertEqual(ProjectMatchVector.objects.get(project=systems).skills, 'go,react,rust,typescript')
+        self.assertEqual(top_projects('rust'), [systems])
+        self.assertEqual(top_projects('Experience with Go'), [])  # only whole entries, or known skills inside them
+        self.assertEqual(top_projects('go, TypeScript'), [systems])
+
+    def test_projects_saved_without_signals_wait_for_index_projects(self):
+        Project.objects.bulk_create([Project(title=f'p{i}', description='', required_skills='aws') for i in range(3)])
+        self.assertEqual(top_projects('aws'), [])
+        self.assertEqual(ProjectMatchVector.objects.count(), 0)
+        call_command('index_projects', stdout=io.StringIO())
+        self.assertEqual(len(top_projects('aws')), 3)
+
+    def test_top_k_from_rows(self):
+        index = ProjectMatchIndex([10, 11, 12, 13], [['python'], ['python', 'sql'], [], ['sql']], user_vector_cache=8)
+        ranked = index.top_k('python', k=2)
+        self.assertEqual([pk for pk, _ in ranked], [10, 11])
+        self.assertAlmostEqual(ranked[0][1], 1.0, places=5)
+        self.assertEqual(index.top_k('java'), [])
+
+
+class SkillTableTests(TestCase):
+    def make_profile(self, username, skills):
+        return UserProfile.objects.create(user=User.objects.create_user(username, password='pw'), skills=skills)
+
+    def test_vocabulary_and_aliases_are_seeded(self):
+        self.assertTrue(Skill.objects.filter(name='kubernetes', aliases__alias='k8s').exists())
+        self.assertEqual(Skill.objects.normalize([' K8s', 'kubernetes', 'Rust']), ['kubernetes', 'rust'])
+
+    def test_profile_skills_follow_the_text(self):
+        profile = self.make_profile('ann', 'docker, python')
+        self.assertEqual(sorted(profile.skill_tags.values_list('name', flat=True)), ['docker', 'python'])
+
+        add_profile_skills(profile, ['spark'], source=UserSkill.RESUME)
+        profile.skills = 'python, spark'
+        profile.save()
+        self.assertEqual(
+            sorted(UserSkill.objects.filter(profile=profile).values_list('skill__name', 'source')),
+            [('python', 'manual'), ('spark', 'resume')],
+        )
+
+    def test_free_text_does_not_create_skills(self):
+        skills = Skill.objects.count()
+        profile = self.make_profile('ann', 'pyhton, python, Rust')
+        Project.objects.create(title='etl', description='', required_skills='sql, airflow')
+        self.assertEqual(list(profile.skill_tags.values_list('name', flat=True)), ['python'])
+        self.assertEqual(Skill.objects.count(), skills)
+
+        Skill.objects.resolve(['rust'], create=True)  # as the admin would
+        profile.save()
+        self.assertEqual(list(profile.skill_tags.values_list('name', flat=True)), ['python', 'rust'])
+
+    def test_overlap_queries(self):
+        ann = self.make_profile('ann', 'docker, python, spark')
+        bob = self.make_profile('bob', 'python')
+        self.make_profile('cy', 'react')
+
+        self.assertEqual(list(UserProfile.objects.with_skill('Python')), [ann, bob])
+        ranked = list(UserProfile.objects.with_any_skills(['python', 'apache spark']))
+        self.assertEqual([(p, p.skill_overlap) for p in ranked], [(ann, 2), (bob, 1)])
+        self.assertEqual(list(UserProfile.objects.with_all_skills(['docker', 'python'])), [ann])
+
+        project = Project.objects.create(title='etl', description='', required_skills='PySpark and SQL')
+        self.assertEqual(list(Project.objects.with_skill('spark')), [project])
+        self.assertEqual(list(Project.objects.with_all_skills(['sql', 'spark'])), [project])
+
+
+class CandidateSearchTests(TestCase):
+    def setUp(self):
+        reset_candidate_index()
+        self.addCleanup(reset_candidate_index)
+
+    def make_profile(self, username, skills, interests=''):
+        return UserProfile.objects.create(
+            user=User.objects.create_user(username, password='pw'), skills=skills, interests=interests)
+
+    def test_parse_query(self):
+        self.assertEqual(parse_query('python (docker OR k8s) not java'), ('and', [
+            ('term', 'python'), ('or', [('term', 'docker'), ('term', 'k8s')]), ('not', ('term', 'java'))]))
+        self.assertEqual(parse_query('"Machine Learning"'), ('term', 'machine learning'))
+        for bad in ('', 'python AND', '(python', 'python)', 'OR java'):
+            with self.assertRaises(QueryError):
+                parse_query(bad)
+
+    def test_boolean_queries_and_ranking(self):
+        index = CandidateIndex.build([
+            (1, 'python, docker', 'open source'),
+            (2, 'python, java', ''),
+            (3, 'docker, kubernetes', 'python'),
+            (4, 'react', ''),
+        ], aliases={'k8s': 'kubernetes'}, compact_after=100)
+        self.assertEqual([pk for pk, _ in index.search('python docker')], [3, 1])
+        self.assertEqual([pk for pk, _ in index.search('python NOT java')], [3, 1])
+        self.assertEqual({pk for pk, _ in index.search('react OR k8s')}, {3, 4})
+        self.assertEqual(index.search('golang'), [])
+
+        first = index.search('python', limit=2)
+        rest = index.search('python', limit=2, after=(first[-1][1], first[-1][0]))
+        self.assertEqual(len({pk for pk, _ in first + rest}), 3)
+
+    def test_incremental_updates_and_compaction(self):
+        index = CandidateIndex.build([(1, 'python', ''), (2, 'java', '')], compact_after=3)
+        index.add(3, 'python, spark', '')
+        index.add(2, 'spark', '')
+        self.assertEqual({pk for pk, _ in index.search('spark')}, {2, 3})
+        self.assertEqual(index.search('java'), [])
+        index.remove(1)
+        self.assertFalse(index.pending)  # compacted
+        self.assertEqual([pk for pk, _ in index.search('python')], [3])
+        self.assertEqual(len(index), 2)
+
+    def test_search_endpoint(self):
+        for i in range(3):
+            self.make_profile(f'dev{i}', 'python, docker', 'backend')
+        self.make_profile('designer', 'css')
+        recruiter = User.objects.create_user('recruiter', password='pw', is_staff=True)
+        url = reverse('candidate_search')
+
+        self.client.force_login(User.objects.get(username='designer'))
+        self.assertEqual(self.client.get(url, {'q': 'python'}).status_code, 403)
+
+        self.client.force_login(recruiter)
+        self.assertEqual(self.client.get(url, {'q': 'python AND'}).status_code, 400)
+        page = self.client.get(url, {'q': 'python docker', 'page_size': 2}).json()
+        self.assertEqual([r['username'] for r in page['results']], ['dev0', 'dev1'])
+        self.assertEqual(page['results'][0]['skills'], ['python', 'docker'])
+        page = self.client.get(page['next']).json()
+        self.assertEqual([r['username'] for r in page['results']], ['dev2'])
+        self.assertIsNone(page['next'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_profile('newdev', 'docker')
+        results = self.client.get(url, {'q': 'docker NOT python'}).json()['results']
+        self.assertEqual([r['username'] for r in results], ['newdev'])
+
+
+class CourseIndexTests(CourseCatalog, TestCase):
+    def setUp(self):
+        self.use_catalog([
+            ('Django for Beginners', 'Build web apps with python and django', 'https://example.com/django', 'Ann'),
+            ('Docker Deep Dive', 'Containers with docker', 'https://example.com/docker', 'Bob'),
+        ], COURSE_INDEX_CHECK_INTERVAL=0)
+
+    def touch_catalog(self, seconds=10):
+        mtime = os.stat(self.csv_path).st_mtime + seconds
+        os.utime(self.csv_path, (mtime, mtime))
+
+    def test_build_is_persisted_and_memory_mapped(self):
+        index = get_course_index()
+        self.assertTrue(os.path.isfile(os.path.join(index.path, 'manifest.json')))
+        self.assertIsInstance(index.data.base, np.memmap)
+        self.assertFalse(index.data.flags.writeable)
+
+        # Another process (or a restart) maps the same build instead of fitting again
+        reset_course_index()
+        with mock.patch('core.course_index.build_index') as build:
+            loaded = get_course_index()
+        build.assert_not_called()
+        self.assertEqual(loaded.path, index.path)
+        self.assertEqual(loaded.top_courses('docker'), index.top_courses('docker'))
+
+    def test_catalog_changes_are_detected_by_content(self):
+        catalog = dict(get_course_index().manifest['catalog'])
+        self.assertFalse(catalog_changed(catalog))
+
+        # Touched but identical: hashed once, then recognised by the new mtime
+        self.touch_catalog()
+        self.assertFalse(catalog_changed(catalog))
+        self.assertEqual(catalog['mtime'], os.stat(self.csv_path).st_mtime)
+        with mock.patch('core.course_index.catalog_fingerprint') as fingerprint:
+            self.assertFalse(catalog_changed(catalog))
+        fingerprint.assert_not_called()
+
+        self.write_catalog([('Watercolour', 'Painting basics', 'https://example.com/paint', 'Cy')], mode='a')
+        self.assertTrue(catalog_changed(catalog))
+
+    def test_rebuild_swaps_in_without_blocking_queries(self):
+        old = get_course_index()
+        self.write_catalog([('Docker Compose', 'Multi-container docker apps', 'https://example.com/compose', 'Di')],
+                           mode='a')
+        self.touch_catalog()
+
+        started, release = threading.Event(), threading.Event()
+        self.addCleanup(release.set)
+        build_index = course_index.build_index
+
+        def slow_build():
+            started.set()
+            release.wait(5)
+            return build_index()
+
+        with mock.patch('core.course_index.build_index', side_effect=slow_build):
+            self.assertIs(get_course_index(), old)
+            self.assertTrue(started.wait(5))
+            # While the rebuild runs, queries are answered from the old build
+            self.assertIs(get_course_index(), old)
+            self.assertEqual([c.name for c in get_course_index().top_courses('docker')], ['Docker Deep Dive'])
+            release.set()
+            course_index._rebuild_thread.join(5)
+
+        new = get_course_index()
+        self.assertIsNot(new, old)
+        self.assertEqual({c.name for c in new.top_courses('docker')}, {'Docker Deep Dive', 'Docker Compose'})
+        self.assertEqual(len(old), 2)  # still readable by requests that held it
+
+
+class BatchRecommendationTests(CourseCatalog, TestCase):
+    def setUp(self):
+        self.use_catalog([
+            ('Django for Beginners', 'Build web apps with python and django', 'https://example.com/django', 'Ann'),
+            ('Docker Deep Dive', 'Containers with docker', 'https://example.com/docker', 'Bob'),
+            ('Watercolour', 'Painting basics', 'https://example.com/paint', 'Cy'),
+            ('Crème brûlée', 'Pâtisserie for everyone', 'https://example.com/creme', ''),
+        ], resets=[reset_project_index])
+        cache.clear()
+
+    def test_top_k_rows(self):
+        top, scores = top_k_rows(np.array([[0.1, 0.9, 0.0, 0.5], [0.0, 0.0, 0.2, 0.0]], dtype=np.float32), 3)
+        self.assertEqual(top.tolist(), [[1, 3, 0], [2, -1, -1]])
+        self.assertAlmostEqual(float(scores[0, 0]), 0.9, places=5)
+
+    def test_course_search_matches_vectorizer_scores(self):
+        index = get_course_index()
+        texts = [f"{c.name} {c.description}".lower() for c in index.courses]
+        vectorizer = make_vectorizer().fit(texts)
+        expected = (vectorizer.transform(texts) @ vectorizer.transform(["python docker"]).T).toarray().ravel()
+        ranked = index.search("python docker", k=5)
+        self.assertEqual([row for row, _ in ranked], [1, 0])  # shorter text first; the zero-score course is left out
+        for row, score in ranked:
+            self.assertAlmostEqual(score, float(expected[row]), places=5)
+        self.assertEqual(index.top_courses("python docker", k=1), [index.courses[1]])
+        self.assertIsInstance(index.courses[0], Course)
+        self.assertEqual(index.search("python docker", k=5, min_score=ranked[1][1]), ranked[:1])
+        self.assertEqual(index.search("knitting"), [])
+
+    def test_catalog_string_tables(self):
+        index = get_course_index()
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.courses[-1], Course('Crème brûlée', '', 'Pâtisserie for everyone', 'https://example.com/creme'))
+        self.assertEqual([course.name for course in index.courses][:2], ['Django for Beginners', 'Docker Deep Dive'])
+        self.assertEqual(index.top_courses("brûlée"), [index.courses[3]])
+        with self.assertRaises(IndexError):
+            index.courses[4]
+
+    def test_batch_writes_recommendations_the_dashboard_reads(self):
+        user = User.objects.create_user('alice', password='pw')
+        profile = UserProfile.objects.create(user=user, skills='django, python')
+        UserProfile.objects.create(user=User.objects.create_user('bob', password='pw'), skills='')
+        web = Project.objects.create(title='web', description='', required_skills='Django')
+        Project.objects.create(title='paint', description='', required_skills='watercolour')
+
+        stats = compute_recommendations(workers=0, chunk_size=1)
+        self.assertEqual(stats['users'], 1)
+
+        stored = stored_recommendations(profile)
+        self.assertEqual(stored[Recommendation.COURSE][0]['name'], 'Django for Beginners')
+        self.assertEqual(len(stored[Recommendation.COURSE]), 1)  # courses scoring 0 are left out
+        self.assertEqual(stored[Recommendation.PROJECT], [web])
+
+        self.client.force_login(user)
+        with mock.patch('core.views.get_courses') as get_courses, \
+                mock.patch('core.views.fetch_real_time_jobs', return_value=[]), \
+                mock.patch('core.views.fetch_open_source_projects', return_value=[]):
+            response = self.client.get(reverse('dashboard'))
+        get_courses.assert_not_called()
+        self.assertEqual(response.context['courses'][0]['name'], 'Django for Beginners')
+
+        # Changing the skills makes the stored rows stale
+        profile.skills = 'docker'
+        profile.save()
+        self.assertEqual(stored_recommendations(profile), {})
+
+
+class EmbeddingEngineTests(CourseCatalog, TestCase):
+    def setUp(self):
+        self.use_catalog([
+            ('Deep Learning Bootcamp', 'Deep learning with neural networks', 'https://example.com/dl', 'Ann'),
+            ('Neural Networks from Scratch', 'Neural networks and backpropagation', 'https://example.com/nn', 'Bob'),
+            ('Watercolour', 'Painting basics with a brush', 'https://example.com/paint', 'Cy'),
+            ('Pastry', 'Baking bread and cakes', 'https://example.com/pastry', 'Di'),
+        ], resets=[reset_project_index, reset_embeddings], MATCH_ENGINE='embedding',
+            PROJECT_INDEX={**settings.PROJECT_INDEX, 'CHECK_INTERVAL': 0})
+        self.override(EMBEDDINGS={**settings.EMBEDDINGS, 'MODEL': 'lsa', 'MODEL_DIR': f'{self.data_dir}/model'})
+        # Build the project index on the calling thread, which can see the test transaction
+        patcher = mock.patch.object(embeddings.ProjectVectors, 'start_rebuild', embeddings.ProjectVectors.rebuild)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_falls_back_to_tfidf_without_a_model(self):
+        web = Project.objects.create(title='web', description='', required_skills='python, django')
+        self.assertEqual([course.name for course in utils.get_courses("backpropagation")], ['Neural Networks from Scratch'])
+        self.assertEqual(utils.match_projects('django'), [web])
+        self.assertFalse(os.path.exists(settings.EMBEDDINGS['MODEL_DIR']))  # never fitted on the request path
+
+    def test_related_terms_match_without_shared_words(self):
+        call_command('build_embeddings', stdout=io.StringIO())
+        self.assertEqual(get_course_index().top_courses("backpropagation"), [get_course_index().courses[1]])
+        courses = utils.get_courses("backpropagation")
+        self.assertEqual([course.name for course in courses[:2]], ['Neural Networks from Scratch', 'Deep Learning Bootcamp'])
+
+        # Embedded as they are saved
+        ml = Project.objects.create(title='vision', description='deep learning', required_skills='python')
+        Project.objects.create(title='bakery site', description='cakes', required_skills='css')
+        self.assertEqual(ProjectMatchVector.objects.filter(embedding_model__startswith='lsa-').count(), 2)
+        self.assertEqual(utils.match_projects('backpropagation, neural networks')[0], ml)
+
+    def test_project_changes_apply_without_reembedding_everything(self):
+        call_command('build_embeddings', stdout=io.StringIO())
+        bakery = Project.objects.create(title='bakery site', description='cakes', required_skills='css')
+        self.assertEqual(utils.match_projects('pastry, cakes'), [bakery])
+        projects = embeddings.get_project_vectors(embeddings.get_embedder())
+        self.assertEqual(len(projects.ann_ids), 1)
+
+        with mock.patch.object(embeddings.LsaEmbedder, 'encode', wraps=embeddings.get_embedder().encode) as encode:
+            # Saved here: embedded once, then scanned from the pending vectors
+            web = Project.objects.create(title='shop', description='painting and brush sales', required_skills='django')
+            self.assertEqual(utils.match_projects('watercolour')[0], web)
+            self.assertIn(web.pk, projects.pending)
+            # Deleted by another process: dropped at the next check
+            with mock.patch('core.embeddings.unindex_project'):
+                bakery.delete()
+            self.assertEqual(utils.match_projects('pastry, cakes'), [web])
+            self.assertEqual(len(projects), 1)
+            # Rebuilt from the stored vectors
+            projects.rebuild()
+        self.assertEqual(encode.call_count, 2)  # the new project and the one uncached query
+        self.assertEqual((projects.ann_ids, projects.pending, projects.removed), ({web.pk}, {}, {}))
+        self.assertEqual(utils.match_projects('watercolour')[0], web)
+
+    def test_ivf_search(self):
+        rng = np.random.default_rng(0)
+        centers = rng.normal(size=(8, 16))
+        vectors = embeddings.normalize_rows(centers[rng.integers(0, 8, 400)] + 0.1 * rng.normal(size=(400, 16)))
+        ann = embeddings.IVFIndex.build(np.arange(1000, 1400), vectors, n_lists=8)
+        self.assertEqual(ann.offsets[-1], 400)
+        query = vectors[7]
+        exact = np.argsort(-(vectors @ query), kind='stable')[:5] + 1000
+        ranked = ann.search(query, k=5, n_probe=8, min_score=-1)
+        self.assertEqual({pk for pk, _ in ranked}, set(exact.tolist()))  # float16 storage may swap near-ties
+        self.assertAlmostEqual(ranked[0][1], 1.0, places=2)
+        # One list holds the query's cluster, so a single probe finds the same neighbours
+        self.assertEqual(ann.search(query, k=5, n_probe=1, min_score=-1)[0][0], 1007)
+
+        path = self.make_temp_dir()
+        ann.save(f'{path}/ann')
+        self.assertEqual(embeddings.IVFIndex.load(f'{path}/ann').search(query, k=5, n_probe=8, min_score=-1), ranked)
+        self.assertEqual(ann.search(np.zeros(16, dtype=np.float32)), [])
+
+
+class HashingEngineTests(CourseCatalog, TestCase):
+    def setUp(self):
+        self.use_catalog([
+            ('Django for Beginners', 'Build web apps with python and django', 'https://example.com/django', 'Ann'),
+            ('Docker Deep Dive', 'Containers with docker', 'https://example.com/docker', 'Bob'),
+            ('Watercolour', 'Painting basics', 'https://example.com/paint', 'Cy'),
+        ], resets=[reset_project_index, reset_hashing_index], MATCH_ENGINE='hashing',
+            PROJECT_INDEX={**settings.PROJECT_INDEX, 'CHECK_INTERVAL': 0})
+
+    def make_corpus(self, count, seed=0):
+        """Documents of distinct Zipf-distributed words, like course intros, and queries of one to three."""
+        rng = np.random.default_rng(seed)
+        words = [f"w{i}" for i in range(2000)]
+        frequencies = 1 / np.arange(1, len(words) + 1)
+        draw = lambda n: [words[i] for i in rng.choice(len(words), n, replace=False, p=frequencies / frequencies.sum())]
+        docs = [" ".join(draw(rng.integers(5, 30))) for _ in range(count)]
+        queries = [" ".join(draw(rng.integers(1, 4))) for _ in range(100)]
+        return docs, queries
+
+    def test_ranking_quality_close_to_refit(self):
+        docs, queries = self.make_corpus(2000)
+        vectorizer = make_vectorizer()
+        matrix = vectorizer.fit_transform(docs)
+        analyze = vectorizer.build_analyzer()
+        index = HashedTfidfIndex.build((i, analyze(doc), i, None) for i, doc in enumerate(docs))
+
+        # Share of the best possible refit TF-IDF score mass that the hashed top 10 gets
+        captured = []
+        for query in queries:
+            scores = (matrix @ vectorizer.transform([query]).T).toarray().ravel()
+            best = np.sort(scores)[::-1][:10].sum()
+            if best:
+                picked = [row for row, _ in index.search(analyze(query), k=10)]
+                captured.append(scores[picked].sum() / best)
+        self.assertGreater(np.mean(captured), 0.95)
+
+    def test_updates_match_a_fresh_build_and_beat_refitting(self):
+        docs, queries = self.make_corpus(2000, seed=1)
+        analyze = make_vectorizer().build_analyzer()
+        index = HashedTfidfIndex.build(((i, analyze(doc), i, None) for i, doc in enumerate(docs[:1000])),
+                                       compact_after=10 ** 6)
+        timings = []
+        for i, doc in enumerate(docs[1000:], start=1000):
+            started = time.perf_counter()
+            index.add(i, analyze(doc), i)
+            timings.append(time.perf_counter() - started)
+        for i in range(0, 2000, 7):
+            index.remove(i)
+        index.add(3, analyze("w1 w2 w3"), 3)  # a changed document replaces the old one
+        self.assertEqual(index.dead, len(range(0, 2000, 7)) + 1)
+
+        final = {i: doc for i, doc in enumerate(docs) if i % 7}
+        final[3] = "w1 w2 w3"
+        fresh = HashedTfidfIndex.build((i, analyze(doc), i, None) for i, doc in sorted(final.items()))
+        before = [index.search(analyze(query), k=10) for query in queries]
+        index.compact()
+        self.assertEqual(index.dead, 0)
+        for query, ranked in zip(queries, before):
+            expected = fresh.search(analyze(query), k=10)
+            # Pending documents are summed in another order, so near-ties may swap until compaction
+            np.testing.assert_allclose([s for _, s in ranked], [s for _, s in expected], rtol=1e-5)
+            self.assertEqual(index.search(analyze(query), k=10), expected)
+
+        # The fitted indexes would refit over the whole corpus for each of those
+        started = time.perf_counter()
+        make_vectorizer().fit_transform(final.values())
+        refit = time.perf_counter() - started
+        self.assertLess(np.median(timings) * 10, refit)
+
+    def test_engine_follows_catalog_and_projects(self):
+        self.assertEqual([c.name for c in utils.get_courses(['docker'])], ['Docker Deep Dive'])
+        self.write_catalog([('Docker Compose', 'Multi-container docker apps', 'https://example.com/compose', 'Di')], mode='a')
+        self.assertEqual(hashing_index.sync_courses(), (1, 0))
+        self.assertEqual(len(hashing_index.get_course_index()), 4)
+        self.assertEqual({c.name for c in utils.get_courses('docker')}, {'Docker Deep Dive', 'Docker Compose'})
+
+        web = Project.objects.create(title='web', description='', required_skills='Python, Django')
+        infra = Project.objects.create(title='infra', description='', required_skills='docker')
+        self.assertEqual(utils.match_projects('django'), [web])
+        hashing_index.get_project_index()
+        # Saved in this process: applied right away
+        web.required_skills = 'docker, k8s'
+        web.save()
+        self.assertEqual(utils.match_projects('kubernetes'), [web])
+        infra.delete()
+        self.assertEqual(utils.match_projects('docker'), [web])
+        # Deleted by another process: tombstoned at the next check
+        with mock.patch('core.hashing_index.unindex_project'):
+            web.delete()
+        self.assertEqual(len(hashing_index.get_project_index()), 0)
+
+
+class NlpServiceTests(CourseCatalog, TestCase):
+    def setUp(self):
+        self.use_catalog([
+            ('Django for Beginners', 'Build web apps with python and django', 'https://example.com/django', 'Ann'),
+            ('Docker Deep Dive', 'Containers with docker', 'https://example.com/docker', 'Bob'),
+        ], resets=[nlp_service.reset_client])
+        self.socket_path = f'{self.data_dir}/nlp.sock'
+        self.override(NLP_SERVICE={**settings.NLP_SERVICE, 'SOCKET': self.socket_path, 'RETRY_AFTER': 60})
+        cache.clear()
+
+    def start_service(self, **kwargs):
+        service = nlp_service.NlpService(self.socket_path, **kwargs).start()
+        thread = threading.Thread(target=service.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(service.shutdown)
+        return service
+
+    def test_workers_extract_and_rank_through_the_service(self):
+        service = self.start_service()
+        self.assertEqual(utils.extract_skills("Python services on k8s"), ['python', 'kubernetes'])
+        self.assertEqual(service.served, 1)
+        courses = utils.get_courses(['docker'])
+        self.assertEqual(courses, get_course_index().top_courses('docker', k=5))
+        self.assertIsInstance(courses[0], Course)
+        self.assertEqual(service.served, 2)
+        # One connection per thread is kept open between requests
+        self.assertEqual(utils.extract_skills("django"), ['django'])
+        self.assertEqual(service.served, 3)
+
+    def test_matcher_reports_the_service_vocabulary(self):
+        service = self.start_service()
+        service.matcher = SkillMatcher(spacy.blank('en'), skills=['python', 'rust'])
+        matcher = nlp_service.get_remote_matcher()
+        self.assertEqual(matcher.skills, ['python', 'rust'])
+        self.assertEqual(matcher.skills, ['python', 'rust'])
+        self.assertEqual(service.served, 1)  # asked for once
+
+        # Reading stops once the service's whole vocabulary has been found
+        pdf = make_pdf("Python and Rust", "Docker")
+        self.assertEqual(utils.extract_resume_skills(SimpleUploadedFile('cv.pdf', pdf)), ['python', 'rust'])
+        self.assertEqual(service.served, 2)
+
+    def test_concurrent_requests_are_batched(self):
+        service = self.start_service(batch_wait=0.2)
+        texts = [f"python and docker {i}" for i in range(8)]
+        results = [None] * len(texts)
+
+        def extract(i):
+            results[i] = nlp_service.get_remote_matcher().extract(texts[i])
+
+        threads = [threading.Thread(target=extract, args=(i,)) for i in range(len(texts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [['python', 'docker']] * len(texts))
+        self.assertEqual(service.served, len(texts))
+        self.assertLess(service.batches, len(texts))
+
+    def test_bad_requests_get_errors_and_leave_the_dispatcher_running(self):
+        service = self.start_service()
+        client = nlp_service.get_client()
+        for payload in ({'texts': None}, {'texts': 'python'}, {'texts': [1, 2]}):
+            self.assertIsNone(client.call('extract', **payload))
+        self.assertIsNone(client.call('courses', queries=['docker'], k='5'))
+        self.assertIsNone(client.call('rank', texts=['python']))
+        self.assertEqual(service.served, 0)  # refused before reaching the dispatcher
+
+        # A failure anywhere in a batch is answered as an error
+        with mock.patch.object(service, '_answer', side_effect=RuntimeError("boom")), \
+                mock.patch('core.nlp_service.logger'):
+            self.assertIsNone(client.top_courses(['docker']))
+        self.assertEqual(client.extract(["python"]), [['python']])
+
+    def test_unanswered_requests_time_out(self):
+        # Both sides read the same TIMEOUT; the service's error reply arrives first
+        self.override(NLP_SERVICE={**settings.NLP_SERVICE, 'TIMEOUT': 0.1})
+        service = self.start_service()
+        answered = threading.Event()
+        self.addCleanup(answered.set)
+        client = nlp_service.get_client()
+        with mock.patch.object(service, '_answer', side_effect=lambda message: answered.wait(5)):
+            with self.assertLogs('core.nlp_service', 'ERROR') as logs:
+                self.assertIsNone(client.top_courses(['docker']))
+        self.assertIn("No answer within 0.1s", logs.output[0])
+        # An overloaded service is not taken out of rotation
+        self.assertEqual(client.breaker.state, 'closed')
+
+    def test_falls_back_in_process_when_the_service_is_down(self):
+        self.assertEqual(utils.extract_skills("python"), ['python'])
+        self.assertEqual([c.name for c in utils.get_courses(['docker'])], ['Docker Deep Dive'])
+        client = nlp_service.get_client()
+        self.assertEqual(client.breaker.state, 'open')
+        # Not retried until RETRY_AFTER has passed
+        with mock.patch.object(client, '_connection') as connection:
+            self.assertEqual(utils.extract_skills("docker"), ['docker'])
+        connection.assert_not_called()
+
+
+def adzuna_job(job_id, title, description='', country='us'):
+    return {'id': str(job_id), 'title': title, 'description': description, 'company': {'display_name': 'Acme'},
+            'location': {'display_name': country.upper()}, 'created': '2026-10-01T09:00:00Z',
+            'redirect_url': f'https://example.com/job/{job_id}'}
+
+
+@override_settings(LOOKUP_CACHE={**settings.LOOKUP_CACHE, 'ENABLED': False})
+class JobIndexTests(TestCase):
+    def setUp(self):
+        self.listings = {
+            'python': [adzuna_job(1, 'Python Developer'), adzuna_job(2, 'Django Engineer', 'python and django'),
+                       adzuna_job(3, 'Data Engineer', 'python pipelines')],
+            'django': [adzuna_job(2, 'Django Engineer', 'python and django'), adzuna_job(4, 'Django Lead')],
+        }
+        self.adzuna = StubAPIServer({'/jobs/': self.search})
+        self.addCleanup(self.adzuna.close)
+        patcher = mock.patch.object(utils, 'ADZUNA_BASE_URL', f'{self.adzuna.url}/jobs')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def search(self, path):
+        """Stub of Adzuna's /jobs/{country}/search/{page}, paging the listings for ``what``."""
+        url = urlsplit(path)
+        page = int(url.path.rsplit('/', 1)[1])
+        query = parse_qs(url.query)
+        per_page = int(query['results_per_page'][0])
+        results = self.listings.get(query['what'][0], [])[(page - 1) * per_page:page * per_page]
+        return (0, 200, {'results': results})
+
+    def test_harvest_pages_dedupes_and_expires(self):
+        out = io.StringIO()
+        call_command('harvest_jobs', skills='python,django', pages=5, stdout=out)
+        with override_settings(JOB_INDEX={**settings.JOB_INDEX, 'RESULTS_PER_PAGE': 2}):
+            self.adzuna.requests.clear()
+            stats = harvest_jobs(skills=['python', 'django'], pages=5)
+
+        # python: a full page then a short one; django: a full page then an empty one
+        self.assertEqual([urlsplit(path).path for path in self.adzuna.requests],
+                         ['/jobs/us/search/1', '/jobs/us/search/2'] * 2)
+        self.assertEqual(JobPosting.objects.count(), 4)
+        self.assertEqual((stats['fetched'], stats['created'], stats['refreshed']), (5, 0, 4))
+        self.assertIn("4 new", out.getvalue())
+
+        # A changed listing is re-indexed; one no harvest returns any more expires
+        self.listings['python'] = [adzuna_job(3, 'Data Engineer', 'python and kafka pipelines')]
+        JobPosting.objects.filter(job_id='1').update(last_seen=JobPosting.objects.get(job_id='1').last_seen
+                                                     - timedelta(days=settings.JOB_INDEX['MAX_AGE_DAYS'] + 1))
+        stats = harvest_jobs(skills=['python'])
+        self.assertEqual((stats['updated'], stats['expired']), (1, 1))
+        self.assertEqual(sorted(JobPosting.objects.values_list('job_id', flat=True)), ['2', '3', '4'])
+        self.assertEqual([job['id'] for job in search_jobs('kafka')], ['3'])
+
+    def test_harvests_the_curated_vocabulary(self):
+        Skill.objects.create(name='pyhton')  # however the Skill table grows
+        self.assertEqual(harvest_skills(), SKILL_KEYWORDS)
+        with override_settings(JOB_INDEX={**settings.JOB_INDEX, 'SKILLS': ['python', 'rust']}):
+            self.assertEqual(harvest_skills(), ['python', 'rust'])
+
+    def test_search_ranks_local_postings_by_skills(self):
+        store_results([adzuna_job(1, 'Python Developer'), adzuna_job(2, 'Engineer', 'some python'),
+                       adzuna_job(3, 'Painter'), adzuna_job(4, 'Python and Django Developer')], 'us')
+        store_results([adzuna_job(5, 'Python Developer', country='gb')], 'gb')
+
+        self.assertEqual([job['id'] for job in search_jobs('python, django')], ['4', '1', '2'])
+        with override_settings(JOB_INDEX={**settings.JOB_INDEX, 'CANDIDATES': 2}):
+            self.assertEqual([job['id'] for job in search_jobs('python, django')], ['4', '2'])
+        self.assertEqual([job['id'] for job in search_jobs('python', location='gb')], ['5'])
+        self.assertEqual(search_jobs('c++ "quoted"'), [])
+        with mock.patch('core.job_index.fts_available', return_value=False):
+            self.assertEqual(sorted(job['id'] for job in search_jobs('python, django')), ['1', '2', '4'])
+
+        # Expired postings are never shown, even before expire_jobs deletes them
+        JobPosting.objects.filter(job_id='4').update(last_seen=JobPosting.objects.get(job_id='4').last_seen
+                                                     - timedelta(days=settings.JOB_INDEX['MAX_AGE_DAYS'] + 1))
+        self.assertEqual([job['id'] for job in search_jobs('python, django')], ['1', '2'])
+
+    @override_settings(JOB_SOURCE='index')
+    def test_dashboard_reads_the_index_without_calling_adzuna(self):
+        store_results(self.listings['python'], 'us')
+
+        jobs = views.format_jobs(utils.fetch_real_time_jobs('python'))
+        self.assertEqual(jobs[0], {'title': 'Python Developer', 'company_name': 'Acme', 'location_name': 'US',
+                                   'description': '', 'redirect_url': 'https://example.com/job/1'})
+        self.assertEqual(len(async_to_sync(utils.afetch_real_time_jobs)('python')), 3)
+        self.assertEqual(self.adzuna.requests, [])
+
+
+class ResumeJobTests(MediaRoot, TestCase):
+    def setUp(self):
+        self.use_media_root(RESUME_JOBS={**settings.RESUME_JOBS, 'EAGER': True, 'MAX_ATTEMPTS': 2})
+
+        self.user = User.objects.create_user('bob', password='pw-123456')
+        self.profile = UserProfile.objects.create(user=self.user, skills='git')
+
+    def upload(self, content, name='resume.pdf'):
+        self.profile.resume = SimpleUploadedFile(name, content, content_type='application/pdf')
+        self.profile.save()
+
+    def test_upload_enqueues_job_and_merges_skills(self):
+        self.client.force_login(self.user)
+        resume = SimpleUploadedFile('cv.pdf', make_pdf("Python developer, Docker and machine learning"))
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('create_profile'), {'skills': 'sql', 'resume': resume})
+        self.assertRedirects(response, reverse('dashboard'), fetch_redirect_response=False)
+
+        job = ResumeJob.objects.get(profile=self.profile)
+        self.assertEqual(job.status, ResumeJob.DONE)
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.skills, 'docker, machine learning, python, sql')
+
+        status = self.client.get(reverse('resume_status')).json()
+        self.assertEqual(status['status'], 'done')
+        self.assertEqual(status['skills'], ['docker', 'machine learning', 'python'])
+
+    def test_enqueue_is_idempotent(self):
+        self.upload(make_pdf("Django"))
+        with override_settings(RESUME_JOBS={**settings.RESUME_JOBS, 'EAGER': False, 'WORKERS': 0}):
+            with self.captureOnCommitCallbacks(execute=True):
+                first = enqueue_resume(self.profile)
+                second = enqueue_resume(self.profile)
+            self.assertEqual(first.pk, second.pk)
+            self.assertEqual(ResumeJob.objects.get(pk=first.pk).status, ResumeJob.PENDING)
+
+        self.assertEqual(process_pending_jobs(), 1)
+        self.assertEqual(process_pending_jobs(), 0)  # a finished job is never re-run
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.skills, 'django, git')
+
+    def test_unreadable_resume_fails_after_retries(self):
+        self.upload(b"not a pdf")
+        with self.captureOnCommitCallbacks(execute=True):
+            job = enqueue_resume(self.profile)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ResumeJob.FAILED, 2))
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.skills, 'git')
+
+
+class ResumeCacheTests(MediaRoot, TestCase):
+    def setUp(self):
+        self.use_media_root()
+        self.pdf = make_pdf("Kubernetes and big data engineer")
+
+    def test_seen_files_skip_extraction(self):
+        self.assertEqual(utils.extract_resume_skills(SimpleUploadedFile('a.pdf', self.pdf)), ['big data', 'kubernetes'])
+        with mock.patch('core.utils.PdfPages') as pdfminer, mock.patch('core.utils.extract_skills') as matcher:
+            self.assertEqual(utils.extract_resume_skills(SimpleUploadedFile('b.pdf', self.pdf)), ['big data', 'kubernetes'])
+            self.assertIn('Kubernetes', utils.extract_text_from_pdf(SimpleUploadedFile('c.pdf', self.pdf)))
+        pdfminer.assert_not_called()
+        matcher.assert_not_called()
+
+    def test_vocabulary_change_invalidates_skills_only(self):
+        utils.extract_resume_skills(SimpleUploadedFile('a.pdf', self.pdf))
+        with mock.patch('core.resume_cache.vocabulary_fingerprint', return_value='2:new'), \
+                mock.patch('core.utils.PdfPages') as pdfminer:
+            self.assertEqual(utils.extract_resume_skills(SimpleUploadedFile('a.pdf', self.pdf)), ['big data', 'kubernetes'])
+        pdfminer.assert_not_called()  # the cached text is still valid
+        self.assertEqual(ResumeCache.objects.get().skills_version, '2:new')
+
+    def test_identical_uploads_are_stored_once(self):
+        profiles = [UserProfile.objects.create(user=User.objects.create_user(name)) for name in ('carol', 'dave', 'erin')]
+        for profile, name, pdf in zip(profiles, ('carol.pdf', 'dave.PDF', 'erin.pdf'), (self.pdf, self.pdf, make_pdf("Rust"))):
+            profile.resume = SimpleUploadedFile(name, pdf)
+            profile.save()
+        # Named after the content, not after whoever uploaded it first
+        name = f'resumes/{hashlib.sha256(self.pdf).hexdigest()}.pdf'
+        self.assertEqual(profiles[0].resume.name, name)
+        self.assertEqual(profiles[1].resume.name, name)
+        self.assertEqual(ResumeCache.objects.get(file_name=name).sha256, hashlib.sha256(self.pdf).hexdigest())
+        self.assertNotEqual(profiles[2].resume.name, name)
+        with profiles[2].resume.open('rb') as f:
+            self.assertEqual(f.read(), make_pdf("Rust"))
+
+
+class ResumeImportTests(MediaRoot, TestCase):
+    def setUp(self):
+        self.use_media_root()
+        self.folder = self.make_temp_dir()
+
+        os.makedirs(os.path.join(self.folder, 'cohort'))
+        for name, content in [('alice.pdf', make_pdf("Python and Docker")),
+                              ('cohort/Bob Smith.pdf', make_pdf("Kubernetes", "big data")),
+                              ('broken.pdf', b"not a pdf"),
+                              ('notes.txt', b"ignored")]:
+            with open(os.path.join(self.folder, name), 'wb') as f:
+                f.write(content)
+        self.alice = UserProfile.objects.create(user=User.objects.create_user('alice'), skills='sql')
+
+    def run_import(self, workers=0):
+        out, err = io.StringIO(), io.StringIO()
+        call_command('import_resumes', self.folder, workers=workers, batch_size=2, verbosity=2, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_creates_and_updates_profiles(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            out, err = self.run_import(workers=2)
+        self.assertIn("Imported 2 of 3 resumes", out)
+        self.assertIn("cohort/Bob Smith.pdf -> Bob-Smith: 2 skills", out)
+        self.assertIn("broken.pdf: failed", err)
+
+        self.alice.refresh_from_db()
+        self.assertEqual(self.alice.skills, 'docker, python, sql')
+        with open(os.path.join(self.folder, 'alice.pdf'), 'rb') as f:
+            self.assertEqual(self.alice.resume.name, f'resumes/{hashlib.sha256(f.read()).hexdigest()}.pdf')
+        bob = UserProfile.objects.get(user__username='Bob-Smith')
+        self.assertEqual(bob.skills, 'big data, kubernetes')
+        self.assertFalse(bob.user.has_usable_password())
+        self.assertEqual(set(UserSkill.objects.filter(profile=bob, source=UserSkill.RESUME)
+                             .values_list('skill__name', flat=True)), {'big data', 'kubernetes'})
+        self.assertEqual(bob.resume_jobs.get().status, ResumeJob.DONE)
+        self.assertEqual(UserProfile.objects.with_skill('kubernetes').get(), bob)
+        self.assertEqual(ResumeCache.objects.exclude(text=None).count(), 2)
+
+    def test_imported_files_are_skipped(self):
+        self.run_import()
+        with mock.patch('core.resume_import.extract_resume') as extract:
+            extract.return_value = (None, None, 0.0, "still broken")
+            out, _ = self.run_import()
+        self.assertIn("Imported 0 of 3 resumes", out)
+        self.assertIn("2 already imported, 1 failed", out)
+        extract.assert_called_once()  # only the broken file is parsed again
+        self.assertEqual(ResumeJob.objects.count(), 2)
+
+        # The same content under a new name is a new user, served from the resume cache
+        shutil.copy(os.path.join(self.folder, 'alice.pdf'), os.path.join(self.folder, 'carol.pdf'))
+        with mock.patch('core.resume_import.extract_resume') as extract:
+            extract.return_value = (None, None, 0.0, "still broken")
+            out, _ = self.run_import()
+        self.assertIn("carol.pdf -> carol: 2 skills, cached", out)
+        self.alice.refresh_from_db()
+        self.assertEqual(UserProfile.objects.get(user__username='carol').resume.name, self.alice.resume.name)
+
+
+class StreamingPdfTests(TestCase):
+    def test_page_cap(self):
+        pdf = make_pdf("python", "docker", "react")
+        pages = PdfPages(SimpleUploadedFile('cv.pdf', pdf), max_pages=2)
+        texts = list(pages)
+        self.assertEqual(len(texts), 2)
+        self.assertEqual(pages.truncated, 'max_pages')
+        self.assertNotIn('react', "".join(texts))
+
+    def test_time_budget_is_checked_between_pages(self):
+        pdf = make_pdf("python", "docker", "react")
+        pages = PdfPages(SimpleUploadedFile('cv.pdf', pdf), time_budget=1e-9)
+        texts = list(pages)
+        # The page in progress when the budget ran out is still returned
+        self.assertEqual((len(texts), pages.truncated), (1, 'time_budget'))
+        self.assertIn('python', texts[0])
+
+    def test_reads_from_temporary_upload_path(self):
+        upload = TemporaryUploadedFile('cv.pdf', 'application/pdf', 0, None)
+        self.addCleanup(upload.close)
+        upload.write(make_pdf("kubernetes", "spark"))
+        upload.seek(0)
+        with open_pdf(upload) as fp:
+            self.assertEqual(fp.name, upload.temporary_file_path())
+        pages = PdfPages(upload)
+        self.assertEqual(["kubernetes" in t or "spark" in t for t in pages], [True, True])
+        self.assertIsNone(pages.truncated)
+
+    def test_skill_extraction_stops_when_vocabulary_is_exhausted(self):
+        pdf = make_pdf("python and django", "sql")
+        with mock.patch('core.utils.get_skill_matcher') as matcher:
+            matcher.return_value.skills = ['python', 'django']
+            matcher.return_value.extract.side_effect = lambda text: [s for s in ('python', 'django') if s in text]
+            skills = utils.extract_resume_skills(SimpleUploadedFile('cv.pdf', pdf))
+        self.assertEqual(skills, ['django', 'python'])
+        self.assertEqual(matcher.return_value.extract.call_count, 1)  # page 2 was never read
+        self.assertIsNone(ResumeCache.objects.get().text)  # partial text is not cached
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_every_case_runs(self):
+        results = benchmark_suite.run(scales=[30], repeat=2, budget=None)
+        self.assertEqual(set(results), {f'{name}@30' for name in benchmark_suite.CASES})
+        for entry in results.values():
+            self.assertEqual(entry['samples'], 2)
+            self.assertGreater(entry['ops_per_s'], 0)
+            self.assertLessEqual(entry['min_ms'], entry['p50_ms'])
+        self.assertEqual(Project.objects.count(), 30)
+
+    def test_compare_with_baseline(self):
+        def entry(min_ms, peak_kib=100, calibration_ms=10):
+            return {'min_ms': min_ms, 'peak_kib': peak_kib, 'calibration_ms': calibration_ms}
+
+        baseline = {'a@1k': entry(10), 'b@1k': entry(10), 'c@1k': entry(0.01), 'd@1k': entry(10, peak_kib=1000)}
+        results = {
+            'a@1k': entry(14),  # within tolerance
+            'b@1k': entry(20, calibration_ms=20),  # the machine is twice as slow
+            'c@1k': entry(0.03),  # tripled, but by microseconds
+            'd@1k': entry(10, peak_kib=2000),
+            'e@1k': entry(50),  # not in the baseline
+        }
+        self.assertEqual(benchmark_suite.compare(results, baseline, tolerance=0.5), [('d@1k', 'peak_kib', 1000, 2000)])
+        self.assertEqual([r[:2] for r in benchmark_suite.compare(results, baseline, tolerance=0.25)],
+                         [('a@1k', 'min_ms'), ('d@1k', 'peak_kib')])
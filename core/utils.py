@@ -1,92 +1,180 @@
-import spacy
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import requests
-from pdfminer.high_level import extract_text
-from io import BytesIO
 import logging
+from asgiref.sync import sync_to_async
 from decouple import config  
-import os
-import pandas as pd
-
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))  # Get the current file's directory
-CSV_FILE_PATH = os.path.join(BASE_DIR, "data", "Online_Courses.csv")  # Join path correctly
-
-df = pd.read_csv(CSV_FILE_PATH)
-
+from django.conf import settings
+from .course_index import get_course_index
+from .http_client import get_client
+from .instrumentation import record, span
+from .lookup_cache import cached_lookup, canonical_skills
+from .nlp import get_skill_matcher
+from .pdf_text import PdfPages
+from .project_index import top_projects
+from . import embeddings, hashing_index, job_index, nlp_service, resume_cache
+from .storage import file_digest
 
 # Initialize the logger
 logger = logging.getLogger(__name__)
 
-nlp = spacy.load("en_core_web_sm")
+# The spaCy model and the course catalog are loaded lazily on first use (see core/nlp.py)
 
 # Load API keys from environment variables
 ADZUNA_API_ID = config('ADZUNA_API_ID')
 ADZUNA_API_KEY = config('ADZUNA_API_KEY')
 GITHUB_API_TOKEN = config('GITHUB_API_TOKEN')
 
+# Base URLs are configurable so tests can point them at local stub servers
+ADZUNA_BASE_URL = config('ADZUNA_BASE_URL', default='https://api.adzuna.com/v1/api/jobs')
+GITHUB_API_URL = config('GITHUB_API_URL', default='https://api.github.com')
+
 def extract_skills(text):
+    """
+    Returns the canonical skills found in ``text``, in order of occurrence.
+    Multi-word skills and aliases (e.g. "k8s") are matched by the phrase matcher.
+    """
     if not text:
         logger.info("No text provided for skill extraction.")  
         return []
-    
-    skill_keywords = [
-        "python", "django", "machine learning", "javascript", "react", 
-        "java", "sql", "html", "css", "data analysis", "flask", 
-        "node.js", "angular", "vue.js", "docker", "kubernetes", 
-        "aws", "azure", "git", "rest api", "graphql", "mongodb", 
-        "postgresql", "linux", "bash", "pandas", "numpy", "tensorflow", 
-        "pytorch", "scikit-learn", "big data", "spark", "hadoop"
-    ]
-    
-    doc = nlp(text.lower())
-
-    skills = [token.text for token in doc if token.text in skill_keywords]
-    
-    return skills
+
+    with span('spacy'):
+        return get_skill_matcher().extract(text)
+
+def pdf_pages(pdf_file):
+    """Page-by-page text of a PDF, bounded by the PDF_EXTRACTION settings."""
+    return PdfPages(
+        pdf_file,
+        max_pages=settings.PDF_EXTRACTION['MAX_PAGES'],
+        time_budget=settings.PDF_EXTRACTION['TIME_BUDGET'],
+    )
 
 def extract_text_from_pdf(pdf_file):
+    # PDFs we've seen before are served from the content-hash cache
+    digest = file_digest(pdf_file)
+    text = resume_cache.cached_text(resume_cache.get_entry(digest))
+    if text is not None:
+        logger.info("Using cached text for PDF.")
+        return text
+
     try:
-        if hasattr(pdf_file, 'read'):  
-            pdf_content = pdf_file.read()
-            pdf_stream = BytesIO(pdf_content)
-            text = extract_text(pdf_stream)
-        else:
-            text = extract_text(pdf_file)
-        
-        logger.info("Successfully extracted text from PDF.")  
+        # Streams the file page by page instead of reading it into memory
+        pages = pdf_pages(pdf_file)
+        text = "".join(pages)
+        record('pdf.extract', pages.seconds)
+
+        logger.info(f"Successfully extracted text from PDF ({pages.pages_read} pages).")  
+        if pages.truncated != 'time_budget':  # a timed-out result depends on load; don't keep it
+            resume_cache.store(digest, text=text)
         return text
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {e}")  
         return None
 
-def match_projects(user_skills, projects):
-    vectorizer = TfidfVectorizer()
-    skill_matrix = vectorizer.fit_transform([user_skills] + [p.required_skills for p in projects])
-    similarities = cosine_similarity(skill_matrix[0:1], skill_matrix[1:])
-    matched_indices = similarities.argsort()[0][::-1]
-    return [projects[i] for i in matched_indices]
+def extract_resume_skills(pdf_file):
+    """
+    Returns the sorted, unique skills found in a resume PDF, or None if no
+    text could be extracted. Cached per file content and skill vocabulary.
 
-def fetch_real_time_jobs(skills, location='us'):
-    base_url = 'https://api.adzuna.com/v1/api/jobs'
-    endpoint = f'{base_url}/{location}/search/1'
+    Pages are fed to the skill matcher as they are extracted, so reading
+    stops early once every skill in the vocabulary has been found.
+    """
+    digest = file_digest(pdf_file)
+    entry = resume_cache.get_entry(digest)
+    skills = resume_cache.cached_skills(entry)
+    if skills is not None:
+        return skills
+
+    resume_text = resume_cache.cached_text(entry)
+    if resume_text is not None:
+        skills = sorted(set(extract_skills(resume_text)))
+        resume_cache.store(digest, skills=skills)
+        return skills
+
+    vocabulary_size = len(get_skill_matcher().skills)
+    found = set()
+    parts = []
+    complete = True
+    try:
+        pages = pdf_pages(pdf_file)
+        for page_text in pages:
+            parts.append(page_text)
+            found.update(extract_skills(page_text))
+            if len(found) == vocabulary_size:
+                complete = False  # nothing left to find; skip the remaining pages
+                break
+        record('pdf.extract', pages.seconds)
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {e}")  
+        return None
+
+    skills = sorted(found)
+    if pages.truncated == 'time_budget':
+        return skills
+    resume_cache.store(digest, text="".join(parts) if complete else None, skills=skills)
+    return skills
+
+def match_projects(user_skills, k=None):
+    """
+    Returns the ``k`` projects that best match the user's skills, best first,
+    each with a ``match_score``. Ranking uses the precomputed project index
+    (see core/project_index.py) instead of refitting TF-IDF per request, or
+    the embedding index with ``MATCH_ENGINE = 'embedding'`` (core/embeddings.py)
+    or the hashed index with ``'hashing'`` (core/hashing_index.py).
+    """
+    if settings.MATCH_ENGINE == 'embedding':
+        projects = embeddings.top_projects(user_skills, k)
+        if projects is not None:  # None until the model and index are ready
+            return projects
+    elif settings.MATCH_ENGINE == 'hashing':
+        return hashing_index.top_projects(user_skills, k)
+    return top_projects(user_skills, k)
+
+def adzuna_request(skills, location='us', page=1, results_per_page=10):
+    endpoint = f'{ADZUNA_BASE_URL}/{location}/search/{page}'
     params = {
         'app_id': ADZUNA_API_ID,
         'app_key': ADZUNA_API_KEY,
         'what': skills,  
         'sort_by': 'relevance',  
-        'results_per_page': 10,  
+        'results_per_page': results_per_page,
     }
-    response = requests.get(endpoint, params=params)
+    return endpoint, params
+
+def adzuna_results(response):
     if response.status_code == 200:
         return response.json().get('results', [])
     return []
 
-def fetch_open_source_projects(skills):
-    if not skills:
-        logger.info("No skills provided for GitHub API query.")
+@cached_lookup('jobs', key_func=lambda skills, location='us': (canonical_skills(skills), location))
+def fetch_real_time_jobs(skills, location='us'):
+    """
+    Jobs matching ``skills``: from Adzuna, or ranked from the harvested
+    listings when ``JOB_SOURCE`` is ``'index'`` (core/job_index.py).
+    """
+    if settings.JOB_SOURCE == 'index':
+        return job_index.search_jobs(skills, location)
+    endpoint, params = adzuna_request(skills, location)
+    try:
+        response = get_client('adzuna').get(endpoint, params=params)
+    except requests.RequestException as e:
+        logger.error(f"Adzuna API request failed: {e}")
+        return []
+    return adzuna_results(response)
+
+@cached_lookup('jobs', key_func=lambda skills, location='us': (canonical_skills(skills), location))
+async def afetch_real_time_jobs(skills, location='us'):
+    """Async ``fetch_real_time_jobs`` for the ASGI views; both share cache entries."""
+    if settings.JOB_SOURCE == 'index':
+        return await sync_to_async(job_index.search_jobs)(skills, location)
+    from .async_http import UPSTREAM_ERRORS, get_async_client  # httpx is only needed under ASGI
+    endpoint, params = adzuna_request(skills, location)
+    try:
+        response = await get_async_client('adzuna').get(endpoint, params=params)
+    except UPSTREAM_ERRORS as e:
+        logger.error(f"Adzuna API request failed: {e}")
         return []
+    return adzuna_results(response)
 
+def github_request(skills):
     # Ensure skills is a list (preventing query errors)
     if isinstance(skills, str):
         skills_list = skills.split(",")  
@@ -94,114 +182,91 @@ def fetch_open_source_projects(skills):
         skills_list = skills
 
     query = "+".join(skills_list)  # Convert list to GitHub search query
-    url = f"https://api.github.com/search/repositories?q={query}&sort=stars&order=desc"
+    url = f"{GITHUB_API_URL}/search/repositories?q={query}&sort=stars&order=desc"
 
     headers = {"Authorization": f"token {GITHUB_API_TOKEN}"}
-    response = requests.get(url, headers=headers)
+    return url, headers
 
+def github_items(response):
     if response.status_code == 200:
         return response.json().get("items", [])
     else:
         logger.error(f"GitHub API Error: {response.text}")
         return []
 
-def get_courses(skill):
-    """
-    Fetches the top 5 relevant courses from the CSV file based on the skill.
-    """
-    try:
-        # Load CSV file
-        df = pd.read_csv("core/data/Online_Courses.csv")  # Ensure the correct file path
-        
-
-        # Ensure the CSV file has the correct column names
-        required_columns = {'Title', 'URL', 'Short Intro', 'Created by'}  
-        if not required_columns.issubset(df.columns):
-            raise ValueError(f"CSV file is missing required columns. Found: {df.columns.tolist()}")
-
-        # Convert all text to lowercase for better matching
-        df['Title'] = df['Title'].astype(str).str.lower()
-        df['Short Intro'] = df['Short Intro'].astype(str).str.lower()
-
-        # Filter courses containing the skill in their title or short intro
-        skill_lower = skill.lower()
-        filtered_courses = df[
-            df['Title'].str.contains(skill_lower, na=False) | 
-            df['Short Intro'].str.contains(skill_lower, na=False)
-        ]
-
-        # Get the top 5 results
-        top_courses = filtered_courses.head(5).copy()
-        top_courses['Know More'] = top_courses['URL'].apply(lambda url: f"[Know More]({url})")
-
-        # Rename columns for output formatting
-        # Ensure correct key in `get_courses()`
-        top_courses = filtered_courses[['Title', 'Created by', 'Short Intro', 'URL']].rename(
-            columns={'Title': 'name', 'Created by': 'created_by', 'Short Intro': 'description', 'URL': 'know_more'}
-        ).to_dict(orient='records')
+@cached_lookup('open_source', key_func=lambda skills: canonical_skills(skills))
+def fetch_open_source_projects(skills):
+    if not skills:
+        logger.info("No skills provided for GitHub API query.")
+        return []
 
+    url, headers = github_request(skills)
+    try:
+        response = get_client('github').get(url, headers=headers)
+    except requests.RequestException as e:
+        logger.error(f"GitHub API request failed: {e}")
+        return []
+    return github_items(response)
 
-        return top_courses
+@cached_lookup('open_source', key_func=lambda skills: canonical_skills(skills))
+async def afetch_open_source_projects(skills):
+    """Async ``fetch_open_source_projects`` for the ASGI views; both share cache entries."""
+    if not skills:
+        logger.info("No skills provided for GitHub API query.")
+        return []
 
-    except Exception as e:
-        print(f"Error reading courses CSV file: {e}")
+    from .async_http import UPSTREAM_ERRORS, get_async_client
+    url, headers = github_request(skills)
+    try:
+        response = await get_async_client('github').get(url, headers=headers)
+    except UPSTREAM_ERRORS as e:
+        logger.error(f"GitHub API request failed: {e}")
         return []
+    return github_items(response)
+
 def get_courses(skills):
     """
-    Fetches the top 5 most relevant courses from the CSV file based on skill similarity.
-    Uses TF-IDF and cosine similarity for better matching.
+    Fetches the top 5 most relevant courses based on skill similarity.
+    Queries the prebuilt TF-IDF course index (see core/course_index.py),
+    through the NLP service when one is configured (core/nlp_service.py),
+    the embedding index with ``MATCH_ENGINE = 'embedding'`` or the hashed
+    index with ``'hashing'``.
     """
     try:
-        # Load CSV file
-        df = pd.read_csv(CSV_FILE_PATH)  
-
-        # Ensure required columns exist
-        required_columns = {'Title', 'Short Intro', 'URL', 'Created by'}
-        if not required_columns.issubset(df.columns):
-            raise ValueError(f"CSV file is missing required columns. Found: {df.columns.tolist()}")
-
-        # Convert all text to lowercase for better matching
-        df['Full Text'] = (df['Title'] + " " + df['Short Intro']).astype(str).str.lower()
-
-        # Convert skills to a single query string
-        skills_text = " ".join(skills).lower()
-
-        # TF-IDF Vectorization
-        vectorizer = TfidfVectorizer()
-        course_vectors = vectorizer.fit_transform(df['Full Text'])
-        skill_vector = vectorizer.transform([skills_text])
-
-        # Compute Cosine Similarity
-        similarities = cosine_similarity(skill_vector, course_vectors).flatten()
-        
-        # Get top 5 relevant courses
-        top_indices = similarities.argsort()[-5:][::-1]
-        top_courses = df.iloc[top_indices].copy()
-
-        # Prepare output format
-        top_courses['Know More'] = top_courses['URL'].apply(lambda url: f"[Know More]({url})")
-        top_courses = top_courses[['Title', 'Created by', 'Short Intro', 'URL']].rename(
-            columns={'Title': 'name', 'Created by': 'created_by', 'Short Intro': 'description', 'URL': 'know_more'}
-        ).to_dict(orient='records')
+        if settings.MATCH_ENGINE == 'embedding':
+            courses = embeddings.top_courses(skills, k=5)
+            if courses is not None:  # None until an embedding model is built
+                return courses
+        elif settings.MATCH_ENGINE == 'hashing':
+            return hashing_index.top_courses(skills, k=5)
+
+        # Accept both the stored ", "-joined string and a list of skills
+        if isinstance(skills, str):
+            skills_text = skills.lower()
+        else:
+            skills_text = " ".join(skills).lower()
 
-        return top_courses
+        if settings.NLP_SERVICE['SOCKET']:
+            courses = nlp_service.top_courses(skills_text, k=5)
+            if courses is not None:
+                return courses
+        return get_course_index().top_courses(skills_text, k=5)
 
     except Exception as e:
-        print(f"Error reading courses CSV file: {e}")
+        logger.error(f"Error querying course index: {e}")
         return []
 
 def recommend_courses_from_resume(pdf_file):
-    resume_text = extract_text_from_pdf(pdf_file)
-    if not resume_text:
+    extracted_skills = extract_resume_skills(pdf_file)
+    if extracted_skills is None:
         logger.error("Failed to extract text from the uploaded resume.")
         return []
 
-    extracted_skills = list(set(extract_skills(resume_text)))
     if not extracted_skills:
         logger.info("No relevant skills found in the resume.")
         return []
 
-    print(f"Extracted skills: {extracted_skills}")  # Debugging print
+    logger.info(f"Extracted {len(extracted_skills)} skills from the resume.")
 
     # Fetch courses for all extracted skills in one call
     recommended_courses = get_courses(extracted_skills)
@@ -1,11 +1,23 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
 from django.shortcuts import render, redirect
+from django.template.loader import render_to_string
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from . import metrics
+from .aggregation import gather_sources
+from .dashboard_cache import get_dashboard
 from .forms import UserProfileForm
-from .models import UserProfile, Project
-from .utils import extract_text_from_pdf, match_projects, fetch_real_time_jobs, fetch_open_source_projects, get_courses, extract_skills
+from .instrumentation import span
+from .lookup_cache import cache_stats
+from .models import Recommendation, UserProfile, ResumeJob, UserSkill
+from .recommendations import stored_recommendations
+from .resume_jobs import enqueue_resume, merge_skills
+from .skill_tags import add_profile_skills
+from .utils import match_projects, fetch_real_time_jobs, fetch_open_source_projects, get_courses, extract_skills
 
 def home(request):
     return render(request, 'core/home.html')
@@ -65,23 +77,18 @@ def create_profile(request):
             profile = form.save(commit=False)
             profile.user = request.user
 
-            # **Extract skills from resume if uploaded**
-            resume_skills = []
-            if 'resume' in request.FILES:
-                resume_text = extract_text_from_pdf(request.FILES['resume'])
-                resume_skills = extract_skills(resume_text)
-
             # **Extract skills from form input (manual entry)**
             form_skills = extract_skills(form.cleaned_data.get('skills', ''))
 
-            # **Merge existing, resume, and form skills (avoid duplicates)**
-            all_skills = set(user_profile.skills.split(", ") if user_profile.skills else [])  # Preserve old skills
-            all_skills.update(resume_skills)
-            all_skills.update(form_skills)
-
-            profile.skills = ", ".join(sorted(all_skills))  # Store as a sorted, comma-separated string
+            # **Merge existing and form skills (avoid duplicates)**
+            profile.skills = merge_skills(user_profile.skills, form_skills)  # Stored as a sorted, comma-separated string
+            add_profile_skills(profile, form_skills, source=UserSkill.MANUAL)
             profile.save()
 
+            # **Resume skills are extracted in the background and merged when the job completes**
+            if 'resume' in request.FILES:
+                enqueue_resume(profile)
+
             return redirect('dashboard')  # Redirect to the dashboard after saving
     else:
         form = UserProfileForm(instance=user_profile)
@@ -92,12 +99,85 @@ def create_profile(request):
 @login_required
 def dashboard(request):
     user_profile = UserProfile.objects.get(user=request.user)
-    
-    projects = Project.objects.all()
-    real_time_jobs = fetch_real_time_jobs(user_profile.skills)
-    open_source_projects = fetch_open_source_projects(user_profile.skills)
-    courses = get_courses(user_profile.skills)  # Now using static course data
 
+    # Sections behind slow upstreams are left out here and fetched by the page from dashboard_section
+    sections, lazy_sections = dashboard_sections()
+
+    # Cached per user until their profile or any project changes (see core/dashboard_cache.py)
+    payload, version = get_dashboard(user_profile, lambda: dashboard_payload(user_profile, sections))
+
+    resume_job = user_profile.resume_jobs.first()
+
+    with span('template'):
+        return render(request, 'core/dashboard.html', {
+            **payload,
+            **section_cache_context(payload, version),
+            'resume_job': resume_job,
+            'lazy_sections': lazy_sections,
+        })
+
+# One dashboard section as rendered HTML, fetched by the dashboard page after it has loaded
+@login_required
+def dashboard_section(request, name):
+    if name not in SECTION_CONTEXT:
+        raise Http404("Unknown dashboard section.")
+    user_profile = UserProfile.objects.get(user=request.user)
+    payload, version = get_dashboard(user_profile, lambda: dashboard_payload(user_profile, [name]), part=name)
+    with span('template'):
+        html = render_to_string(f'core/dashboard_sections/{name}.html', {
+            **payload,
+            **section_cache_context(payload, version),
+        }, request=request)
+    return JsonResponse({'section': name, 'available': not payload['unavailable'], 'html': html})
+
+# Template context key of each section rendered from dashboard_sections/<name>.html
+SECTION_CONTEXT = {
+    'jobs': 'jobs',
+    'open_source': 'open_source_projects',
+    'courses': 'courses',
+}
+
+def dashboard_sections():
+    """Returns the sections rendered with the page and the ones the page fetches afterwards."""
+    lazy_sections = [name for name in settings.DASHBOARD_LAZY_SECTIONS if name in SECTION_CONTEXT]
+    return ['projects'] + [name for name in SECTION_CONTEXT if name not in lazy_sections], lazy_sections
+
+def section_cache_context(payload, version):
+    return {
+        'dashboard_version': version,
+        # Sections that are unavailable right now are re-rendered next time
+        'fragment_timeout': 0 if payload['unavailable'] else settings.DASHBOARD_CACHE['FRAGMENT_TIMEOUT'],
+    }
+
+def dashboard_payload(user_profile, sections):
+    """Template context for ``sections`` ('projects' and / or SECTION_CONTEXT names), plus ``unavailable``."""
+    skills = user_profile.skills
+    payload = {}
+
+    # Recommendations precomputed by `manage.py compute_recommendations`, if still current for these skills
+    stored = stored_recommendations(user_profile) if {'projects', 'courses'} & set(sections) else {}
+
+    # Best matching projects from the precomputed index
+    if 'projects' in sections:
+        payload['projects'] = stored.get(Recommendation.PROJECT) or match_projects(skills)
+
+    # Run the external/data lookups concurrently; slow or failing sources are marked unavailable
+    sources = {
+        'jobs': lambda: format_jobs(fetch_real_time_jobs(skills)),
+        'open_source': lambda: fetch_open_source_projects(skills),
+        'courses': lambda: get_courses(skills),  # Now using static course data
+    }
+    sources = {name: fn for name, fn in sources.items() if name in sections}
+    if 'courses' in sources and Recommendation.COURSE in stored:
+        del sources['courses']
+        payload['courses'] = stored[Recommendation.COURSE]
+    results, unavailable = gather_sources(sources, timeouts=settings.DASHBOARD_SOURCE_TIMEOUTS)
+    for name in sources:
+        payload[SECTION_CONTEXT[name]] = results.get(name, [])
+    payload['unavailable'] = unavailable
+    return payload
+
+def format_jobs(real_time_jobs):
     # **Fixing the job data format before passing to template**
     formatted_jobs = []
     for job in real_time_jobs:
@@ -108,10 +188,29 @@ def dashboard(request):
             "description": job.get("description", "No description available"),
             "redirect_url": job.get("redirect_url", "#"),
         })
+    return formatted_jobs
 
-    return render(request, 'core/dashboard.html', {
-        'projects': projects,
-        'jobs': formatted_jobs,
-        'open_source_projects': open_source_projects,
-        'courses': courses,
-    })
\ No newline at end of file
+# Status of the user's latest resume parse, polled by the dashboard
+@login_required
+def resume_status(request):
+    job = ResumeJob.objects.filter(profile__user=request.user).first()
+    if job is None:
+        return JsonResponse({'status': None})
+    return JsonResponse({
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'skills': job.skills.split(", ") if job.skills else [],
+        'error': job.error if job.status == ResumeJob.FAILED else '',
+        'updated_at': job.updated_at.isoformat(),
+    })
+
+# Lookup cache counters for monitoring (staff only)
+@staff_member_required
+def lookup_cache_stats(request):
+    return JsonResponse(cache_stats())
+
+# Prometheus scrape endpoint; only answers the addresses in INSTRUMENTATION['METRICS_ALLOWED_IPS']
+def metrics_view(request):
+    if request.META.get('REMOTE_ADDR') not in settings.INSTRUMENTATION['METRICS_ALLOWED_IPS']:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,68 @@
+"""
+Entry points for process-pool workers.
+
+This module must stay importable before Django is set up: spawned pool
+processes unpickle these functions first and only then run
+``init_worker``, so anything touching settings or models is imported
+inside the functions.
+"""
+import os
+
+
+def init_worker():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillmatch.settings')
+    import django
+    django.setup()
+
+
+def parse_resume(path):
+    """Returns the sorted skills found in the PDF at ``path``."""
+    from .utils import extract_resume_skills
+
+    skills = extract_resume_skills(path)
+    if skills is None:
+        raise ValueError(f"Could not extract text from {os.path.basename(path)}")
+    return skills
+
+
+def extract_resume(path):
+    """
+    ``(skills, text, seconds, error)`` for the PDF at ``path``, for the bulk
+    import. Doesn't touch the database (the parent writes the results), and
+    a file that can't be read comes back with ``error`` set instead of
+    raising, so it doesn't stop the batch. ``text`` is None when it
+    shouldn't be cached.
+    """
+    import time
+    from .utils import extract_skills, pdf_pages
+
+    started = time.perf_counter()
+    try:
+        pages = pdf_pages(path)
+        text = "".join(pages)
+        skills = sorted(set(extract_skills(text)))
+    except Exception as e:
+        return None, None, time.perf_counter() - started, str(e) or type(e).__name__
+    if pages.truncated == 'time_budget':  # a timed-out result depends on load; don't keep it
+        text = None
+    return skills, text, time.perf_counter() - started, None
+
+
+# Indexes loaded once per recommendation worker by its initializer
+_indexes = None
+
+
+def init_recommendation_worker(kinds):
+    global _indexes
+    init_worker()
+    from .recommendations import load_indexes
+
+    _indexes = load_indexes(kinds)
+
+
+def recommend_chunk(rows, k_courses, k_projects):
+    """Scores a chunk of ``(profile_id, skills)`` rows; see recommendations.score_chunk."""
+    from .recommendations import score_chunk
+
+    course_index, project_index = _indexes
+    return score_chunk(rows, course_index, project_index, k_courses, k_projects)
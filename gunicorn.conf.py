@@ -0,0 +1,11 @@
+"""
+Gunicorn settings, read automatically when gunicorn starts from the repo root.
+
+With PRELOAD_MODELS=True the application (and, through skillmatch/wsgi.py,
+the spaCy model and course index) is loaded once in the master process and
+shared copy-on-write by every forked worker.
+"""
+import decouple
+
+# Every module-level name here is read as a gunicorn setting, and "config" is one of them
+preload_app = decouple.config("PRELOAD_MODELS", default=False, cast=bool)
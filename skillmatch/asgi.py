@@ -12,5 +12,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'skillmatch.settings')
+# Route the dashboard to its async views unless explicitly turned off
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.PRELOAD_MODELS:
+    from core.nlp import preload  # noqa: E402
+    preload()
@@ -6,11 +6,15 @@ Generated by 'django-admin startproject' using Django 5.1.7.
 
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Cores this process may run on (its CPU affinity, which containers and
+# taskset narrow), the default for the process pools sized below
+AVAILABLE_CPUS = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+
 # Authentication redirects
 LOGIN_REDIRECT_URL = '/'
 LOGIN_URL = '/login/'
@@ -71,6 +75,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+
+    # Server-Timing header, request log line and metrics (core/instrumentation.py)
+    'core.middleware.request_timing_middleware',
 ]
 
 ROOT_URLCONF = 'skillmatch.urls'
@@ -207,6 +214,11 @@ LOGGING = {
             'level': 'WARNING',
             'propagate': False,
         },
+        'httpx': {
+            'handlers': ['file'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
 
@@ -217,3 +229,279 @@ LOGGING = {
 ADZUNA_API_ID = config('ADZUNA_API_ID')
 ADZUNA_API_KEY = config('ADZUNA_API_KEY')
 GITHUB_API_TOKEN = config('GITHUB_API_TOKEN')
+
+# =========================
+# COURSE INDEX
+# =========================
+
+# Source catalog and the directory holding the prebuilt TF-IDF index
+# (build it with: python manage.py build_course_index)
+COURSE_CATALOG_PATH = config("COURSE_CATALOG_PATH", default=str(BASE_DIR / "core" / "data" / "Online_Courses.csv"))
+COURSE_INDEX_DIR = config("COURSE_INDEX_DIR", default=str(BASE_DIR / "core" / "data" / "course_index"))
+
+# How often (seconds) a worker checks whether the catalog CSV changed
+COURSE_INDEX_CHECK_INTERVAL = config("COURSE_INDEX_CHECK_INTERVAL", default=30, cast=int)
+
+# Courses must score above this cosine similarity to be recommended
+COURSE_MIN_SCORE = config("COURSE_MIN_SCORE", default=0.0, cast=float)
+
+# =========================
+# DASHBOARD
+# =========================
+
+# The dashboard fans its lookups out concurrently, each source on a pool of up
+# to FANOUT_WORKERS threads; a source that misses its own timeout (seconds) or
+# the overall deadline is shown as unavailable
+DASHBOARD_FANOUT_WORKERS = config("DASHBOARD_FANOUT_WORKERS", default=16, cast=int)
+DASHBOARD_DEADLINE = config("DASHBOARD_DEADLINE", default=5.0, cast=float)
+DASHBOARD_SOURCE_TIMEOUTS = {
+    'jobs': config("DASHBOARD_JOBS_TIMEOUT", default=4.0, cast=float),
+    'open_source': config("DASHBOARD_OPEN_SOURCE_TIMEOUT", default=4.0, cast=float),
+    'courses': config("DASHBOARD_COURSES_TIMEOUT", default=2.0, cast=float),
+}
+
+# Sections ("jobs", "open_source", "courses") the page fetches from
+# /dashboard/sections/<name>/ after it has rendered, so slow upstreams don't
+# hold up the first paint. Leave empty to render every section up front.
+DASHBOARD_LAZY_SECTIONS = config("DASHBOARD_LAZY_SECTIONS", default="jobs,open_source", cast=Csv())
+
+# Each user's dashboard payload is cached in CACHES[CACHE_ALIAS] for TIMEOUT seconds
+# (at most LOOKUP_CACHE['TTL']) and dropped when their profile or any project
+# changes. FRAGMENT_TIMEOUT > 0 also caches each rendered section; 0 turns that off.
+DASHBOARD_CACHE = {
+    'ENABLED': config("DASHBOARD_CACHE_ENABLED", default=True, cast=bool),
+    'CACHE_ALIAS': config("DASHBOARD_CACHE_ALIAS", default="default"),
+    'TIMEOUT': config("DASHBOARD_CACHE_TIMEOUT", default=120, cast=int),
+    'FRAGMENT_TIMEOUT': config("DASHBOARD_FRAGMENT_TIMEOUT", default=0, cast=int),
+}
+
+# =========================
+# ASYNC (ASGI) DEPLOYMENT
+# =========================
+
+# Serve the dashboard with its async views (core/async_views.py). skillmatch/asgi.py
+# turns this on, e.g. `uvicorn skillmatch.asgi:application --workers 2`.
+# ASYNC_CPU_WORKERS bounds the threads that rank courses off the event loop.
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+ASYNC_CPU_WORKERS = config("ASYNC_CPU_WORKERS", default=4, cast=int)
+
+# =========================
+# LOOKUP CACHE
+# =========================
+
+# Caches Adzuna / GitHub responses keyed on the canonical skill set.
+# BACKEND is "local" (per-process LRU) or "django" (uses CACHES[CACHE_ALIAS],
+# so workers share hits when that cache is shared, e.g. file-based or Redis).
+LOOKUP_CACHE = {
+    'ENABLED': config("LOOKUP_CACHE_ENABLED", default=True, cast=bool),
+    'BACKEND': config("LOOKUP_CACHE_BACKEND", default="local"),
+    'CACHE_ALIAS': config("LOOKUP_CACHE_ALIAS", default="default"),
+    'TTL': config("LOOKUP_CACHE_TTL", default=300, cast=int),
+    'STALE_TTL': config("LOOKUP_CACHE_STALE_TTL", default=600, cast=int),
+    'MAX_ENTRIES': config("LOOKUP_CACHE_MAX_ENTRIES", default=1024, cast=int),
+}
+
+# =========================
+# OUTBOUND HTTP (Adzuna / GitHub)
+# =========================
+
+# Timeouts are in seconds. The circuit opens after BREAKER_FAILURE_THRESHOLD
+# consecutive failed requests (each counted once, after its MAX_RETRIES
+# retries) and stays open for BREAKER_RESET_TIMEOUT seconds.
+UPSTREAM_HTTP = {
+    'CONNECT_TIMEOUT': config("UPSTREAM_CONNECT_TIMEOUT", default=3.05, cast=float),
+    'READ_TIMEOUT': config("UPSTREAM_READ_TIMEOUT", default=10.0, cast=float),
+    'MAX_RETRIES': config("UPSTREAM_MAX_RETRIES", default=2, cast=int),
+    'BACKOFF_FACTOR': config("UPSTREAM_BACKOFF_FACTOR", default=0.5, cast=float),
+    'MAX_RETRY_WAIT': config("UPSTREAM_MAX_RETRY_WAIT", default=5.0, cast=float),
+    'POOL_MAXSIZE': config("UPSTREAM_POOL_MAXSIZE", default=10, cast=int),
+    'BREAKER_FAILURE_THRESHOLD': config("UPSTREAM_BREAKER_FAILURE_THRESHOLD", default=5, cast=int),
+    'BREAKER_RESET_TIMEOUT': config("UPSTREAM_BREAKER_RESET_TIMEOUT", default=30.0, cast=float),
+}
+
+# =========================
+# NLP MODEL
+# =========================
+
+# Loaded lazily on first use. Skill extraction only needs the tokenizer, so
+# every trained component is excluded to cut load time and memory.
+SPACY_MODEL = config("SPACY_MODEL", default="en_core_web_sm")
+SPACY_EXCLUDE = ["tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer", "ner", "senter"]
+
+# Load the model and course index when the WSGI app is imported. Combine with
+# gunicorn's preload_app (see gunicorn.conf.py) so workers share the pages.
+PRELOAD_MODELS = config("PRELOAD_MODELS", default=False, cast=bool)
+
+# With SOCKET set (e.g. "/run/skillmatch/nlp.sock"), workers send skill
+# extraction and TF-IDF course ranking to one `python manage.py nlp_service`
+# process on that Unix socket instead of each loading the model. When it can't
+# be reached (or doesn't reply within TIMEOUT seconds plus a half-second margin
+# for the service's own timeout reply), workers do the work in-process and retry
+# the socket after RETRY_AFTER seconds. The service runs whatever requests are
+# queued (up to BATCH_SIZE texts) as one batch; a BATCH_WAIT above 0 makes it
+# wait that many seconds for more, trading latency for bigger batches. The
+# service answers requests it hasn't finished within TIMEOUT with an error.
+NLP_SERVICE = {
+    'SOCKET': config("NLP_SERVICE_SOCKET", default=""),
+    'TIMEOUT': config("NLP_SERVICE_TIMEOUT", default=2.0, cast=float),
+    'RETRY_AFTER': config("NLP_SERVICE_RETRY_AFTER", default=10.0, cast=float),
+    'BATCH_SIZE': config("NLP_SERVICE_BATCH_SIZE", default=256, cast=int),
+    'BATCH_WAIT': config("NLP_SERVICE_BATCH_WAIT", default=0.0, cast=float),
+}
+
+# =========================
+# RESUME JOBS
+# =========================
+
+# Uploaded resumes are parsed off the request path. WORKERS is the size of the
+# in-process parsing pool per web process; set it to 0 to leave the queue to
+# `python manage.py process_resume_jobs`. EAGER runs jobs inline (tests).
+RESUME_JOBS = {
+    'WORKERS': config("RESUME_JOB_WORKERS", default=2, cast=int),
+    'EAGER': config("RESUME_JOBS_EAGER", default=False, cast=bool),
+    'MAX_ATTEMPTS': config("RESUME_JOB_MAX_ATTEMPTS", default=3, cast=int),
+    # Seconds after which a job stuck in "running" is requeued
+    'STALE_AFTER': config("RESUME_JOB_STALE_AFTER", default=600, cast=int),
+}
+
+# `python manage.py import_resumes <dir>` parses a folder of resumes across
+# WORKERS processes (default: every core this process may run on) and writes
+# the users and profiles BATCH_SIZE files per transaction.
+RESUME_IMPORT = {
+    'WORKERS': config("RESUME_IMPORT_WORKERS", default=AVAILABLE_CPUS, cast=int),
+    'BATCH_SIZE': config("RESUME_IMPORT_BATCH_SIZE", default=200, cast=int),
+}
+
+# =========================
+# PDF EXTRACTION
+# =========================
+
+# Resumes are read page by page; stop after MAX_PAGES pages or TIME_BUDGET seconds
+# (checked between pages, so a slow page can take the total past it)
+PDF_EXTRACTION = {
+    'MAX_PAGES': config("PDF_MAX_PAGES", default=20, cast=int),
+    'TIME_BUDGET': config("PDF_TIME_BUDGET", default=15.0, cast=float),
+}
+
+# =========================
+# PROJECT MATCHING
+# =========================
+
+# Projects are ranked against the user's skills with an in-process index built
+# from the stored project skill vectors. Workers check every CHECK_INTERVAL
+# seconds whether projects changed; TOP_K projects are shown on the dashboard.
+PROJECT_INDEX = {
+    'CHECK_INTERVAL': config("PROJECT_INDEX_CHECK_INTERVAL", default=5, cast=int),
+    'TOP_K': config("PROJECT_INDEX_TOP_K", default=10, cast=int),
+    'USER_VECTOR_CACHE': config("PROJECT_INDEX_USER_VECTOR_CACHE", default=4096, cast=int),
+}
+
+# =========================
+# MATCHING ENGINE
+# =========================
+
+# "tfidf" ranks courses and projects by the words they share with the user's
+# skills (the indexes above). "embedding" ranks them by semantic similarity of
+# dense vectors through an approximate nearest-neighbour index (core/embeddings.py).
+# "hashing" ranks like "tfidf" but over hashed terms instead of a fitted
+# vocabulary, so courses and projects are added and removed without refitting
+# (core/hashing_index.py).
+# Precomputed recommendations (compute_recommendations) are TF-IDF scores, so
+# the dashboard only reads them with the "tfidf" engine.
+MATCH_ENGINE = config("MATCH_ENGINE", default="tfidf")
+
+# MODEL is "lsa" (fitted on the catalog and projects into MODEL_DIR by
+# `python manage.py build_embeddings`, or on first use) or "spacy" (the word
+# vectors of SPACY_MODEL; needs a model that has them, e.g. en_core_web_md).
+# Collections of EXACT_BELOW vectors or more are split into about
+# 4 * sqrt(n) lists, of which N_PROBE are scanned per query: raise it for
+# recall, lower it for latency. Project vectors saved since the project index
+# was built are scanned exactly; after REBUILD_AFTER of them it is rebuilt in
+# the background.
+EMBEDDINGS = {
+    'MODEL': config("EMBEDDING_MODEL", default="lsa"),
+    'MODEL_DIR': config("EMBEDDING_MODEL_DIR", default=str(BASE_DIR / "core" / "data" / "embeddings")),
+    'DIMENSIONS': config("EMBEDDING_DIMENSIONS", default=128, cast=int),
+    'N_PROBE': config("EMBEDDING_N_PROBE", default=16, cast=int),
+    'EXACT_BELOW': config("EMBEDDING_EXACT_BELOW", default=5000, cast=int),
+    'MIN_SCORE': config("EMBEDDING_MIN_SCORE", default=0.0, cast=float),
+    'QUERY_CACHE': config("EMBEDDING_QUERY_CACHE", default=4096, cast=int),
+    'REBUILD_AFTER': config("EMBEDDING_REBUILD_AFTER", default=1000, cast=int),
+}
+
+# N_FEATURES is the number of hash buckets terms are spread over (collisions
+# merge terms; keep it well above the vocabulary size). Pending updates and
+# tombstones are merged in the background after COMPACT_AFTER entries.
+HASHING_INDEX = {
+    'N_FEATURES': config("HASHING_N_FEATURES", default=2 ** 20, cast=int),
+    'COMPACT_AFTER': config("HASHING_COMPACT_AFTER", default=5000, cast=int),
+}
+
+# =========================
+# JOB INDEX
+# =========================
+
+# "live" asks Adzuna for jobs on each dashboard view. "index" ranks the listings
+# stored by `python manage.py harvest_jobs` (run it periodically, e.g. hourly
+# from cron) with a full-text index instead (core/job_index.py). A harvest
+# searches each of SKILLS (default: the built-in vocabulary in core/skills.py;
+# each costs PAGES requests per location) in each of LOCATIONS, PAGES pages of
+# RESULTS_PER_PAGE (at most 50) deep; listings no harvest has returned for
+# MAX_AGE_DAYS are dropped. TOP_K jobs are shown on the dashboard, ranked from
+# the CANDIDATES most recently stored postings matching the user's skills.
+JOB_SOURCE = config("JOB_SOURCE", default="live")
+JOB_INDEX = {
+    'SKILLS': config("JOB_INDEX_SKILLS", default="", cast=Csv()),
+    'LOCATIONS': config("JOB_INDEX_LOCATIONS", default="us", cast=Csv()),
+    'PAGES': config("JOB_INDEX_PAGES", default=2, cast=int),
+    'RESULTS_PER_PAGE': config("JOB_INDEX_RESULTS_PER_PAGE", default=50, cast=int),
+    'MAX_AGE_DAYS': config("JOB_INDEX_MAX_AGE_DAYS", default=7, cast=int),
+    'TOP_K': config("JOB_INDEX_TOP_K", default=10, cast=int),
+    'CANDIDATES': config("JOB_INDEX_CANDIDATES", default=2000, cast=int),
+}
+
+# =========================
+# CANDIDATE SEARCH
+# =========================
+
+# Recruiter search over profile skills/interests (GET /api/candidates/search/?q=...).
+# Profiles changed by other processes are picked up every CHECK_INTERVAL seconds;
+# pending updates are merged into the main postings after COMPACT_AFTER entries.
+CANDIDATE_SEARCH = {
+    'PAGE_SIZE': config("CANDIDATE_SEARCH_PAGE_SIZE", default=20, cast=int),
+    'MAX_PAGE_SIZE': config("CANDIDATE_SEARCH_MAX_PAGE_SIZE", default=100, cast=int),
+    'CHECK_INTERVAL': config("CANDIDATE_SEARCH_CHECK_INTERVAL", default=5, cast=int),
+    'COMPACT_AFTER': config("CANDIDATE_SEARCH_COMPACT_AFTER", default=10000, cast=int),
+}
+
+# =========================
+# INSTRUMENTATION
+# =========================
+
+# Timing spans and request metrics are always recorded; GET /metrics serves them
+# in the Prometheus text format to METRICS_ALLOWED_IPS. SERVER_TIMING adds the
+# spans to each response as a Server-Timing header (visible to the client).
+# PROFILE_SAMPLE_RATE is the share of requests run under cProfile; the profile
+# of one slower than SLOW_REQUEST_THRESHOLD seconds is written to PROFILE_DIR.
+INSTRUMENTATION = {
+    'SERVER_TIMING': config("SERVER_TIMING", default=DEBUG, cast=bool),
+    'SLOW_REQUEST_THRESHOLD': config("SLOW_REQUEST_THRESHOLD", default=1.0, cast=float),
+    'PROFILE_SAMPLE_RATE': config("PROFILE_SAMPLE_RATE", default=0.0, cast=float),
+    'PROFILE_DIR': config("PROFILE_DIR", default=str(BASE_DIR / 'profiles')),
+    'METRICS_ALLOWED_IPS': config("METRICS_ALLOWED_IPS", default="127.0.0.1,::1", cast=Csv()),
+}
+
+# =========================
+# BATCH RECOMMENDATIONS
+# =========================
+
+# `python manage.py compute_recommendations` precomputes every profile's top
+# courses/projects. Users are scored CHUNK_SIZE at a time (fewer when the
+# users x items block would exceed MAX_CHUNK_MB) across WORKERS processes.
+BATCH_RECOMMENDATIONS = {
+    'WORKERS': config("BATCH_RECOMMENDATION_WORKERS", default=max(1, AVAILABLE_CPUS - 1), cast=int),
+    'CHUNK_SIZE': config("BATCH_RECOMMENDATION_CHUNK_SIZE", default=1000, cast=int),
+    'MAX_CHUNK_MB': config("BATCH_RECOMMENDATION_MAX_CHUNK_MB", default=256, cast=int),
+    'K_COURSES': config("BATCH_RECOMMENDATION_K_COURSES", default=5, cast=int),
+    'K_PROJECTS': config("BATCH_RECOMMENDATION_K_PROJECTS", default=10, cast=int),
+}
@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.urls import path
-from core import views 
+from core import api, async_views, views 
+
+# Under ASGI the dashboard is served by its async views (see ASYNC_VIEWS)
+dashboard_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     path('', views.home, name='home'),  # This ensures '/' points to home
@@ -8,6 +12,11 @@ urlpatterns = [
     path('signup/', views.signup, name='signup'),
     path('logout/', views.user_logout, name='logout'),
     path('create-profile/', views.create_profile, name='create_profile'),
-    path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/', dashboard_views.dashboard, name='dashboard'),
+    path('dashboard/sections/<str:name>/', dashboard_views.dashboard_section, name='dashboard_section'),
     path('login-redirect/', views.login_redirect, name='login_redirect'),
+    path('resume-status/', views.resume_status, name='resume_status'),
+    path('monitoring/lookup-cache/', views.lookup_cache_stats, name='lookup_cache_stats'),
+    path('metrics', views.metrics_view, name='metrics'),
+    path('api/candidates/search/', api.candidate_search, name='candidate_search'),
 ]